@@ -1,21 +1,44 @@
+import json
 import os
+import time
+from telemetry import startup
 from dotenv import load_dotenv
-from google import genai
 import bcrypt
-from datetime import datetime, timedelta
-from flask import Flask, request, jsonify
+from datetime import datetime
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import joblib
 from bson import ObjectId
-from database.db import db, users, daily_logs
-from database.streak import update_visit_streak
-from chatbot.engine import get_bot_reply
+from database.db import db, users, daily_logs, ping, pool_stats
+from database.indexes import ensure_indexes
+from database.logs import (
+    DEFAULT_PAGE_SIZE, MAX_SYNC_BATCH, InvalidLog,
+    build_log, decode_cursor, find_user_logs, insert_log, insert_logs, iter_user_logs, serialize_log,
+    update_derived
+)
+from database.streak import record_visit
+from database.rollups import mood_counts
+from database.tracker import get_summary, tracker_view
+from chatbot.llm import GEMINI_MODEL, GeminiChat
+from chatbot.router import record_decision, route_message
+from ml.batcher import MicroBatcher
+from ml.cache import CACHES, InferenceCache
+from ml.predictor import predict_texts
+from ml.registry import ModelRegistry
+from telemetry.http import instrument
+from telemetry.logs import get_logger
 
 load_dotenv()
+startup.mark("imports")
 
-gemini_client = genai.Client(
-    api_key=os.getenv("GEMINI_API_KEY")
-)
+# 🔹 Startup: every heavy component (Mongo client, model, chatbot index, Gemini
+# client) is created on first use. warmup() builds them ahead of traffic:
+# WARMUP_ON_START=model,chatbot (or "all") does it in a background thread, or
+# call app.warmup() from a server hook (e.g. gunicorn post_fork)
+ENSURE_INDEXES_ON_START = os.getenv("ENSURE_INDEXES_ON_START", "1") == "1"
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "")
+
+# 🔹 One pooled async Gemini client per worker process
+gemini_chat = GeminiChat(api_key=os.getenv("GEMINI_API_KEY"))
 
 # 🔹 Wellness videos import (NEW)
 # TODO: Implement videos module
@@ -27,22 +50,54 @@ app = Flask(__name__)
 
 CORS(app)
 
+# 🔹 Per-route timing, request ids, Server-Timing spans, GET /metrics (telemetry/http.py)
+instrument(app)
+logger = get_logger("wellnest")
+
+# 🔹 Versioned emotion model, hot-swapped when train_model.py publishes a new one
+model_registry = ModelRegistry()
+
+
+def _ensure_indexes():
+    # Idempotent; also: python -m database.indexes
+    try:
+        ensure_indexes()
+    except Exception as e:
+        logger.warning("Could not ensure MongoDB indexes: %s", e)
+        raise
+
+
+def _load_model():
+    if model_registry.get() is None:
+        raise RuntimeError("no model could be loaded")
+
+
+def _load_chatbot():
+    from chatbot.engine import get_searcher
+    get_searcher()
 
-# 🔹 Paths
-BASE_DIR = os.path.dirname(__file__)
-model_dir = os.path.join(BASE_DIR, 'models')
-model_path = os.path.join(model_dir, 'emotion_model.pkl')
-vectorizer_path = os.path.join(model_dir, 'vectorizer.pkl')
 
-# 🔹 Load trained model & vectorizer
-try:
-    model = joblib.load(model_path)
-    vectorizer = joblib.load(vectorizer_path)
-    print("✅ Model and vectorizer loaded successfully!")
-except Exception as e:
-    print("⚠️ Model not loaded yet:", e)
-    model = None
-    vectorizer = None
+WARMUP_COMPONENTS = {
+    "database": ping,
+    "indexes": _ensure_indexes,
+    "model": _load_model,
+    "chatbot": _load_chatbot,
+    "gemini": lambda: gemini_chat.client,
+}
+
+
+def warmup(names=None):
+    """Initialise ``names`` (default: every component) now; returns the startup report."""
+    return startup.warmup(WARMUP_COMPONENTS, names)
+
+
+_startup_names = (["indexes"] if ENSURE_INDEXES_ON_START else []) + (
+    list(WARMUP_COMPONENTS) if WARMUP_ON_START == "all"
+    else [name.strip() for name in WARMUP_ON_START.split(",") if name.strip()]
+)
+if _startup_names:
+    # Off the import path: the worker serves requests while these finish
+    startup.warmup_in_background(WARMUP_COMPONENTS, list(dict.fromkeys(_startup_names)))
 
 @app.route("/api/signup", methods=["POST"])
 def signup():
@@ -113,11 +168,37 @@ def login():
 def home():
     return "WellNest backend is running successfully!"
 
+@app.route("/api/startup", methods=["GET"])
+def startup_report():
+    return jsonify(startup.report())
+
+@app.route("/api/health", methods=["GET"])
+def health():
+    try:
+        ping_ms = ping()
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "mongo": {"error": str(e)},
+            "pool": pool_stats.snapshot()
+        }), 503
+
+    return jsonify({
+        "status": "ok",
+        "mongo": {"pingMs": round(ping_ms, 3)},
+        "pool": pool_stats.snapshot()
+    }), 200
+
 @app.route("/api/physical-health/<user_id>", methods=["GET"])
 def get_physical_health(user_id):
+    try:
+        user = ObjectId(user_id)
+    except Exception:
+        return jsonify({"error": "Invalid user_id"}), 400
+
     data = daily_logs.find_one(
-        {},
-        sort=[("createdAt", -1)]   # latest entry
+        {"user_id": user},
+        sort=[("createdAt", -1)]   # latest entry (user_created index)
     )
 
     if not data:
@@ -147,8 +228,8 @@ def voice_text():
 
     text = data["text"]
 
-    print("📝 Voice converted text received:")
-    print(text)
+    # Length only: the transcript is user content
+    logger.debug("Voice text received (%d chars)", len(text))
 
     return jsonify({
         "status": "success",
@@ -158,96 +239,203 @@ def voice_text():
 def save_daily_log():
     try:
         data = request.get_json()
-        print("🔥 DAILY LOG RECEIVED:", data)
 
-        log = {
-            "user_id": ObjectId(data.get("user_id")),
-            "sleepHours": data.get("sleepHours"),
-            "waterIntake": data.get("waterIntake"),
-            "exerciseTime": data.get("exerciseTime"),
-            "journalEntry": data.get("journalEntry"),
-            "mood": data.get("mood"),
-            "date": datetime.utcnow(),               # ✅ CORRECT
-            "createdAt": datetime.utcnow()
-        }
+        log = build_log(data)
+        log_id, created = insert_log(log)
 
-        daily_logs.insert_one(log)
+        if created:
+            # Keep the tracker summary and mood rollups current; both can be rebuilt from the logs
+            try:
+                update_derived(log["user_id"], [log])
+            except Exception as e:
+                logger.warning("Log summary update failed: %s", e)
 
         return jsonify({
             "status": "success",
-            "message": "Daily log saved"
+            "message": "Daily log saved" if created else "Daily log already saved",
+            "id": str(log_id)
         }), 200
 
+    except InvalidLog as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
     except Exception as e:
-        print("❌ ERROR SAVING DAILY LOG:", e)
+        logger.error("Saving daily log failed: %s", e)
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500
 
 
+# 🔹 Offline sync: replay queued logs in one request
+# Body: {"user_id": ..., "logs": [{..., "date": iso, "idempotencyKey": str}, ...]}
+@app.route("/api/daily-log/batch", methods=["POST"])
+def save_daily_logs():
+    data = request.get_json(silent=True) or {}
+    entries = data.get("logs")
+
+    try:
+        user_id = ObjectId(data.get("user_id"))
+    except Exception:
+        return jsonify({"status": "error", "message": "invalid user_id"}), 400
+
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"status": "error", "message": "'logs' must be a non-empty list"}), 400
+    if len(entries) > MAX_SYNC_BATCH:
+        return jsonify({"status": "error", "message": f"At most {MAX_SYNC_BATCH} logs per batch"}), 413
+
+    try:
+        results = insert_logs(user_id, entries)
+    except Exception as e:
+        logger.error("Saving daily log batch failed: %s", e)
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    return jsonify({
+        "status": "success",
+        "counts": counts,
+        "results": results
+    }), 200
+
+
 # 🔹 Emotion Prediction Route (UPDATED WITH SOUND)
 # -------------------------------
 # Emotion Prediction
 # -------------------------------
+# 🔹 Coalesce concurrent /predict calls into one transform + predict_proba
+PREDICT_MICROBATCH = os.getenv("PREDICT_MICROBATCH", "0") == "1"
+MAX_BATCH_TEXTS = int(os.getenv("PREDICT_MAX_BATCH_TEXTS", "1000"))
+
+# 🔹 Repeated texts skip vectorisation and the model entirely
+predict_cache = InferenceCache("predict")
+
+
+def predict_uncached(texts, active=None):
+    """Predict texts already known to miss the cache, and cache the results."""
+    # One snapshot per call: a reload mid-batch can't mix two model versions
+    active = active or model_registry.get()
+    results = predict_texts(active["model"], active["vectorizer"], texts)
+    for text, result in zip(texts, results):
+        predict_cache.set(text, active["version"], result)
+
+    # Cache keys are normalised, so echo back the caller's own spelling
+    return [dict(result, text=text) for result, text in zip(results, texts)]
+
+
+def predict_cached(texts, active=None):
+    active = active or model_registry.get()
+    version = active["version"]
+
+    results = [predict_cache.get(text, version) for text in texts]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        fresh = predict_uncached([texts[i] for i in missing], active)
+        for i, result in zip(missing, fresh):
+            results[i] = result
+
+    return [dict(result, text=text) for result, text in zip(results, texts)]
+
+
+# 🔹 Only cache misses are queued: /predict looks the text up first
+predict_batcher = MicroBatcher(
+    predict_uncached,
+    max_batch_size=int(os.getenv("PREDICT_BATCH_SIZE", "64")),
+    max_wait_ms=float(os.getenv("PREDICT_BATCH_WAIT_MS", "5"))
+)
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
-    if model is None or vectorizer is None:
+    active = model_registry.get()
+    if active is None:
         return jsonify({'error': 'Model not loaded'}), 500
 
     data = request.get_json()
-    if not data or 'text' not in data:
+    if not data or not isinstance(data.get('text'), str):
         return jsonify({'error': 'Text is required'}), 400
 
     text = data['text']
-    X = vectorizer.transform([text])
-    prediction = model.predict(X)[0]
-
-    label_map = {
-        0: "sadness",
-        1: "joy",
-        2: "love",
-        3: "anger",
-        4: "fear",
-        5: "surprise"
-    }
 
-    emotion = label_map.get(int(prediction), "unknown")
-
-    # 🔊 Emotion → Sound mapping
-    sound_map = {
-        "sadness": "rain.mp3",
-        "anger": "om.mp3",
-        "fear": "jungle.mp3",
-        "joy": "happy.mp3",
-        "love": "calm.mp3",
-        "surprise": "waves.mp3",
-        "stress": "bowls.mp3"
-    }
+    # The only cache lookup for this text: hits skip the batcher's wait, and
+    # misses go straight to the model (a bad item would fail the whole
+    # coalesced batch, so only strings get here)
+    cached = predict_cache.get(text, active["version"])
+    if cached is not None:
+        result = dict(cached, text=text)
+    elif PREDICT_MICROBATCH:
+        result = predict_batcher.submit(text)
+    else:
+        result = predict_uncached([text], active)[0]
+
+    return jsonify(result)
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    active = model_registry.get()
+    if active is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+
+    data = request.get_json()
+    texts = data.get('texts') if data else None
+
+    if not isinstance(texts, list) or not texts:
+        return jsonify({'error': 'texts must be a non-empty list'}), 400
+    if len(texts) > MAX_BATCH_TEXTS:
+        return jsonify({'error': f'At most {MAX_BATCH_TEXTS} texts per batch'}), 413
+    if not all(isinstance(t, str) for t in texts):
+        return jsonify({'error': 'Every text must be a string'}), 400
+
+    return jsonify({"results": predict_cached(texts, active)})
+
+
+@app.route("/api/model", methods=["GET"])
+def model_info():
+    active = model_registry.get()
+    if active is None:
+        return jsonify({"error": "Model not loaded"}), 500
+    return jsonify(active["meta"] | {"version": active["version"]})
+
+
+@app.route("/api/cache-stats", methods=["GET"])
+def cache_stats():
+    return jsonify({name: cache.stats() for name, cache in CACHES.items()})
 
-    sound = sound_map.get(emotion, "calm.mp3")
 
-    return jsonify({
-        "text": text,
-        "predicted_label": int(prediction),
-        "emotion": emotion,
-        "sound": sound
-    })
 # -------------------------------
 # Mood Analytics
 # -------------------------------
 @app.route("/api/mood-stats", methods=["GET"])
 def mood_stats():
-    logs = list(daily_logs.find())
+    """Mood counts from the rollup collection.
 
-    mood_count = {}
-    for log in logs:
-        mood = log.get("mood", "unknown")
-        mood_count[mood] = mood_count.get(mood, 0) + 1
+    Query params: ``user_id``, ``start``/``end`` (ISO dates, end exclusive)
+    and ``granularity`` (``all`` | ``day`` | ``hour``).
+    """
+    granularity = request.args.get("granularity", "all")
+    if granularity not in ("all", "day", "hour"):
+        return jsonify({"status": "error", "message": "granularity must be all, day or hour"}), 400
+
+    try:
+        user_id = request.args.get("user_id")
+        user_id = ObjectId(user_id) if user_id else None
+        start = request.args.get("start")
+        start = datetime.fromisoformat(start) if start else None
+        end = request.args.get("end")
+        end = datetime.fromisoformat(end) if end else None
+    except Exception:
+        return jsonify({"status": "error", "message": "Invalid user_id or date"}), 400
 
     return jsonify({
         "status": "success",
-        "data": mood_count
+        "data": mood_counts(user_id, start, end, granularity)
     })
 
 
@@ -256,29 +444,64 @@ def mood_stats():
 # -------------------------------
 # Get Daily Wellness Logs
 # -------------------------------
+def _log_filters():
+    """``start``/``end`` (ISO dates, end exclusive) and ``order`` query params."""
+    start = request.args.get("start")
+    end = request.args.get("end")
+    return {
+        "start": datetime.fromisoformat(start) if start else None,
+        "end": datetime.fromisoformat(end) if end else None,
+        "order": 1 if request.args.get("order") == "asc" else -1
+    }
+
+
 @app.route("/api/daily-log/<user_id>", methods=["GET"])
 def get_user_logs(user_id):
+    """One page of logs, newest first: ``limit``, ``after`` (cursor), ``start``, ``end``, ``order``."""
     try:
-        logs = list(daily_logs.find({"user_id": ObjectId(user_id)}))
-
-        cleaned_logs = []
-        for log in logs:
-            cleaned_logs.append({
-                "id": str(log["_id"]),
-                "user_id": str(log["user_id"]),
-                "mood": log.get("mood"),
-                "sleepHours": log.get("sleepHours", 0),
-                "exerciseTime": log.get("exerciseTime", 0),
-                "waterIntake": log.get("waterIntake", 0),
-                "createdAt": log.get("createdAt").isoformat() if log.get("createdAt") else None,
-            })
-
-        return jsonify(cleaned_logs), 200
+        filters = _log_filters()
+        limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+        after = request.args.get("after")
+        # Decoded here so a malformed cursor is a 400, not a failed query
+        after = decode_cursor(after) if after else None
+        user = ObjectId(user_id)
+    except Exception:
+        return jsonify({"error": "Invalid user_id, limit, cursor or date"}), 400
+
+    try:
+        logs, next_cursor = find_user_logs(user, limit=limit, after=after, **filters)
+
+        return jsonify({
+            "data": [serialize_log(log) for log in logs],
+            "nextCursor": next_cursor
+        }), 200
 
     except Exception as e:
-        print("ERROR:", e)
+        logger.error("Fetching logs failed: %s", e)
         return jsonify({"error": "Failed to fetch logs"}), 500
 
+
+@app.route("/api/daily-log/<user_id>/export", methods=["GET"])
+def export_user_logs(user_id):
+    """Full history as one JSON array, streamed so memory stays flat."""
+    try:
+        filters = _log_filters()
+        user = ObjectId(user_id)
+    except Exception:
+        return jsonify({"error": "Invalid user_id or date"}), 400
+
+    def generate():
+        yield "["
+        for i, log in enumerate(iter_user_logs(user, **filters)):
+            yield ("," if i else "") + json.dumps(serialize_log(log))
+        yield "]"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/json",
+        headers={"Content-Disposition": f"attachment; filename=wellnest-logs-{user_id}.json"}
+    )
+
 @app.route("/api/badges", methods=["GET"])
 def get_badges():
     badges = list(db.badges.find({}, {"_id": 0}))
@@ -286,6 +509,14 @@ def get_badges():
 # -------------------------------
 # Chatbot API
 # -------------------------------
+# 🔹 Repeated questions are answered without another Gemini round trip
+gemini_cache = InferenceCache("gemini")
+
+
+def _sse(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+
 @app.route("/api/chat", methods=["POST"])
 def chat():
     data = request.json
@@ -294,33 +525,94 @@ def chat():
     if not user_message:
         return jsonify({"reply": "Please say something."}), 400
 
-    prompt = f"""
-    You are Wellnest, a calm and empathetic wellness assistant.
-    You do not provide medical diagnoses.
-    Be supportive and concise.
+    started = time.perf_counter()
+
+    # Rule hits and confident FAQ matches are answered locally
+    decision = route_message(user_message)
+    if decision["route"] == "local":
+        record_decision(user_message, decision, "local", (time.perf_counter() - started) * 1000)
+        return jsonify({"reply": decision["reply"], "source": "local"}), 200
+
+    answered_by = "llm"
+    reply = gemini_cache.get(user_message, GEMINI_MODEL)
+    if reply is None:
+        try:
+            reply = gemini_chat.generate(user_message)
+        except Exception as e:
+            # Saturated, slow or failing LLM: answer from the local engine instead
+            logger.warning("Gemini chat failed, answering locally: %r", e)
+            reply = None
+
+        if reply:
+            gemini_cache.set(user_message, GEMINI_MODEL, reply)
+        else:
+            reply = decision["reply"]
+            answered_by = "local_fallback"
 
-    User: {user_message}
-    """
+    record_decision(user_message, decision, answered_by, (time.perf_counter() - started) * 1000)
+    return jsonify({"reply": reply, "source": "llm" if answered_by == "llm" else "local"}), 200
 
-    try:
-        response = gemini_client.models.generate_content(
-            model="models/gemini-2.5-flash",
-            contents=prompt
-        )
 
-        reply = response.candidates[0].content.parts[0].text
+@app.route("/api/chat/stream", methods=["POST"])
+def chat_stream():
+    """Server-sent events: ``{"delta": ...}`` chunks, then ``{"done": true, ...}``."""
+    data = request.json
+    user_message = data.get("message") if data else None
 
-        return jsonify({"reply": reply}), 200
+    if not user_message:
+        return jsonify({"reply": "Please say something."}), 400
 
-    except Exception as e:
-        print("🔥 GEMINI CHAT ERROR:", repr(e))
-        return jsonify({
-            "reply": "Sorry, I'm having trouble responding right now."
-        }), 500
+    started = time.perf_counter()
+    decision = route_message(user_message)
+
+    def finish(answered_by):
+        record_decision(user_message, decision, answered_by, (time.perf_counter() - started) * 1000)
+
+    def events():
+        if decision["route"] == "local":
+            finish("local")
+            yield _sse({"delta": decision["reply"]})
+            yield _sse({"done": True, "source": "local"})
+            return
+
+        cached = gemini_cache.get(user_message, GEMINI_MODEL)
+        if cached is not None:
+            finish("llm")
+            yield _sse({"delta": cached})
+            yield _sse({"done": True, "source": "llm"})
+            return
+
+        parts = []
+        complete = False
+        try:
+            for chunk in gemini_chat.stream(user_message):
+                parts.append(chunk)
+                yield _sse({"delta": chunk})
+            complete = True
+        except Exception as e:
+            # LLMUnavailable when saturated or slow, anything else when the call failed
+            logger.warning("Gemini chat failed, answering locally: %r", e)
+
+        if not parts:
+            finish("local_fallback")
+            yield _sse({"delta": decision["reply"]})
+            yield _sse({"done": True, "source": "local"})
+            return
+
+        if complete:
+            gemini_cache.set(user_message, GEMINI_MODEL, "".join(parts))
+        finish("llm")
+        yield _sse({"done": True, "source": "llm", "truncated": not complete})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route("/api/list-models", methods=["GET"])
 def list_models():
-    models = gemini_client.models.list()
+    models = gemini_chat.client.models.list()
     return jsonify([m.name for m in models])
 
 
@@ -332,140 +624,38 @@ def list_models():
 @app.route('/api/visit/<user_id>', methods=['POST'])
 def website_visit(user_id):
     try:
-        user = users.find_one({"_id": ObjectId(user_id)})
-        if not user:
+        # One atomic write on the first visit of the day, a read after that
+        updated = record_visit(ObjectId(user_id))
+        if updated is None:
             return jsonify({"error": "User not found"}), 404
 
-        updated = update_visit_streak(user)
-        users.update_one({"_id": ObjectId(user_id)}, {"$set": updated})
-
         return jsonify({
-            "streak": updated["streak"],
-            "badges": updated["badges"]
+            "streak": updated.get("streak", {}),
+            "badges": updated.get("badges", [])
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 
-@app.route("/api/tracker/<user_id>", methods=["GET"])
-def get_tracker(user_id):
-    from datetime import datetime, timedelta
-    from bson import ObjectId
-
-    logs = list(
-        daily_logs.find(
-            {"user_id": ObjectId(user_id)}
-        ).sort("date", -1)
-    )
-    print("USER ID FROM FRONTEND:", user_id)
-
-    print("LOGS FOUND:", logs)
-    print("RAW LOGS:", logs)
-    print("TYPE OF DATE:", type(logs[0]["date"]) if logs else "No logs")
+# 🔹 Placeholder wellness progress (TEMP / BASIC)
+TRACKER_PROGRESS = [
+    {"label": "Mental Wellness", "progress": 70},
+    {"label": "Physical Activity", "progress": 60},
+    {"label": "Sleep Quality", "progress": 80},
+    {"label": "Mindfulness", "progress": 65},
+]
 
-    if not logs:
-        return jsonify({
-            "streak": {
-                "current": 0,
-                "longest": 0,
-                "thisWeek": [False] * 7
-            },
-            "progress": [],
-            "recentActivities": []
-        })
 
-    # --------------------
-    # STREAK CALCULATION
-    # --------------------
-    # Get unique log dates (remove duplicates)
-    try:
-        log_dates = sorted(
-            list({log["date"].date() for log in logs}),
-            reverse=True
-        )
-    except Exception as e:
-        print(f"Error extracting log dates: {e}")
-        log_dates = []
-
-    current_streak = 0
-    longest = 0
-
-    if log_dates:
-        today = datetime.utcnow().date()
-        
-        # Find the most recent log date
-        most_recent_log = log_dates[0]
-        days_since_last_log = (today - most_recent_log).days
-
-        # Calculate current streak (including today and yesterday)
-        if days_since_last_log <= 1:
-            current_streak = 1
-            # Count consecutive days backwards from the most recent log
-            for i in range(1, len(log_dates)):
-                if (log_dates[i - 1] - log_dates[i]).days == 1:
-                    current_streak += 1
-                else:
-                    break
-        else:
-            current_streak = 0
-
-        # Calculate longest streak across all dates
-        if len(log_dates) > 0:
-            temp_streak = 1
-            for i in range(1, len(log_dates)):
-                if (log_dates[i - 1] - log_dates[i]).days == 1:
-                    temp_streak += 1
-                    longest = max(longest, temp_streak)
-                else:
-                    temp_streak = 1
-            longest = max(longest, temp_streak) if temp_streak >= 1 else 1
-
-        # --------------------
-        # THIS WEEK
-        # --------------------
-        today = datetime.utcnow().date()
-        week_start = today - timedelta(days=today.weekday())
-        this_week = [False] * 7
-
-        for log in logs:
-            d = log["date"].date()
-            if week_start <= d <= today:
-                this_week[d.weekday()] = True
-
-
-
-        # --------------------
-        # PROGRESS (TEMP / BASIC)
-        # --------------------
-          progress = [
-            {"label": "Mental Wellness", "progress": 70},
-            {"label": "Physical Activity", "progress": 60},
-            {"label": "Sleep Quality", "progress": 80},
-            {"label": "Mindfulness", "progress": 65},
-        ]
-
-      
-        # --------------------
-        # RECENT ACTIVITIES
-        # --------------------
-      recent = [
-            {
-                "action": "Logged daily wellness data",
-                "time": log["date"].strftime("%b %d"),
-                "points": "+10"
-            }
-            for log in logs[:5]
-        ]
+@app.route("/api/tracker/<user_id>", methods=["GET"])
+def get_tracker(user_id):
+    # Single point read of the precomputed summary (see database/tracker.py)
+    view = tracker_view(get_summary(ObjectId(user_id)))
 
-        return jsonify({
-            "streak": {
-                "current": current_streak,
-                "longest": longest,
-                "thisWeek": this_week
-            },
-            "progress": progress,
-            "recentActivities": recent
-        })
+    return jsonify({
+        "streak": view["streak"],
+        "progress": TRACKER_PROGRESS if view["recentActivities"] else [],
+        "recentActivities": view["recentActivities"]
+    })
 
 
 
@@ -0,0 +1,89 @@
+"""Load test of the MongoDB connection pool at a target request rate.
+
+Fires point reads (the login query shape) from a thread pool at a fixed
+rate against the configured MongoDB and reports achieved throughput,
+latency percentiles and pool wait statistics::
+
+    python -m benchmarks.db_pool --rps 2000 --seconds 10 --threads 64
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from database.db import MONGO_MAX_POOL_SIZE, get_client, pool_stats, users
+
+
+def run(rps=1000, seconds=10, threads=64):
+    get_client().admin.command("ping")
+    pool_stats.reset()
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one_request():
+        started = time.perf_counter()
+        try:
+            users.find_one({"email": "loadtest@example.com"})
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    total = int(rps * seconds)
+    interval = 1.0 / rps
+    began = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for i in range(total):
+            # Open-loop schedule: requests are issued on time even if earlier ones are slow
+            delay = began + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(one_request)
+
+    elapsed = time.perf_counter() - began
+    samples = np.array(latencies) if latencies else np.zeros(1)
+
+    return {
+        "targetRps": rps,
+        "achievedRps": round(len(latencies) / elapsed, 1),
+        "requests": total,
+        "errors": len(errors),
+        "threads": threads,
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "latencyMs": {
+            "p50": round(float(np.percentile(samples, 50)), 3),
+            "p95": round(float(np.percentile(samples, 95)), 3),
+            "p99": round(float(np.percentile(samples, 99)), 3)
+        },
+        "pool": pool_stats.snapshot()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=1000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=64)
+    args = parser.parse_args()
+
+    report = run(args.rps, args.seconds, args.threads)
+    print(json.dumps(report, indent=2))
+
+    pool = report["pool"]
+    if pool["waits"] or pool["checkoutFailures"]:
+        print(f"\n🚨 Pool was a bottleneck: {pool['waits']} waits, "
+              f"{pool['checkoutFailures']} failed checkouts, max wait {pool['waitMsMax']} ms")
+    else:
+        print("\n✅ No checkout ever waited for a free connection")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Local stand-in for the Gemini REST API, for load tests and offline development.
+
+Serves ``...:generateContent`` and ``...:streamGenerateContent?alt=sse`` for any
+model. Point the backend at it with::
+
+    python -m benchmarks.fake_gemini --port 8085 --first-token-ms 300 --token-ms 40
+    GEMINI_BASE_URL=http://127.0.0.1:8085 GEMINI_API_KEY=fake python app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    "It sounds like you have a lot on your mind. Try a few slow breaths, "
+    "and remember that small steps like a short walk or a glass of water help."
+)
+
+
+def _candidate(text, finished):
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate]}
+
+
+def make_handler(first_token_ms, token_ms, words_per_chunk, fail_every):
+    counter = {"requests": 0}
+    lock = threading.Lock()
+
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; with Nagle on, each
+        # reply would wait ~40 ms for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _should_fail(self):
+            with lock:
+                counter["requests"] += 1
+                return fail_every and counter["requests"] % fail_every == 0
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+
+            if self._should_fail():
+                body = json.dumps({"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}).encode()
+                self.send_response(503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            time.sleep(first_token_ms / 1000)
+            words = REPLY.split(" ")
+
+            if ":streamGenerateContent" in self.path:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                for i in range(0, len(words), words_per_chunk):
+                    text = " ".join(words[i:i + words_per_chunk]) + " "
+                    finished = i + words_per_chunk >= len(words)
+                    event = f"data: {json.dumps(_candidate(text, finished))}\r\n\r\n".encode()
+                    self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+                    self.wfile.flush()
+                    time.sleep(token_ms / 1000)
+
+                self.wfile.write(b"0\r\n\r\n")
+                return
+
+            body = json.dumps(_candidate(REPLY, True)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            body = json.dumps({"models": [{"name": "models/gemini-2.5-flash"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FakeGeminiHandler
+
+
+def serve(port=8085, first_token_ms=300, token_ms=40, words_per_chunk=4, fail_every=0):
+    """Start the fake server in a daemon thread and return it (``server.shutdown()`` to stop)."""
+    handler = make_handler(first_token_ms, token_ms, words_per_chunk, fail_every)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=40)
+    parser.add_argument("--words-per-chunk", type=int, default=4)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with a 503")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.first_token_ms, args.token_ms, args.words_per_chunk, args.fail_every)
+    print(f"🤖 Fake Gemini listening on http://127.0.0.1:{args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
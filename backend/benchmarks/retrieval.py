@@ -0,0 +1,111 @@
+"""Recall-vs-latency benchmark of the ANN search backend against exact search.
+
+Run from ``backend/``::
+
+    python -m benchmarks.retrieval --queries 500 --k 5
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from chatbot.engine import get_index
+from chatbot.index import datasets_info, _load_corpus
+from chatbot.search import ExactSearch, InvertedIndexSearch
+
+
+def sample_queries(n, seed=42):
+    """Real texts from the bundled datasets, cut to chat-sized prefixes."""
+    rng = random.Random(seed)
+    texts = []
+    for info in datasets_info.values():
+        try:
+            corpus_texts, _ = _load_corpus(info)
+        except Exception:
+            continue
+        texts.extend(corpus_texts.tolist())
+
+    queries = []
+    for text in rng.sample(texts, min(n, len(texts))):
+        words = text.split()
+        queries.append(" ".join(words[:rng.randint(3, 12)]))
+    return queries
+
+
+def time_backend(backend, queries, k):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        _, rows = backend.search(query, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(set(rows.tolist()))
+    return np.array(latencies), results
+
+
+def summarize(latencies):
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+        "mean_ms": round(float(latencies.mean()), 4)
+    }
+
+
+def run(n_queries=500, k=5, max_postings=(100, 300, 1000, 3000)):
+    index = get_index()
+    queries = sample_queries(n_queries)
+
+    exact_latencies, exact_results = time_backend(ExactSearch(index), queries, k)
+    report = {
+        "rows": int(index["manifest"]["shape"][0]),
+        "queries": len(queries),
+        "k": k,
+        "exact": summarize(exact_latencies),
+        "ann": []
+    }
+
+    for limit in max_postings:
+        latencies, results = time_backend(InvertedIndexSearch(index, max_postings=limit), queries, k)
+        recalls = [
+            len(found & truth) / len(truth)
+            for found, truth in zip(results, exact_results)
+            if truth
+        ]
+        report["ann"].append({
+            "max_postings": limit,
+            f"recall@{k}": round(float(np.mean(recalls)) if recalls else 1.0, 4),
+            **summarize(latencies)
+        })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = parser.parse_args()
+
+    report = run(args.queries, args.k)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n📊 {report['queries']} queries over {report['rows']} rows (k={report['k']})\n")
+    exact = report["exact"]
+    print(f"   exact             p50 {exact['p50_ms']:.3f} ms   p95 {exact['p95_ms']:.3f} ms")
+    recall_key = f"recall@{report['k']}"
+    for row in report["ann"]:
+        print(
+            f"   ann (max {row['max_postings']:>5})  p50 {row['p50_ms']:.3f} ms   "
+            f"p95 {row['p95_ms']:.3f} ms   {recall_key} {row[recall_key]:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
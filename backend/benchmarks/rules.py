@@ -0,0 +1,87 @@
+"""Rule lookup cost as the rule count grows: compiled matcher vs substring loops.
+
+Run from ``backend/``::
+
+    python -m benchmarks.rules
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from chatbot.rules import RULES, compile_rules, match_rule
+
+MESSAGES = [
+    "i feel so stressed about my exams",
+    "i have not been able to sleep well this week",
+    "what should i eat for a healthier diet",
+    "today was a normal day nothing special happened at all",
+]
+
+
+def synthetic_rules(count, seed=7):
+    """The real RULES followed by ``count`` made-up intents that never match."""
+    rng = random.Random(seed)
+    rules = list(RULES)
+    for i in range(count):
+        keywords = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 10)))
+            for _ in range(5)
+        ]
+        rules.append({"intent": f"synthetic_{i}", "keywords": keywords, "response": ""})
+    return rules
+
+
+def naive_match(rules, message):
+    msg = message.lower()
+    for rule in rules:
+        for keyword in rule["keywords"]:
+            if keyword in msg:
+                return rule
+    return None
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES)) * 1e6
+
+
+def run(counts=(10, 100, 1000, 10000), repeat=200):
+    report = []
+    for count in counts:
+        rules = synthetic_rules(count)
+        compiled = compile_rules(rules)
+        report.append({
+            "rules": len(rules),
+            "keywords": len(compiled["phrases"]),
+            "compiled_us": round(per_call_us(lambda m: match_rule(compiled, m), repeat), 3),
+            "naive_us": round(per_call_us(lambda m: naive_match(rules, m), max(1, repeat // 10)), 3)
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print the raw JSON report")
+    args = parser.parse_args()
+
+    report = run()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("\n📊 Rule lookup cost per message\n")
+    for row in report:
+        print(
+            f"   {row['rules']:>6} rules / {row['keywords']:>6} keywords   "
+            f"compiled {row['compiled_us']:>8.2f} µs   naive {row['naive_us']:>10.2f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
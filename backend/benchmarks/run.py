@@ -0,0 +1,439 @@
+"""Latency and throughput suite for the ML, retrieval and tracker hot paths.
+
+Every case runs in its own subprocess (so peak RSS and cold start are the
+case's own) against mongomock (``pip install mongomock``), or a scratch
+database with ``--mongod``, and
+the fake Gemini server. Each row reports p50/p95/p99 latency, throughput and
+peak RSS; the whole report is JSON. Run from ``backend/``::
+
+    python -m benchmarks.run                          # every case, compared with the baseline
+    python -m benchmarks.run --quick --case bot_reply # fewer samples, one case
+    python -m benchmarks.run --save-baseline          # store this run as the baseline
+
+With a baseline present the run exits 1 when any row got slower (p95),
+lost throughput or grew its peak RSS beyond the tolerances. The committed
+``benchmarks/baseline.json`` is a full run on one development machine
+(its ``meta`` says which); on other hardware, save your own first.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+BASELINE_PATH = os.getenv("BENCH_BASELINE", os.path.join(BENCH_DIR, "baseline.json"))
+SCRATCH_DB = "wellnest_bench"
+
+# 🔹 Regression thresholds: relative slack, plus an absolute floor so
+# microsecond-scale rows don't fail on timer noise
+LATENCY_TOLERANCE = float(os.getenv("BENCH_LATENCY_TOLERANCE", "0.25"))
+LATENCY_FLOOR_MS = float(os.getenv("BENCH_LATENCY_FLOOR_MS", "0.05"))
+THROUGHPUT_TOLERANCE = float(os.getenv("BENCH_THROUGHPUT_TOLERANCE", "0.20"))
+RSS_TOLERANCE = float(os.getenv("BENCH_RSS_TOLERANCE", "0.15"))
+
+# 🔹 Per-case parameters (rows per corpus scale, synthetic rules, logs per user)
+CORPUS_SCALES = [0.25, 1, 4]
+RULE_COUNTS = [10, 1000, 10000]
+LOGS_PER_USER = [10, 365, 3000]
+PREDICT_BATCH = 64
+COLD_START_RUNS = 5
+# 🔹 Untimed calls before each measurement (on their own inputs, see measure)
+WARMUP_CALLS = 10
+
+MESSAGES = [
+    "i feel so stressed about my exams",
+    "i have not been able to sleep well this week",
+    "what should i eat for a healthier diet",
+    "today was a normal day nothing special happened at all",
+    "i am so happy my friends threw me a surprise party",
+    "i keep worrying that something bad is going to happen",
+]
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def summarize(latencies_ms, seconds, items=None):
+    """Percentiles of per-call latency and calls (or ``items``) per second."""
+    samples = np.asarray(latencies_ms)
+    return {
+        "n": len(samples),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+        "throughput_per_s": round((items or len(samples)) / seconds, 1),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def measure(fn, inputs, warmup=WARMUP_CALLS):
+    """Call ``fn`` once per input, sequentially; returns (latencies in ms, wall seconds).
+
+    The first ``warmup`` inputs are only used to warm up and the rest are
+    timed, so a timed call never repeats a warmup input that the reply or
+    predict cache would answer. Callers pass ``samples + warmup`` inputs.
+    """
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = []
+    began = time.perf_counter()
+    for item in inputs[warmup:]:
+        started = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, time.perf_counter() - began
+
+
+def unique_messages(count, seed=42):
+    """Distinct chat-sized messages (a unique tail token), so no call is answered from a cache."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(MESSAGES)} n{i}" for i in range(count)]
+
+
+# -------------------------------
+# Worker side: one case per process
+# -------------------------------
+def _use_mongomock():
+    import mongomock
+    from database import db as database_db
+
+    database_db._client = mongomock.MongoClient()
+    database_db._client_pid = os.getpid()
+
+
+def _start_fake_gemini():
+    from benchmarks.fake_gemini import serve
+
+    server = serve(port=0, first_token_ms=0, token_ms=0)
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("GEMINI_API_KEY", "fake")
+    return server
+
+
+def _app_client():
+    # Imported late: the fake Gemini URL and the database must be in place first
+    from app import app
+    return app.test_client()
+
+
+def case_predict_single(samples):
+    client = _app_client()
+    texts = unique_messages(samples + WARMUP_CALLS)
+    latencies, seconds = measure(lambda text: client.post("/predict", json={"text": text}), texts)
+    return [dict(key="single", **summarize(latencies, seconds))]
+
+
+def case_predict_batch(samples):
+    client = _app_client()
+    texts = unique_messages((samples + 2) * PREDICT_BATCH, seed=7)
+    batches = [texts[i:i + PREDICT_BATCH] for i in range(0, len(texts), PREDICT_BATCH)]
+    latencies, seconds = measure(lambda batch: client.post("/predict/batch", json={"texts": batch}), batches, warmup=2)
+    # Throughput in texts per second, latency per request of PREDICT_BATCH texts
+    return [dict(key=f"batch={PREDICT_BATCH}", **summarize(latencies, seconds, items=samples * PREDICT_BATCH))]
+
+
+def scaled_index(index, scale):
+    """The chatbot index with every corpus cut or tiled to ``scale`` times its rows."""
+    rows, offsets, answers = [], [0], {}
+    for corpus, name in enumerate(index["names"]):
+        start, end = int(index["offsets"][corpus]), int(index["offsets"][corpus + 1])
+        count = max(1, int(round((end - start) * scale)))
+        picked = np.arange(count) % (end - start)
+        rows.append(start + picked)
+        offsets.append(offsets[-1] + count)
+        answers[name] = [index["answers"][name][i] for i in picked]
+
+    rows = np.concatenate(rows)
+    matrix = index["matrix"][rows]
+    return dict(
+        index,
+        matrix=matrix,
+        matrix_t=matrix.T.tocsr(),
+        offsets=np.array(offsets, dtype=np.int64),
+        row_weights=index["row_weights"][rows],
+        answers=answers,
+        postings=None
+    )
+
+
+def case_bot_reply(samples):
+    from benchmarks.retrieval import sample_queries
+    from chatbot import engine
+    from chatbot.search import make_backend
+    from ml.cache import normalize_text
+
+    full = engine.get_index()
+    # Dataset texts that no rule answers, so every call reaches the search
+    # Distinct after normalisation (the reply cache key), so no call is a cache hit
+    queries = {normalize_text(q): q for q in sample_queries((samples + WARMUP_CALLS) * 2)}.values()
+    messages = [q for q in queries if engine.rule_based_reply(q) is None][:samples + WARMUP_CALLS]
+    report = []
+    for scale in CORPUS_SCALES:
+        # Exact search: the tiled matrix has no postings lists for the ANN backend
+        engine._index = scaled_index(full, scale)
+        engine._searcher = make_backend(engine._index, "exact")
+        engine.reply_cache.clear()
+        latencies, seconds = measure(engine.get_bot_reply, [f"{m} s{scale}" for m in messages])
+        report.append(dict(key=f"rows={engine._index['matrix'].shape[0]}", **summarize(latencies, seconds)))
+    return report
+
+
+def case_rule_reply(samples):
+    from benchmarks.rules import synthetic_rules
+    from chatbot import engine
+    from chatbot.rules import compile_rules
+
+    messages = unique_messages(samples + WARMUP_CALLS)
+    report = []
+    for count in RULE_COUNTS:
+        rules = synthetic_rules(count)
+        engine.COMPILED_RULES = compile_rules(rules)
+        latencies, seconds = measure(engine.rule_based_reply, messages)
+        report.append(dict(key=f"rules={len(rules)}", **summarize(latencies, seconds)))
+    return report
+
+
+def case_cold_start(samples):
+    """Import of chatbot.engine and its first reply, each in a fresh interpreter."""
+    script = (
+        "import json, time\n"
+        "started = time.perf_counter()\n"
+        "import chatbot.engine as engine\n"
+        "imported = time.perf_counter()\n"
+        "engine.get_bot_reply('i feel so stressed about my exams')\n"
+        "print(json.dumps([(imported - started) * 1000, (time.perf_counter() - imported) * 1000]))\n"
+    )
+    imports, replies = [], []
+    began = time.perf_counter()
+    for _ in range(COLD_START_RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=BACKEND_DIR, env=os.environ,
+            capture_output=True, text=True, check=True
+        ).stdout
+        import_ms, reply_ms = json.loads(output.strip().splitlines()[-1])
+        imports.append(import_ms)
+        replies.append(reply_ms)
+    seconds = time.perf_counter() - began
+    # Peak RSS of the fresh interpreters, not of this worker
+    children_rss = round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+    return [
+        dict(summarize(imports, seconds), key="import", peak_rss_mb=children_rss),
+        dict(summarize(replies, seconds), key="first_reply", peak_rss_mb=children_rss)
+    ]
+
+
+def case_tracker(samples):
+    from bson import ObjectId
+
+    from database.db import daily_logs
+    from database.tracker import rebuild_summary
+
+    client = _app_client()
+    report = []
+    for count in LOGS_PER_USER:
+        user_id = ObjectId()
+        today = datetime.utcnow()
+        daily_logs.insert_many([
+            {"user_id": user_id, "mood": "happy", "date": today - timedelta(days=i), "createdAt": today}
+            for i in range(count)
+        ])
+        rebuild_summary(user_id)
+        latencies, seconds = measure(lambda _: client.get(f"/api/tracker/{user_id}"), list(range(samples + WARMUP_CALLS)))
+        report.append(dict(key=f"logs={count}", **summarize(latencies, seconds)))
+    return report
+
+
+def case_chat_llm(samples):
+    """/api/chat for messages the router sends to (fake, zero-latency) Gemini: our own overhead."""
+    client = _app_client()
+    messages = [f"zqx{i} vrm{i} plk{i}" for i in range(samples + WARMUP_CALLS)]
+    latencies, seconds = measure(lambda message: client.post("/api/chat", json={"message": message}), messages)
+    return [dict(key="llm", **summarize(latencies, seconds))]
+
+
+CASES = {
+    "predict_single": (case_predict_single, 500),
+    "predict_batch": (case_predict_batch, 50),
+    "bot_reply": (case_bot_reply, 300),
+    "rule_reply": (case_rule_reply, 2000),
+    "cold_start": (case_cold_start, COLD_START_RUNS),
+    "tracker": (case_tracker, 300),
+    "chat_llm": (case_chat_llm, 200),
+}
+
+
+def run_worker(case, samples, mongod, result_path):
+    if mongod:
+        from database.db import get_client
+        get_client().drop_database(SCRATCH_DB)
+    else:
+        _use_mongomock()
+    server = _start_fake_gemini()
+    try:
+        fn, default_samples = CASES[case]
+        rows = fn(samples or default_samples)
+    finally:
+        server.shutdown()
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+
+
+# -------------------------------
+# Driver: run cases, compare with the baseline
+# -------------------------------
+def run_case(case, samples=None, mongod=False):
+    env = dict(os.environ)
+    # Cold caches on every run: no shared inference tier, scratch database
+    env.pop("INFERENCE_CACHE_DB", None)
+    env["MONGO_DB"] = SCRATCH_DB
+    fd, result_path = tempfile.mkstemp(suffix=".json", prefix="bench-")
+    os.close(fd)
+    command = [sys.executable, "-m", "benchmarks.run", "--worker", case, "--result", result_path]
+    if samples:
+        command += ["--samples", str(samples)]
+    if mongod:
+        command.append("--mongod")
+
+    try:
+        completed = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{case} failed:\n{completed.stderr[-2000:]}")
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def _model_version():
+    from ml.registry import current_version
+    return current_version() or "legacy"
+
+
+def run(cases=None, quick=False, mongod=False):
+    report = {
+        "meta": {
+            "startedAt": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "modelVersion": _model_version(),
+            "database": "mongod" if mongod else "mongomock",
+            "quick": quick
+        },
+        "cases": {}
+    }
+    for case in cases or CASES:
+        samples = max(COLD_START_RUNS, CASES[case][1] // 5) if quick else None
+        print(f"⏱️ {case} ...", file=sys.stderr)
+        report["cases"][case] = run_case(case, samples, mongod)
+    return report
+
+
+def compare(report, baseline):
+    """Every metric of every row that regressed beyond its tolerance."""
+    regressions = []
+    for case, rows in report["cases"].items():
+        before = {row["key"]: row for row in baseline.get("cases", {}).get(case, [])}
+        for row in rows:
+            old = before.get(row["key"])
+            if old is None:
+                continue
+            checks = [
+                ("p95_ms", row["p95_ms"] > old["p95_ms"] * (1 + LATENCY_TOLERANCE) + LATENCY_FLOOR_MS),
+                ("throughput_per_s", row["throughput_per_s"] < old["throughput_per_s"] * (1 - THROUGHPUT_TOLERANCE)),
+                ("peak_rss_mb", row["peak_rss_mb"] > old["peak_rss_mb"] * (1 + RSS_TOLERANCE)),
+            ]
+            for metric, regressed in checks:
+                if regressed:
+                    regressions.append({
+                        "case": case, "key": row["key"], "metric": metric,
+                        "baseline": old[metric], "current": row[metric]
+                    })
+    return regressions
+
+
+def print_report(report):
+    for case, rows in report["cases"].items():
+        print(f"\n📊 {case}")
+        for row in rows:
+            print(
+                f"   {row['key']:<16} p50 {row['p50_ms']:>9.3f} ms   p95 {row['p95_ms']:>9.3f} ms   "
+                f"p99 {row['p99_ms']:>9.3f} ms   {row['throughput_per_s']:>10.1f}/s   "
+                f"RSS {row['peak_rss_mb']:>7.1f} MB"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="run only this case (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="a fifth of the samples (smoke run)")
+    parser.add_argument("--mongod", action="store_true", help=f"use MONGO_URI (database {SCRATCH_DB}) instead of mongomock")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--out", help="also write the JSON report here")
+    parser.add_argument("--json", action="store_true", help="print the raw JSON report")
+    # Internal: a single case inside the subprocess
+    parser.add_argument("--worker", choices=sorted(CASES), help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--samples", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.samples, args.mongod, args.result)
+        return
+
+    report = run(args.case, args.quick, args.mongod)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    for path in filter(None, [args.out, args.baseline if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {path}", file=sys.stderr)
+
+    if baseline is None:
+        if not args.save_baseline:
+            print(f"\nℹ️ No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return
+
+    # The committed baseline is one machine's numbers: say when this isn't that machine
+    differs = [
+        key for key in ("platform", "cpus", "database")
+        if baseline.get("meta", {}).get(key) != report["meta"][key]
+    ]
+    if differs:
+        print(f"\n⚠️ Baseline was recorded with a different {', '.join(differs)}; "
+              f"re-run with --save-baseline on this machine for a meaningful comparison", file=sys.stderr)
+
+    if report["regressions"]:
+        print(f"\n🚨 {len(report['regressions'])} regression(s) against {args.baseline}:", file=sys.stderr)
+        for r in report["regressions"]:
+            print(f"   {r['case']} {r['key']} {r['metric']}: {r['baseline']} -> {r['current']}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n✅ No regressions against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Visit-streak writes: correctness under concurrency and writes per second.
+
+Runs against a scratch database on the configured MongoDB (update
+pipelines need a real mongod, 5.0+ for $dateDiff)::
+
+    python -m benchmarks.visit_streak --check      # concurrent visits vs the Python rules
+    python -m benchmarks.visit_streak --users 200 --seconds 5 --threads 32
+
+``--check`` replays many simulated days with every visit of a day fired
+concurrently from a thread pool, and compares the stored streak with
+``update_visit_streak`` applied once per day. The benchmark compares the
+old read-modify-write endpoint path with ``record_visit``.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from database.db import get_client
+from database.streak import record_visit, update_visit_streak
+
+SCRATCH_DB = "wellnest_bench"
+
+
+def _scratch_users():
+    collection = get_client()[SCRATCH_DB]["users"]
+    collection.drop()
+    return collection
+
+
+def _streak_only(doc):
+    streak = dict(doc.get("streak", {}))
+    streak.pop("lastVisit", None)
+    return streak, sorted(doc.get("badges", []))
+
+
+def check(days=60, visits_per_day=16, threads=16, seed=7):
+    """Returns a list of mismatches (empty when concurrent == serial)."""
+    collection = _scratch_users()
+    rng = random.Random(seed)
+    user_id = collection.insert_one({"email": "streak-check@example.com"}).inserted_id
+
+    expected = {}
+    day = datetime(2026, 1, 1, 8)
+    mismatches = []
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for n in range(days):
+            # Mostly consecutive days, with gaps to exercise freezes and resets
+            day += timedelta(days=rng.choice([1, 1, 1, 1, 2, 3]))
+            stamps = [day + timedelta(minutes=rng.randrange(600)) for _ in range(visits_per_day)]
+            list(executor.map(lambda now: record_visit(user_id, now, collection), stamps))
+
+            expected = update_visit_streak(expected, min(stamps))
+            stored = collection.find_one({"_id": user_id})
+            if _streak_only(stored) != _streak_only(expected):
+                mismatches.append({
+                    "day": n,
+                    "stored": _streak_only(stored),
+                    "expected": _streak_only(expected)
+                })
+
+    collection.drop()
+    return mismatches
+
+
+def _legacy_visit(collection, user_id):
+    user = collection.find_one({"_id": user_id})
+    updated = update_visit_streak(user)
+    collection.update_one({"_id": user_id}, {"$set": updated})
+
+
+def bench(users=200, seconds=5, threads=32):
+    results = {}
+    for name in ("legacy", "atomic"):
+        collection = _scratch_users()
+        ids = [ObjectId() for _ in range(users)]
+        collection.insert_many([{"_id": user_id} for user_id in ids])
+
+        count = 0
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def worker():
+            nonlocal count
+            done = 0
+            while time.perf_counter() < deadline:
+                user_id = random.choice(ids)
+                if name == "legacy":
+                    _legacy_visit(collection, user_id)
+                else:
+                    record_visit(user_id, collection=collection)
+                done += 1
+            with lock:
+                count += done
+
+        began = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for _ in range(threads):
+                executor.submit(worker)
+        elapsed = time.perf_counter() - began
+
+        results[name] = {
+            "visits": count,
+            "visitsPerSec": round(count / elapsed, 1)
+        }
+        collection.drop()
+
+    results["speedup"] = round(results["atomic"]["visitsPerSec"] / max(results["legacy"]["visitsPerSec"], 1e-9), 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only run the concurrency check")
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    mismatches = check(days=args.days, threads=args.threads)
+    if mismatches:
+        print(json.dumps(mismatches, indent=2, default=str))
+        print(f"\n🚨 {len(mismatches)} days diverged from the serial streak rules")
+        sys.exit(1)
+    print(f"✅ {args.days} days of concurrent visits match the serial streak rules")
+
+    if not args.check:
+        print(json.dumps(bench(args.users, args.seconds, args.threads), indent=2))
+
+
+if __name__ == "__main__":
+    main()
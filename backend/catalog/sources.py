@@ -0,0 +1,43 @@
+import os
+
+# 🔹 Go to project root (wellnest)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATASET_DIR = os.path.join(BASE_DIR, "dataset")
+
+# 🔹 Canonical emotion labels (dair-ai/emotion ids): every source's label
+# ids and names are mapped onto this list
+EMOTION_NAMES = ["sadness", "joy", "love", "anger", "fear", "surprise"]
+SENTIMENT_NAMES = ["negative", "neutral", "positive"]
+
+# 🔹 Every corpus the app reads. ``columns`` maps raw column -> catalog
+# column; ``labels`` is the category list of the ``label`` column (its
+# position is ``label_id``); ``label_ids`` says the raw labels are ids.
+SOURCES = {
+    "emotion": {
+        "files": [os.path.join(DATASET_DIR, "emotion_dataset.csv")],
+        "columns": {"text": "text", "label": "label"},
+        "labels": EMOTION_NAMES,
+        "label_ids": True
+    },
+    "emotion_nlp": {
+        # Same dair-ai corpus as "emotion", split and with label names, as text;label lines
+        "files": [
+            os.path.join(DATASET_DIR, "emotion_nlp", f"{split}.txt")
+            for split in ("train", "val", "test")
+        ],
+        "sep": ";",
+        "header": None,
+        "columns": {0: "text", 1: "label"},
+        "labels": EMOTION_NAMES,
+        "split_column": True
+    },
+    "sentiment": {
+        "files": [os.path.join(DATASET_DIR, "sentiment_analysis", "sentiment_analysis.csv")],
+        "columns": {"text": "text", "sentiment": "label", "Platform": "platform"},
+        "labels": SENTIMENT_NAMES
+    },
+    "faq": {
+        "files": [os.path.join(DATASET_DIR, "chatbot_faq", "Mental_Health_FAQ.csv")],
+        "columns": {"Question_ID": "question_id", "Questions": "text", "Answers": "answer"}
+    }
+}
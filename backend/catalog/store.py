@@ -0,0 +1,254 @@
+"""Dataset catalog: every corpus in catalog/sources.py converted once to Parquet.
+
+Each source becomes one zstd-compressed Parquet file with typed columns
+and a categorical ``label`` (plus its canonical ``label_id``), and
+``manifest.json`` records schema, row count, label mapping and the
+content hash of the raw inputs. Readers use ``load`` (column projection,
+memory-mapped) instead of re-parsing CSV/TXT files::
+
+    python -m catalog.store            # convert sources that changed
+    python -m catalog.store --force    # convert everything
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+# pandas and pyarrow are imported where they're used: reading the manifest
+# (the chatbot index's freshness check) must not load them
+
+from .sources import BASE_DIR, DATASET_DIR, SOURCES
+
+CATALOG_DIR = os.getenv("DATASET_CATALOG_DIR", os.path.join(DATASET_DIR, "catalog"))
+MANIFEST_FILE = "manifest.json"
+CATALOG_FORMAT = 1
+COMPRESSION = "zstd"
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def inputs_sha256(files):
+    """One hash over the contents of every input file of a source."""
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(file_sha256(path).encode())
+    return digest.hexdigest()
+
+
+def fingerprint(files):
+    # Cheap change check (size + mtime) so an unchanged catalog costs a few stat() calls
+    return [[os.path.getsize(path), int(os.stat(path).st_mtime_ns)] for path in files]
+
+
+def _relative(path):
+    return os.path.relpath(path, BASE_DIR)
+
+
+def read_manifest(catalog_dir=CATALOG_DIR):
+    try:
+        with open(os.path.join(catalog_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != CATALOG_FORMAT:
+        return None
+    return manifest
+
+
+def _write_manifest(manifest, catalog_dir):
+    tmp = os.path.join(catalog_dir, f".{MANIFEST_FILE}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(catalog_dir, MANIFEST_FILE))
+
+
+def _read_source(spec):
+    """Raw files of one source -> typed DataFrame with the catalog column names."""
+    import pandas as pd
+
+    frames = []
+    for path in spec["files"]:
+        df = pd.read_csv(
+            path,
+            sep=spec.get("sep", ","),
+            header=spec.get("header", "infer"),
+            usecols=list(spec["columns"]),
+            # The ;-separated text files use no quoting at all
+            quoting=csv.QUOTE_NONE if spec.get("sep") == ";" else csv.QUOTE_MINIMAL
+        ).rename(columns=spec["columns"])
+        if spec.get("split_column"):
+            df["split"] = os.path.splitext(os.path.basename(path))[0]
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+
+    df["text"] = df["text"].astype("string").str.strip()
+    df = df[df["text"].notna() & (df["text"] != "")]
+
+    labels = spec.get("labels")
+    if labels:
+        if spec.get("label_ids"):
+            ids = pd.to_numeric(df["label"], errors="coerce")
+            names = ids.map(lambda i: labels[int(i)] if 0 <= i < len(labels) else None)
+        else:
+            names = df["label"].astype("string").str.strip().str.lower()
+
+        unknown = set(names.dropna()) - set(labels)
+        if unknown or names.isna().any():
+            raise ValueError(f"Labels outside {labels}: {sorted(map(str, unknown)) or 'missing'}")
+
+        df["label"] = pd.Categorical(names, categories=labels)
+        df["label_id"] = df["label"].cat.codes.astype("int8")
+
+    for column in df.columns:
+        if column not in ("text", "label", "label_id", "answer") and (
+            df[column].dtype == object or pd.api.types.is_string_dtype(df[column])
+        ):
+            # Low-cardinality metadata (platform, split) stored dictionary-encoded
+            df[column] = df[column].astype("string").str.strip().astype("category")
+    if "answer" in df.columns:
+        df["answer"] = df["answer"].astype("string")
+
+    return df.reset_index(drop=True)
+
+
+def build_source(name, catalog_dir=CATALOG_DIR):
+    """Convert one source and return its manifest entry."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    spec = SOURCES[name]
+    df = _read_source(spec)
+
+    file = f"{name}.parquet"
+    tmp = os.path.join(catalog_dir, f".{file}.{os.getpid()}")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, tmp, compression=COMPRESSION)
+    os.replace(tmp, os.path.join(catalog_dir, file))
+
+    return {
+        "file": file,
+        "inputs": [_relative(path) for path in spec["files"]],
+        "sha256": inputs_sha256(spec["files"]),
+        "fingerprint": fingerprint(spec["files"]),
+        "rows": table.num_rows,
+        "schema": {field.name: str(field.type) for field in table.schema},
+        "labels": spec.get("labels"),
+        "builtAt": datetime.utcnow().isoformat()
+    }
+
+
+def _current(entry, spec, catalog_dir):
+    """``(current, refreshed)``: does the Parquet file still match the raw inputs,
+    and was only the entry's fingerprint stale (refreshed in place)?"""
+    if not entry or not os.path.exists(os.path.join(catalog_dir, entry["file"])):
+        return False, False
+    if entry.get("labels") != spec.get("labels"):
+        return False, False
+
+    stat = fingerprint(spec["files"])
+    if entry.get("fingerprint") == stat:
+        return True, False
+    # Touched but maybe not changed: fall back to the content hash
+    if entry.get("sha256") == inputs_sha256(spec["files"]):
+        entry["fingerprint"] = stat
+        return True, True
+    return False, False
+
+
+def build_catalog(force=False, catalog_dir=CATALOG_DIR):
+    """Convert every source whose inputs changed; returns the manifest.
+
+    A source that fails to convert keeps its previous Parquet file and
+    entry, and the manifest is only rewritten when something changed.
+    """
+    os.makedirs(catalog_dir, exist_ok=True)
+    stored = read_manifest(catalog_dir)
+    previous = (stored or {}).get("sources", {})
+    manifest = {"format": CATALOG_FORMAT, "sources": {}}
+    changed = stored is None
+
+    for name, spec in SOURCES.items():
+        missing = [path for path in spec["files"] if not os.path.exists(path)]
+        if missing:
+            print(f"⚠️ {name}: missing {', '.join(_relative(p) for p in missing)}, skipped")
+            continue
+
+        entry = previous.get(name)
+        current, refreshed = (False, False) if force else _current(entry, spec, catalog_dir)
+        if current:
+            manifest["sources"][name] = entry
+            changed = changed or refreshed
+            continue
+
+        try:
+            manifest["sources"][name] = build_source(name, catalog_dir)
+            changed = True
+            print(f"✅ {name}: {manifest['sources'][name]['rows']} rows -> {name}.parquet")
+        except Exception as e:
+            if entry and os.path.exists(os.path.join(catalog_dir, entry["file"])):
+                manifest["sources"][name] = entry
+                print(f"❌ Failed to convert {name}, keeping the previous {entry['file']}: {e}")
+            else:
+                print(f"❌ Failed to convert {name}: {e}")
+
+    if changed or set(previous) - set(manifest["sources"]):
+        _write_manifest(manifest, catalog_dir)
+    return manifest
+
+
+def ensure_catalog():
+    """The manifest, converting stale sources first (checked once per process)."""
+    global _manifest
+    if _manifest is not None:
+        return _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = build_catalog()
+    return _manifest
+
+
+def source_info(name):
+    entry = ensure_catalog()["sources"].get(name)
+    if entry is None:
+        raise FileNotFoundError(f"Dataset source '{name}' is not in the catalog")
+    return entry
+
+
+def load_table(name, columns=None, memory_map=True):
+    """Arrow table of one source, reading only ``columns`` (memory-mapped by default)."""
+    import pyarrow.parquet as pq
+
+    entry = source_info(name)
+    return pq.read_table(
+        os.path.join(CATALOG_DIR, entry["file"]),
+        columns=columns,
+        memory_map=memory_map
+    )
+
+
+def load(name, columns=None, memory_map=True):
+    """DataFrame of one source; ``label`` comes back as a pandas Categorical."""
+    return load_table(name, columns, memory_map).to_pandas()
+
+
+# 🔹 Build: python -m catalog.store [--force]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="convert every source again")
+    args = parser.parse_args()
+
+    for name, entry in build_catalog(force=args.force)["sources"].items():
+        labels = f", labels {entry['labels']}" if entry["labels"] else ""
+        print(f"📦 {name}: {entry['rows']} rows, columns {list(entry['schema'])}{labels}")
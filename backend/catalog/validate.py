@@ -0,0 +1,409 @@
+"""Dataset validation engine: parallel, chunked, cached by file hash.
+
+Every ``.csv`` / ``.txt`` under ``dataset/`` (subdirectories included) is
+profiled in a process pool, streaming each file in chunks:
+
+- rows, missing text/labels, duplicate rows and duplicate texts
+- label distribution, imbalance, and label drift (Jensen-Shannon) against
+  the previous report and against sibling files (train/val/test splits)
+- text-length histogram and percentiles
+- near-duplicate texts via MinHash + LSH banding
+
+Profiles are cached by content hash, so unchanged files cost one hash.
+The result is a JSON report with ``passed`` for CI and training to gate on.
+"""
+import csv
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .sources import BASE_DIR, DATASET_DIR
+from .store import CATALOG_DIR, file_sha256
+
+# 🔹 Bump when the checks change so cached profiles are recomputed
+ENGINE_VERSION = 1
+
+CACHE_PATH = os.getenv("DATASET_VALIDATION_CACHE", os.path.join(CATALOG_DIR, "validation_cache.json"))
+REPORT_PATH = os.getenv("DATASET_VALIDATION_REPORT", os.path.join(CATALOG_DIR, "validation_report.json"))
+
+CHUNK_ROWS = 50_000
+EXTENSIONS = (".csv", ".txt")
+# Generated output, validated through its inputs
+SKIP_DIRS = {"catalog", "merged"}
+
+TEXT_COLUMNS = ("text", "questions")
+LABEL_COLUMNS = ("label", "sentiment")
+
+LENGTH_BINS = [0, 16, 32, 64, 128, 256, 512, 1024, 4096]
+
+# 🔹 MinHash: 64 hashes in 8 bands of 8 -> pairs above ~0.77 Jaccard collide
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 8
+MINHASH_BATCH = 5_000
+SHINGLE_WORDS = 3
+# a * h stays below 2**63 for 32-bit shingle hashes, so uint64 never overflows
+MERSENNE_PRIME = (1 << 31) - 1
+NEAR_DUP_THRESHOLD = 0.8
+NEAR_DUP_EXAMPLES = 5
+
+# 🔹 Gates: "fail" blocks CI/training, "warn" only with --strict
+MAX_MISSING_TEXT = 0.01
+MAX_IMBALANCE = 0.70
+MAX_DUPLICATE_RATIO = 0.05
+MAX_NEAR_DUP_RATIO = 0.05
+MAX_LABEL_DRIFT = 0.05
+
+_rng = np.random.default_rng(20240601)
+_MINHASH_A = _rng.integers(1, MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _rng.integers(0, MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def find_files(root=DATASET_DIR):
+    found = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+        for file in sorted(files):
+            if file.endswith(EXTENSIONS) and not file.startswith("."):
+                found.append(os.path.join(directory, file))
+    return found
+
+
+def _relative(path):
+    return os.path.relpath(path, BASE_DIR)
+
+
+def _chunks(path):
+    if path.endswith(".txt"):
+        # emotion_nlp layout: one "text;label" per line, no header, no quoting
+        return pd.read_csv(
+            path, sep=";", header=None, names=["text", "label"],
+            quoting=csv.QUOTE_NONE, chunksize=CHUNK_ROWS
+        )
+    return pd.read_csv(path, chunksize=CHUNK_ROWS)
+
+
+def _pick(columns, candidates):
+    lowered = {c.lower().strip(): c for c in columns}
+    for name in candidates:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _normalized(texts):
+    return texts.astype(str).str.lower().str.split().str.join(" ")
+
+
+def _shingles(text):
+    words = text.split()
+    if len(words) <= SHINGLE_WORDS:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    return [zlib.crc32(g.encode("utf-8")) for g in grams]
+
+
+def minhash(texts):
+    """``(len(texts), MINHASH_PERMUTATIONS)`` signatures, one vectorised pass per batch."""
+    signatures = []
+    for start in range(0, len(texts), MINHASH_BATCH):
+        batch = texts[start:start + MINHASH_BATCH]
+        shingles = [_shingles(t) for t in batch]
+        sizes = np.fromiter((len(s) for s in shingles), dtype=np.int64, count=len(shingles))
+        flat = np.fromiter((h for s in shingles for h in s), dtype=np.uint64, count=int(sizes.sum()))
+
+        # (a * h + b) mod p for every shingle and permutation, then min per text
+        hashed = (flat[:, None] * _MINHASH_A[None, :] + _MINHASH_B[None, :]) % np.uint64(MERSENNE_PRIME)
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        signatures.append(np.minimum.reduceat(hashed, offsets, axis=0).astype(np.uint32))
+    if not signatures:
+        return np.zeros((0, MINHASH_PERMUTATIONS), dtype=np.uint32)
+    return np.vstack(signatures)
+
+
+def near_duplicates(texts, signatures):
+    """Pairs of distinct texts whose estimated Jaccard similarity passes the threshold."""
+    rows_per_band = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    candidates = set()
+    for band in range(MINHASH_BANDS):
+        first_seen = {}
+        block = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        for row, key in enumerate(map(bytes, block)):
+            # Pair with the bucket's first row only: no quadratic blow-up on big buckets
+            if key in first_seen:
+                candidates.add((first_seen[key], row))
+            else:
+                first_seen[key] = row
+
+    pairs = []
+    for a, b in sorted(candidates):
+        if texts[a] == texts[b]:
+            continue  # exact duplicates are counted separately
+        similarity = float(np.mean(signatures[a] == signatures[b]))
+        if similarity >= NEAR_DUP_THRESHOLD:
+            pairs.append((a, b, similarity))
+    return pairs
+
+
+def js_divergence(p, q):
+    """Jensen-Shannon divergence (base 2, 0..1) between two label count dicts."""
+    labels = sorted(set(p) | set(q))
+    if not labels:
+        return 0.0
+    p = np.array([p.get(l, 0) for l in labels], dtype=float)
+    q = np.array([q.get(l, 0) for l in labels], dtype=float)
+    if not p.sum() or not q.sum():
+        return 0.0
+    p, q = p / p.sum(), q / q.sum()
+    m = (p + q) / 2
+
+    def kl(a, b):
+        mask = a > 0
+        return float(np.sum(a[mask] * np.log2(a[mask] / b[mask])))
+
+    return round((kl(p, m) + kl(q, m)) / 2, 6)
+
+
+def profile_file(path, sha256=None):
+    """Stream one file and return its profile (runs in a worker process)."""
+    started = time.perf_counter()
+    profile = {"path": _relative(path), "sha256": sha256 or file_sha256(path)}
+
+    rows = 0
+    columns = None
+    text_col = label_col = None
+    missing_text = missing_label = 0
+    label_counts = {}
+    row_hashes, text_hashes, lengths, texts = [], [], [], []
+
+    try:
+        for chunk in _chunks(path):
+            if columns is None:
+                columns = [str(c) for c in chunk.columns]
+                text_col = _pick(chunk.columns, TEXT_COLUMNS)
+                label_col = _pick(chunk.columns, LABEL_COLUMNS)
+
+            rows += len(chunk)
+            row_hashes.append(_row_hashes(chunk))
+            if text_col is None:
+                continue
+
+            missing_text += int(chunk[text_col].isna().sum())
+            chunk_texts = _normalized(chunk[text_col].dropna())
+            texts.extend(chunk_texts.tolist())
+            text_hashes.append(pd.util.hash_array(chunk_texts.to_numpy(dtype=object)))
+            lengths.append(chunk[text_col].dropna().astype(str).str.len().to_numpy())
+
+            if label_col is not None:
+                missing_label += int(chunk[label_col].isna().sum())
+                for label, count in chunk[label_col].dropna().astype(str).value_counts().items():
+                    label_counts[label] = label_counts.get(label, 0) + int(count)
+    except Exception as e:
+        profile.update({"error": f"{type(e).__name__}: {e}"})
+        return profile
+
+    row_hashes = np.concatenate(row_hashes) if row_hashes else np.zeros(0, np.uint64)
+    profile.update({
+        "rows": rows,
+        "columns": columns or [],
+        "textColumn": text_col,
+        "labelColumn": label_col,
+        "duplicateRows": int(rows - len(np.unique(row_hashes)))
+    })
+
+    if text_col is not None:
+        text_hashes = np.concatenate(text_hashes) if text_hashes else np.zeros(0, np.uint64)
+        lengths = np.concatenate(lengths) if lengths else np.zeros(0, np.int64)
+        counts, _ = np.histogram(lengths, bins=LENGTH_BINS + [max(int(lengths.max(initial=0)) + 1, LENGTH_BINS[-1] + 1)])
+        pairs = near_duplicates(texts, minhash(texts))
+
+        profile.update({
+            "missingText": missing_text,
+            "duplicateTexts": int(len(text_hashes) - len(np.unique(text_hashes))),
+            "textLength": {
+                "bins": LENGTH_BINS,
+                "counts": counts.tolist(),
+                "mean": round(float(lengths.mean()), 2) if len(lengths) else 0.0,
+                "p50": int(np.percentile(lengths, 50)) if len(lengths) else 0,
+                "p95": int(np.percentile(lengths, 95)) if len(lengths) else 0,
+                "max": int(lengths.max(initial=0))
+            },
+            "nearDuplicates": {
+                "pairs": len(pairs),
+                "threshold": NEAR_DUP_THRESHOLD,
+                "examples": [
+                    {"rows": [a, b], "similarity": round(s, 3), "texts": [texts[a][:120], texts[b][:120]]}
+                    for a, b, s in pairs[:NEAR_DUP_EXAMPLES]
+                ]
+            }
+        })
+
+    if label_col is not None:
+        total = sum(label_counts.values())
+        profile.update({
+            "missingLabel": missing_label,
+            "labels": dict(sorted(label_counts.items())),
+            "imbalance": round(max(label_counts.values()) / total, 4) if total else None
+        })
+
+    profile["profileSeconds"] = round(time.perf_counter() - started, 3)
+    return profile
+
+
+def _issues(profile):
+    """(level, message) checks on one profile."""
+    if "error" in profile:
+        return [("fail", f"unreadable: {profile['error']}")]
+
+    issues = []
+    rows = profile["rows"] or 1
+    if profile["textColumn"] is None:
+        return [("info", "no text column, only row counts checked")]
+
+    if profile["missingText"] / rows > MAX_MISSING_TEXT:
+        issues.append(("fail", f"{profile['missingText']} rows without text"))
+    if profile["duplicateTexts"] / rows > MAX_DUPLICATE_RATIO:
+        issues.append(("warn", f"{profile['duplicateTexts']} duplicate texts"))
+    if profile["nearDuplicates"]["pairs"] / rows > MAX_NEAR_DUP_RATIO:
+        issues.append(("warn", f"{profile['nearDuplicates']['pairs']} near-duplicate pairs"))
+
+    if profile["labelColumn"] is not None:
+        if profile["missingLabel"]:
+            issues.append(("fail", f"{profile['missingLabel']} rows without a label"))
+        if len(profile["labels"]) < 2:
+            issues.append(("fail", "only one label, cannot train a classifier"))
+        elif profile["imbalance"] > MAX_IMBALANCE:
+            issues.append(("warn", f"highly imbalanced ({profile['imbalance']:.0%} in one label)"))
+
+    for against, value in profile.get("labelDrift", {}).items():
+        if value > MAX_LABEL_DRIFT:
+            issues.append(("warn", f"label drift vs {against}: JS {value:.3f}"))
+    return issues
+
+
+def _read_json(path):
+    if not path:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _add_drift(profiles, previous_report):
+    previous = {
+        item["path"]: item.get("labels")
+        for item in (previous_report or {}).get("files", [])
+    }
+    by_dir = {}
+    for profile in profiles:
+        if profile.get("labels"):
+            by_dir.setdefault(os.path.dirname(profile["path"]), []).append(profile)
+
+    for profile in profiles:
+        if not profile.get("labels"):
+            continue
+        drift = {}
+        old = previous.get(profile["path"])
+        if old and old != profile["labels"]:
+            drift["previous run"] = js_divergence(old, profile["labels"])
+
+        # Splits of one corpus (train/val/test) should share a label distribution
+        siblings = [
+            p for p in by_dir[os.path.dirname(profile["path"])]
+            if p is not profile and set(p["labels"]) == set(profile["labels"])
+        ]
+        if siblings:
+            rest = {}
+            for sibling in siblings:
+                for label, count in sibling["labels"].items():
+                    rest[label] = rest.get(label, 0) + count
+            drift["sibling files"] = js_divergence(rest, profile["labels"])
+        profile["labelDrift"] = drift
+
+
+def validate(paths=None, workers=None, use_cache=True, report_path=REPORT_PATH, strict=False):
+    """Profile ``paths`` (default: every dataset file) and write the JSON report."""
+    started = time.perf_counter()
+    paths = paths or find_files()
+    previous_report = _read_json(report_path)
+
+    cache = (_read_json(CACHE_PATH) or {}) if use_cache else {}
+    if cache.get("engineVersion") != ENGINE_VERSION:
+        cache = {"engineVersion": ENGINE_VERSION, "files": {}}
+
+    profiles = {}
+    pending, hashes = [], []
+    for path in paths:
+        # Cache entries are keyed by content hash, so renames and copies hit too
+        digest = file_sha256(path)
+        cached = cache["files"].get(digest)
+        if cached:
+            profiles[path] = dict(cached, path=_relative(path), cached=True)
+        else:
+            pending.append(path)
+            hashes.append(digest)
+
+    if pending:
+        workers = workers or min(len(pending), os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                fresh = list(pool.map(profile_file, pending, hashes))
+        else:
+            fresh = [profile_file(path, digest) for path, digest in zip(pending, hashes)]
+
+        for path, profile in zip(pending, fresh):
+            profiles[path] = dict(profile, cached=False)
+            if "error" not in profile:
+                cache["files"][profile["sha256"]] = profile
+
+    ordered = [profiles[path] for path in paths]
+    _add_drift(ordered, previous_report)
+
+    for profile in ordered:
+        issues = _issues(profile)
+        profile["issues"] = [{"level": level, "message": message} for level, message in issues]
+        levels = {level for level, _ in issues}
+        profile["status"] = "fail" if "fail" in levels else "warn" if "warn" in levels else "ok"
+
+    failed = [p["path"] for p in ordered if p["status"] == "fail"]
+    warned = [p["path"] for p in ordered if p["status"] == "warn"]
+    report = {
+        "generatedAt": datetime.utcnow().isoformat(),
+        "engineVersion": ENGINE_VERSION,
+        "seconds": round(time.perf_counter() - started, 3),
+        "summary": {
+            "files": len(ordered),
+            "cached": sum(1 for p in ordered if p["cached"]),
+            "rows": sum(p.get("rows", 0) for p in ordered),
+            "failed": failed,
+            "warnings": warned
+        },
+        "passed": not failed and not (strict and warned),
+        "files": ordered
+    }
+
+    if use_cache:
+        _write_json(CACHE_PATH, cache)
+    if report_path:
+        _write_json(report_path, report)
+    return report
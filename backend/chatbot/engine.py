@@ -1,79 +1,45 @@
-import pandas as pd
 import os
-from .rules import RULES
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-# 🔹 Go to project root (wellnest)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-
-# 🔹 Emotion label mapping (FIXES "feeling 0")
-EMOTION_MAP = {
-    0: "sadness",
-    1: "happiness",
-    2: "anger",
-    3: "fear",
-    4: "neutral"
-}
-
-# 🔹 Dataset configurations
-datasets_info = {
-    "faq": {
-        "path": os.path.join(BASE_DIR, "dataset", "chatbot_faq", "Mental_Health_FAQ.csv"),
-        "text_col": "questions",
-        "answer_col": "answers",
-        "response_template": "{}"
-    },
-    "emotion": {
-        "path": os.path.join(BASE_DIR, "dataset", "emotion_dataset.csv"),
-        "text_col": "text",
-        "answer_col": "label",
-        "response_template": "Based on your message, you seem to be feeling {}. How can I help?"
-    },
-    "sentiment": {
-        "path": os.path.join(BASE_DIR, "dataset", "sentiment_analysis", "sentiment_analysis.csv"),
-        "text_col": "text",
-        "answer_col": "sentiment",
-        "response_template": "Your message appears to have a {} sentiment."
-    }
-}
-
-# 🔹 Storage
-vectorizers = {}
-vectors = {}
-dfs = {}
-
-print("🔄 Loading chatbot datasets...\n")
-
-# 🔹 Load datasets
-for name, info in datasets_info.items():
-    try:
-        df = pd.read_csv(info["path"])
-        df.columns = [c.lower().strip() for c in df.columns]
-
-        text_col = info["text_col"].lower()
-        answer_col = info["answer_col"].lower()
-
-        if text_col not in df.columns or answer_col not in df.columns:
-            raise ValueError(
-                f"Missing columns. Found {df.columns.tolist()}, "
-                f"expected '{text_col}' and '{answer_col}'"
-            )
-
-        vectorizer = TfidfVectorizer(stop_words="english")
-        vec = vectorizer.fit_transform(df[text_col].astype(str))
-
-        dfs[name] = df
-        vectorizers[name] = vectorizer
-        vectors[name] = vec
-
-        print(f"✅ Loaded {name} dataset ({len(df)} rows)")
-
-    except Exception as e:
-        print(f"❌ Failed to load {name}: {e}")
-
-print("\n🚀 Chatbot engine ready.\n")
+import threading
+from ml.cache import InferenceCache
+from telemetry.logs import get_logger
+from telemetry.metrics import span
+from .rules import COMPILED_RULES, RULES_VERSION, match_rule
+from .index import datasets_info, load_index
+from .search import make_backend, locate
+
+# 🔹 Retrieval backend: "exact" (brute force) or "ann" (pruned inverted index)
+SEARCH_BACKEND = os.getenv("CHATBOT_SEARCH_BACKEND", "exact")
+
+# 🔹 Storage (loaded lazily from the prebuilt index on first use)
+_index = None
+_searcher = None
+_index_lock = threading.Lock()
+
+# 🔹 Replies to repeated messages, keyed on normalised text + engine version
+reply_cache = InferenceCache("chat")
+
+log = get_logger(__name__)
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_index()
+                for name, meta in _index["manifest"]["corpora"].items():
+                    log.info("Loaded %s index (%d rows)", name, meta["rows"])
+    return _index
+
+
+def get_searcher():
+    global _searcher
+    if _searcher is None:
+        index = get_index()
+        with _index_lock:
+            if _searcher is None:
+                _searcher = make_backend(index, SEARCH_BACKEND)
+    return _searcher
 
 # 🔹 Trim long FAQ answers (UX FIX)
 def trim_answer(text, max_length=350):
@@ -90,57 +56,71 @@ def rule_based_reply(user_message: str):
     if msg.startswith("what is") or msg.startswith("define"):
         return None
 
-    for rule in RULES:
-        for keyword in rule["keywords"]:
-            if keyword in msg:
-                return rule["response"]
+    rule = match_rule(COMPILED_RULES, msg)
+    return rule["response"] if rule else None
+
+def engine_version():
+    """Identifies the rules, index build and backend a cached reply came from."""
+    manifest = get_index()["manifest"]
+    return f"{RULES_VERSION}:{manifest['builtAt']}:{SEARCH_BACKEND}"
 
-    return None
 
 # 🔹 Main chatbot function
 def get_bot_reply(user_message: str) -> str:
-    # STEP 1: Rule-based check
-    rule_response = rule_based_reply(user_message)
-    if rule_response:
-        return rule_response
+    return score_reply(user_message)["reply"]
 
-    # STEP 2: ML-based similarity search
-    best_score = 0
-    best_dataset = None
-    best_idx = None
 
-    for name, vec in vectors.items():
-        user_vector = vectorizers[name].transform([user_message])
-        similarities = cosine_similarity(user_vector, vec)
-        max_sim = similarities.max()
+def score_reply(user_message: str) -> dict:
+    """Local reply with how it was found and how confident the engine is.
 
-        # Dataset priority
-        if name == "faq":
-            max_sim *= 1.3
-        elif name == "emotion":
-            max_sim *= 1.1
+    ``source`` is ``"rule"``, a dataset name, or ``"fallback"``;
+    ``confidence`` is 1.0 for rule hits, the cosine similarity of the
+    best row for dataset matches and 0.0 for the fallback.
+    """
+    return reply_cache.get_or_compute(
+        user_message,
+        engine_version(),
+        lambda: _compute_reply(user_message)
+    )
 
-        if max_sim > best_score:
-            best_score = max_sim
-            best_dataset = name
-            best_idx = similarities.argmax()
 
-    if best_dataset is None or best_score < 0.10:
-        return "I’m here to listen. Can you tell me more about how you’re feeling?"
-
-    df = dfs[best_dataset]
+def _compute_reply(user_message: str) -> dict:
+    # STEP 1: Rule-based check
+    rule_response = rule_based_reply(user_message)
+    if rule_response:
+        return {"reply": rule_response, "source": "rule", "confidence": 1.0}
+
+    # STEP 2: ML-based similarity search (one fused search over every corpus,
+    # dataset priority is applied through the index's per-row weights)
+    index = get_index()
+    with span("search", SEARCH_BACKEND):
+        scores, rows = get_searcher().search(user_message, k=1)
+
+    if len(rows) == 0 or scores[0] < 0.10:
+        return {
+            "reply": "I’m here to listen. Can you tell me more about how you’re feeling?",
+            "source": "fallback",
+            "confidence": 0.0
+        }
+
+    best_dataset, best_idx = locate(index, rows[0])
     info = datasets_info[best_dataset]
-    answer = df.iloc[best_idx][info["answer_col"].lower()]
+    answer = index["answers"][best_dataset][best_idx]
 
-    # 🔹 Emotion label mapping
-    if best_dataset == "emotion":
-        answer = EMOTION_MAP.get(answer, "something difficult")
+    # 🔹 Catalog labels are already names ("sadness", "joy", ...)
+    if answer is None:
+        answer = "something difficult"
 
     # 🔹 Trim long FAQ answers
     if best_dataset == "faq":
         answer = trim_answer(answer)
 
-    return info["response_template"].format(answer)
+    return {
+        "reply": info["response_template"].format(answer),
+        "source": best_dataset,
+        # Undo the dataset priority weight so confidence is a plain cosine
+        "confidence": round(float(scores[0] / index["row_weights"][rows[0]]), 4)
+    }
 
 # 🔹 Console testing
 if __name__ == "__main__":
@@ -0,0 +1,353 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from telemetry.logs import get_logger
+
+# joblib, scipy, scikit-learn and the catalog (pandas, pyarrow) are imported
+# where they're used: importing the chatbot must not cost a worker its boot time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# 🔹 One prebuilt index per host, shared read-only by every worker
+INDEX_DIR = os.getenv(
+    "CHATBOT_INDEX_DIR",
+    os.path.join(BACKEND_DIR, "models", "chatbot_index")
+)
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".build.lock"
+INDEX_FORMAT = 5
+
+log = get_logger(__name__)
+
+# 🔹 A build lock older than this is assumed to belong to a dead process
+LOCK_STALE_SECONDS = 600
+
+# 🔹 Dataset configurations (sources and columns from the dataset catalog)
+datasets_info = {
+    "faq": {
+        "source": "faq",
+        "text_col": "text",
+        "answer_col": "answer",
+        "response_template": "{}",
+        "weight": 1.3
+    },
+    "emotion": {
+        "source": "emotion",
+        "text_col": "text",
+        "answer_col": "label",
+        "response_template": "Based on your message, you seem to be feeling {}. How can I help?",
+        "weight": 1.1
+    },
+    "sentiment": {
+        "source": "sentiment",
+        "text_col": "text",
+        "answer_col": "label",
+        "response_template": "Your message appears to have a {} sentiment.",
+        "weight": 1.0
+    }
+}
+
+
+def source_hashes(convert=False):
+    """Catalog content hash of every source, ``None`` for sources that are missing.
+
+    Serving reads the catalog manifest as it is; only the build step
+    (``convert=True``) converts sources that changed first.
+    """
+    from catalog import store
+
+    catalog = store.ensure_catalog() if convert else store.read_manifest() or {}
+    sources = catalog.get("sources", {})
+    return {
+        name: sources[info["source"]]["sha256"] if info["source"] in sources else None
+        for name, info in datasets_info.items()
+    }
+
+
+def source_fingerprints():
+    """Size and mtime of every source's raw files (a few stat() calls, no pandas).
+
+    ``None`` for a source whose raw files aren't all there (e.g. a host
+    deployed with the converted catalog only): nothing to compare against.
+    """
+    from catalog.sources import SOURCES
+    from catalog.store import fingerprint
+
+    fingerprints = {}
+    for name, info in datasets_info.items():
+        files = SOURCES[info["source"]]["files"]
+        fingerprints[name] = fingerprint(files) if all(os.path.exists(p) for p in files) else None
+    return fingerprints
+
+
+def read_manifest(index_dir=INDEX_DIR):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(manifest):
+    """True when the artifact is missing, from an older format, built from another
+    catalog, or when a raw source file changed since it was built."""
+    if not manifest or manifest.get("format") != INDEX_FORMAT:
+        return True
+    if manifest.get("sources") != source_hashes():
+        return True
+
+    built_from = manifest.get("inputs", {})
+    changed = [
+        name for name, current in source_fingerprints().items()
+        if current is not None and built_from.get(name) != current
+    ]
+    if changed:
+        # Raw files edited (or touched) without re-running the conversion
+        log.warning("Chatbot sources changed since the index was built: %s", ", ".join(changed))
+        return True
+    return False
+
+
+def _load_corpus(info):
+    # Only the two columns we need, straight from the catalog's Parquet file
+    from catalog.store import load as load_dataset
+
+    df = load_dataset(info["source"], columns=[info["text_col"], info["answer_col"]])
+    answers = df[info["answer_col"]].astype(object)
+    return df[info["text_col"]].astype(str), answers.where(answers.notna(), None)
+
+
+def _save_csr(directory, name, matrix):
+    # Raw .npy arrays (not compressed .npz) so workers can np.load them with mmap_mode
+    matrix = matrix.tocsr()
+    matrix.sort_indices()
+    np.save(os.path.join(directory, f"{name}_data.npy"), matrix.data.astype(np.float32))
+    np.save(os.path.join(directory, f"{name}_indices.npy"), matrix.indices.astype(np.int32))
+    np.save(os.path.join(directory, f"{name}_indptr.npy"), matrix.indptr.astype(np.int64))
+    return list(matrix.shape)
+
+
+def _load_csr(directory, name, shape):
+    from scipy import sparse
+
+    data = np.load(os.path.join(directory, f"{name}_data.npy"), mmap_mode="r")
+    indices = np.load(os.path.join(directory, f"{name}_indices.npy"), mmap_mode="r")
+    indptr = np.load(os.path.join(directory, f"{name}_indptr.npy"), mmap_mode="r")
+    return sparse.csr_matrix((data, indices, indptr), shape=tuple(shape), copy=False)
+
+
+def _save_postings(directory, matrix, row_weights):
+    """Write the term-major inverted index used by the ANN search backend.
+
+    Each term's postings are ordered by descending impact (tf-idf weight
+    times the row's corpus priority), so a prefix of the list holds the
+    strongest matches and its first entry is the term's upper bound.
+    """
+    csc = matrix.tocsc()
+    csc.sort_indices()
+    impacts = csc.data * row_weights[csc.indices]
+    terms = np.repeat(np.arange(csc.shape[1]), np.diff(csc.indptr))
+    order = np.lexsort((-impacts, terms))
+
+    np.save(os.path.join(directory, "postings_rows.npy"), csc.indices[order].astype(np.int32))
+    np.save(os.path.join(directory, "postings_impacts.npy"), impacts[order].astype(np.float32))
+    np.save(os.path.join(directory, "postings_indptr.npy"), csc.indptr.astype(np.int64))
+
+
+def _load_postings(directory):
+    indptr = np.load(os.path.join(directory, "postings_indptr.npy"), mmap_mode="r")
+    impacts = np.load(os.path.join(directory, "postings_impacts.npy"), mmap_mode="r")
+
+    max_impact = np.zeros(len(indptr) - 1, dtype=np.float32)
+    nonempty = np.diff(indptr) > 0
+    max_impact[nonempty] = impacts[indptr[:-1][nonempty]]
+
+    return {
+        "rows": np.load(os.path.join(directory, "postings_rows.npy"), mmap_mode="r"),
+        "impacts": impacts,
+        "indptr": indptr,
+        "max_impact": max_impact
+    }
+
+
+def _to_json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def build_index(index_dir=INDEX_DIR):
+    """Fit one shared vocabulary over every corpus and write the stacked artifact.
+
+    Rows of all corpora are stacked into a single L2-normalised CSR matrix;
+    ``offsets`` in the manifest maps a row back to its corpus. The manifest is
+    swapped in last.
+    """
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    os.makedirs(index_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".build-", dir=index_dir)
+
+    print("🔄 Building chatbot index...\n")
+
+    try:
+        hashes = source_hashes(convert=True)
+        inputs = source_fingerprints()
+        corpora = {}
+        all_texts = []
+        answers = {}
+
+        for name, info in datasets_info.items():
+            try:
+                texts, corpus_answers = _load_corpus(info)
+            except Exception as e:
+                print(f"❌ Failed to index {name}: {e}")
+                continue
+
+            corpora[name] = {
+                "rows": len(texts),
+                "offset": len(all_texts),
+                "weight": info.get("weight", 1.0)
+            }
+            all_texts.extend(texts.tolist())
+            answers[name] = [_to_json_value(a) for a in corpus_answers.tolist()]
+            print(f"✅ Indexed {name} dataset ({len(texts)} rows)")
+
+        vectorizer = TfidfVectorizer(stop_words="english")
+        matrix = vectorizer.fit_transform(all_texts)
+
+        joblib.dump(vectorizer, os.path.join(tmp_dir, "vectorizer.pkl"))
+        shape = _save_csr(tmp_dir, "matrix", matrix)
+        # Term-major copy: query @ matrix_t only touches the query terms' rows
+        _save_csr(tmp_dir, "matrix_t", matrix.T)
+
+        row_weights = np.repeat(
+            [c["weight"] for c in corpora.values()],
+            [c["rows"] for c in corpora.values()]
+        ).astype(np.float32)
+        _save_postings(tmp_dir, matrix, row_weights)
+
+        with open(os.path.join(tmp_dir, "answers.json"), "w", encoding="utf-8") as f:
+            json.dump(answers, f)
+
+        manifest = {
+            "format": INDEX_FORMAT,
+            "sources": hashes,
+            "inputs": inputs,
+            "corpora": corpora,
+            "shape": shape,
+            "builtAt": datetime.utcnow().isoformat()
+        }
+
+        # Data files first, manifest last: a reader never sees a manifest
+        # that points at files from another build.
+        for file in os.listdir(tmp_dir):
+            os.replace(os.path.join(tmp_dir, file), os.path.join(index_dir, file))
+
+        manifest_tmp = os.path.join(tmp_dir, MANIFEST_FILE)
+        with open(manifest_tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_tmp, os.path.join(index_dir, MANIFEST_FILE))
+
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print("\n🚀 Chatbot index ready.\n")
+    return manifest
+
+
+def _acquire_build_lock(index_dir):
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, LOCK_FILE)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(path) > LOCK_STALE_SECONDS:
+                os.remove(path)
+        except OSError:
+            pass
+        return False
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    return True
+
+
+def _release_build_lock(index_dir):
+    try:
+        os.remove(os.path.join(index_dir, LOCK_FILE))
+    except OSError:
+        pass
+
+
+def ensure_index(index_dir=INDEX_DIR, timeout=300):
+    """Return a fresh manifest, rebuilding at most once per host when the catalog changed."""
+    deadline = time.time() + timeout
+
+    while True:
+        manifest = read_manifest(index_dir)
+        if not is_stale(manifest):
+            return manifest
+
+        if _acquire_build_lock(index_dir):
+            try:
+                manifest = read_manifest(index_dir)
+                if is_stale(manifest):
+                    manifest = build_index(index_dir)
+                return manifest
+            finally:
+                _release_build_lock(index_dir)
+
+        # Another worker is building; wait for its manifest instead of duplicating the work
+        if time.time() > deadline:
+            raise TimeoutError(f"Timed out waiting for chatbot index build in {index_dir}")
+        time.sleep(0.2)
+
+
+def load_index(index_dir=INDEX_DIR):
+    import joblib
+
+    manifest = ensure_index(index_dir)
+
+    names = list(manifest["corpora"])
+    offsets = np.array(
+        [manifest["corpora"][n]["offset"] for n in names] + [manifest["shape"][0]],
+        dtype=np.int64
+    )
+    weights = np.array([manifest["corpora"][n]["weight"] for n in names], dtype=np.float32)
+
+    with open(os.path.join(index_dir, "answers.json"), "r", encoding="utf-8") as f:
+        answers = json.load(f)
+
+    return {
+        "manifest": manifest,
+        "vectorizer": joblib.load(os.path.join(index_dir, "vectorizer.pkl")),
+        "matrix": _load_csr(index_dir, "matrix", manifest["shape"]),
+        "matrix_t": _load_csr(index_dir, "matrix_t", manifest["shape"][::-1]),
+        "names": names,
+        "offsets": offsets,
+        # Per-row priority weight, expanded once from the per-corpus weights
+        "row_weights": np.repeat(weights, np.diff(offsets)),
+        "postings": _load_postings(index_dir),
+        "answers": answers
+    }
+
+
+# 🔹 Build step: python -m chatbot.index
+if __name__ == "__main__":
+    manifest = build_index()
+    print(f"📦 Index written to {INDEX_DIR}")
+    for name, meta in manifest["corpora"].items():
+        print(f"   {name}: {meta['rows']} rows")
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+
+from telemetry import metrics
+
+# 🔹 Gemini settings (GEMINI_BASE_URL points the client at a local fake server)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+# 🔹 Concurrency limits: beyond these the caller falls back to the local engine
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "0.5"))
+LLM_FIRST_TOKEN_TIMEOUT = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "8"))
+LLM_TOTAL_TIMEOUT = float(os.getenv("LLM_TOTAL_TIMEOUT", "30"))
+
+PROMPT_TEMPLATE = """
+    You are Wellnest, a calm and empathetic wellness assistant.
+    You do not provide medical diagnoses.
+    Be supportive and concise.
+
+    User: {message}
+    """
+
+
+GEMINI_CALLS = metrics.counter(
+    "wellnest_gemini_calls_total",
+    "Gemini calls by outcome (ok, rejected, timeout, error, closed)",
+    labels=("outcome",)
+)
+
+
+class LLMUnavailable(Exception):
+    """The LLM is saturated or too slow; the caller should answer locally."""
+
+
+def build_prompt(user_message):
+    return PROMPT_TEMPLATE.format(message=user_message)
+
+
+class GeminiChat:
+    """Process-wide Gemini client with streaming, pooling and admission control.
+
+    Calls run on the SDK's async client inside one event loop thread per
+    process, so every request reuses the same pooled HTTP connections. The
+    calling thread still waits for the chunks: a Flask worker thread is
+    held for the whole reply (``/api/chat``) or for as long as it streams
+    (``/api/chat/stream``). What bounds a slow Gemini is admission control:
+    a bounded semaphore caps in-flight calls, and when no slot frees up
+    within ``LLM_QUEUE_TIMEOUT``, the first token takes longer than
+    ``LLM_FIRST_TOKEN_TIMEOUT`` or the reply runs past
+    ``LLM_TOTAL_TIMEOUT``, :class:`LLMUnavailable` is raised.
+    """
+
+    def __init__(self, api_key=None, model=GEMINI_MODEL, base_url=GEMINI_BASE_URL,
+                 max_concurrency=LLM_MAX_CONCURRENCY):
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model = model
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+
+        self._slots = None
+        self._lock = threading.Lock()
+        self._client = None
+        self._loop = None
+        self._pid = None
+
+    @property
+    def client(self):
+        self._ensure_started()
+        return self._client
+
+    def _ensure_started(self):
+        # Event loop threads don't survive fork(), so each worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            # The SDK takes ~250 ms to import: only workers that call Gemini pay for it
+            from google import genai
+            from google.genai import types
+
+            http_options = {"timeout": int(LLM_TOTAL_TIMEOUT * 1000)}
+            if self.base_url:
+                http_options["base_url"] = self.base_url
+            self._client = genai.Client(
+                api_key=self.api_key,
+                http_options=types.HttpOptions(**http_options)
+            )
+
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="gemini-loop", daemon=True).start()
+            self._slots = threading.BoundedSemaphore(self.max_concurrency)
+            self._pid = os.getpid()
+
+    async def _pump(self, prompt, out):
+        try:
+            stream = await self._client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=prompt
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    out.put(("chunk", chunk.text))
+            out.put(("done", None))
+        except Exception as e:
+            out.put(("error", e))
+
+    def stream(self, user_message):
+        """Yield reply text chunks as Gemini produces them.
+
+        Raises :class:`LLMUnavailable` before the first chunk when the call
+        can't be admitted or doesn't start in time; errors after that are
+        re-raised as-is so the caller can end the stream.
+        """
+        self._ensure_started()
+
+        if not self._slots.acquire(timeout=LLM_QUEUE_TIMEOUT):
+            GEMINI_CALLS.inc(outcome="rejected")
+            raise LLMUnavailable("LLM concurrency limit reached")
+
+        out = queue.Queue()
+        started = time.perf_counter()
+        future = asyncio.run_coroutine_threadsafe(self._pump(build_prompt(user_message), out), self._loop)
+        deadline = time.monotonic() + LLM_TOTAL_TIMEOUT
+        first = True
+        outcome = "error"
+
+        try:
+            while True:
+                timeout = LLM_FIRST_TOKEN_TIMEOUT if first else deadline - time.monotonic()
+                try:
+                    kind, value = out.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    outcome = "timeout"
+                    raise LLMUnavailable("LLM response timed out")
+
+                if kind == "done":
+                    outcome = "ok"
+                    return
+                if kind == "error":
+                    if first:
+                        raise LLMUnavailable(repr(value)) from value
+                    raise value
+
+                if first:
+                    metrics.record_span("gemini_first_token", time.perf_counter() - started)
+                first = False
+                yield value
+        except GeneratorExit:
+            # The client hung up mid-stream
+            outcome = "closed"
+            raise
+        finally:
+            future.cancel()
+            self._slots.release()
+            metrics.record_span("gemini", time.perf_counter() - started, outcome)
+            GEMINI_CALLS.inc(outcome=outcome)
+
+    def generate(self, user_message):
+        """Full reply text (the stream, joined); blocks until the reply ends or times out."""
+        return "".join(self.stream(user_message))
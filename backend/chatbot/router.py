@@ -0,0 +1,127 @@
+import hashlib
+import os
+import queue
+import threading
+from datetime import datetime
+
+from database.db import db
+from ml.cache import normalize_text
+from telemetry import metrics
+from telemetry.logs import get_logger
+from .engine import score_reply
+
+# 🔹 Local answers at or above this confidence never reach the LLM
+CHAT_LOCAL_THRESHOLD = float(os.getenv("CHAT_LOCAL_THRESHOLD", "0.6"))
+
+# 🔹 Only these engine sources give real answers (emotion/sentiment matches
+# just describe the message back to the user)
+CHAT_LOCAL_SOURCES = set(
+    os.getenv("CHAT_LOCAL_SOURCES", "rule,faq").split(",")
+)
+
+# 🔹 Store the raw message with each decision (off: only a hash and length)
+CHAT_ROUTING_LOG_TEXT = os.getenv("CHAT_ROUTING_LOG_TEXT", "0") == "1"
+
+# 🔹 Decisions are written in the background: at most this many wait in
+# memory (newer ones are dropped beyond it) and one insert_many takes up
+# to CHAT_ROUTING_BATCH of them
+CHAT_ROUTING_QUEUE_SIZE = int(os.getenv("CHAT_ROUTING_QUEUE_SIZE", "10000"))
+CHAT_ROUTING_BATCH = int(os.getenv("CHAT_ROUTING_BATCH", "500"))
+
+chat_routes = db["chat_routes"]
+
+ROUTING_DROPPED = metrics.counter(
+    "wellnest_chat_routing_dropped_total",
+    "Routing decisions not recorded (queue full or insert failed)",
+    labels=("reason",)
+)
+
+log = get_logger(__name__)
+
+_pending = queue.Queue(maxsize=CHAT_ROUTING_QUEUE_SIZE)
+_writer_lock = threading.Lock()
+_writer_pid = None
+
+
+def route_message(user_message: str) -> dict:
+    """Decide whether the local engine can answer or the LLM is needed.
+
+    The local reply is always included so the caller can fall back to it
+    when the LLM is unavailable.
+    """
+    local = score_reply(user_message)
+    use_local = (
+        local["source"] in CHAT_LOCAL_SOURCES
+        and local["confidence"] >= CHAT_LOCAL_THRESHOLD
+    )
+
+    return {
+        "route": "local" if use_local else "llm",
+        "reply": local["reply"],
+        "source": local["source"],
+        "confidence": local["confidence"],
+        "threshold": CHAT_LOCAL_THRESHOLD
+    }
+
+
+def record_decision(user_message: str, decision: dict, answered_by: str, latency_ms: float):
+    """Best-effort log of one routing decision for offline analysis.
+
+    The decision is queued and written by a background thread, so a slow or
+    unreachable MongoDB never delays the reply; when the queue is full it
+    is dropped (counted in ``wellnest_chat_routing_dropped_total``).
+    """
+    normalized = normalize_text(user_message)
+    doc = {
+        "messageHash": hashlib.sha1(normalized.encode("utf-8")).hexdigest(),
+        "messageLength": len(normalized),
+        "route": decision["route"],
+        "answeredBy": answered_by,
+        "source": decision["source"],
+        "confidence": decision["confidence"],
+        "threshold": decision["threshold"],
+        "latencyMs": round(latency_ms, 2),
+        "createdAt": datetime.utcnow()
+    }
+    if CHAT_ROUTING_LOG_TEXT:
+        doc["message"] = user_message
+
+    _ensure_writer()
+    try:
+        _pending.put_nowait(doc)
+    except queue.Full:
+        ROUTING_DROPPED.inc(reason="queue_full")
+
+
+def _ensure_writer():
+    # Threads don't survive fork(), so each worker starts its own writer (and
+    # queue: the parent's writer already owns whatever it had pending)
+    global _pending, _writer_pid
+    if _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid != os.getpid():
+            if _writer_pid is not None:
+                _pending = queue.Queue(maxsize=CHAT_ROUTING_QUEUE_SIZE)
+            threading.Thread(target=_drain, args=(_pending,), name="chat-routes-writer", daemon=True).start()
+            _writer_pid = os.getpid()
+
+
+def _drain(pending):
+    while True:
+        batch = [pending.get()]
+        while len(batch) < CHAT_ROUTING_BATCH:
+            try:
+                batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        flush(batch)
+
+
+def flush(batch):
+    """Write queued decisions with one unordered insert_many; failures drop the batch."""
+    try:
+        chat_routes.insert_many(batch, ordered=False)
+    except Exception as e:
+        ROUTING_DROPPED.inc(len(batch), reason="insert_failed")
+        log.warning("Could not record %d chat routing decisions: %s", len(batch), e)
@@ -1,12 +1,17 @@
+import hashlib
+import json
+import os
+import re
+
 RULES = [
     {
         "intent": "stress",
-        "keywords": ["stress", "anxiety", "pressure", "overwhelmed"],
+        "keywords": ["stress", "stressed", "anxiety", "anxious", "pressure", "overwhelmed"],
         "response": "Feeling stressed is common 🌿 Try deep breathing or short walks."
     },
     {
         "intent": "sleep",
-        "keywords": ["sleep", "insomnia", "tired"],
+        "keywords": ["sleep", "sleeping", "insomnia", "tired"],
         "response": "Good sleep improves mental health 😴 Try sleeping at a fixed time."
     },
     {
@@ -20,3 +25,69 @@ RULES = [
         "response": "A balanced diet supports both mind and body 🥗"
     }
 ]
+
+# 🔹 Optional extra intents from a JSON file (same shape as RULES)
+RULES_PATH = os.getenv("CHATBOT_RULES_PATH")
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def load_rules(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compile_rules(rules):
+    """Compile rules into a phrase table for whole-word matching.
+
+    Every keyword becomes a tuple of tokens mapped to the index of the first
+    rule that lists it, so earlier rules keep priority over later ones.
+    """
+    phrases = {}
+    for priority, rule in enumerate(rules):
+        for keyword in rule["keywords"]:
+            tokens = tuple(tokenize(keyword))
+            if tokens and tokens not in phrases:
+                phrases[tokens] = priority
+
+    return {
+        "rules": rules,
+        "phrases": phrases,
+        "max_len": max((len(p) for p in phrases), default=0)
+    }
+
+
+def match_rule(compiled, message: str):
+    """Highest-priority rule with a keyword in ``message``, or ``None``.
+
+    One pass over the message tokens; each position only looks up phrases
+    up to the longest keyword, so the cost does not depend on the rule count.
+    """
+    phrases = compiled["phrases"]
+    tokens = tokenize(message)
+    best = None
+
+    for i in range(len(tokens)):
+        for n in range(1, min(compiled["max_len"], len(tokens) - i) + 1):
+            priority = phrases.get(tuple(tokens[i:i + n]))
+            if priority is not None and (best is None or priority < best):
+                best = priority
+                if best == 0:
+                    return compiled["rules"][0]
+
+    return compiled["rules"][best] if best is not None else None
+
+
+if RULES_PATH:
+    RULES = RULES + load_rules(RULES_PATH)
+
+COMPILED_RULES = compile_rules(RULES)
+
+# 🔹 Changes whenever the rule set does (part of the reply cache key)
+RULES_VERSION = hashlib.sha1(
+    json.dumps(RULES, sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
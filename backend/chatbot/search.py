@@ -0,0 +1,124 @@
+import numpy as np
+
+# 🔹 ANN tuning: postings read per query term (the recall/latency knob)
+DEFAULT_MAX_POSTINGS = 1000
+
+
+def _empty():
+    return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+
+def _top_k(scores, rows, k):
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[top], scores[top]
+
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+
+class ExactSearch:
+    """Brute-force weighted cosine over every row of the stacked matrix."""
+
+    name = "exact"
+
+    def __init__(self, index):
+        self.index = index
+
+    def search(self, query, k=1):
+        """Return ``(scores, rows)`` for the top ``k`` rows, best first."""
+        query_vector = self.index["vectorizer"].transform([query])
+        if query_vector.nnz == 0:
+            return _empty()
+
+        # Rows and query are both L2-normalised, so the dot product is the cosine.
+        # Against the term-major matrix only the query terms' rows are read, and
+        # the sparse result only holds rows that share a term with the query.
+        hits = query_vector @ self.index["matrix_t"]
+        rows = hits.indices.astype(np.int64)
+        scores = hits.data * self.index["row_weights"][rows]
+
+        return _top_k(scores, rows, k)
+
+
+class InvertedIndexSearch:
+    """Approximate top-k over impact-ordered postings with MaxScore-style pruning.
+
+    Query terms are visited by descending upper bound. Only the first
+    ``max_postings`` entries of each postings list are read, and once the
+    k-th best partial score beats everything the remaining terms could add,
+    no further terms are opened. Surviving candidates are then re-scored
+    exactly against their matrix rows, so returned scores are true cosines.
+    Work per query is bounded by ``terms * max_postings``, not corpus size.
+    """
+
+    name = "ann"
+
+    def __init__(self, index, max_postings=DEFAULT_MAX_POSTINGS):
+        self.index = index
+        self.max_postings = max_postings
+
+    def _candidates(self, terms, weights, k):
+        postings = self.index["postings"]
+        bounds = weights * postings["max_impact"][terms]
+
+        order = np.argsort(-bounds, kind="stable")
+        terms, weights, bounds = terms[order], weights[order], bounds[order]
+        remaining = np.cumsum(bounds[::-1])[::-1]
+
+        rows_seen = []
+        partial_seen = []
+        candidates = np.empty(0, dtype=np.int64)
+
+        for i, term in enumerate(terms):
+            if len(candidates) >= k:
+                _, inverse = np.unique(np.concatenate(rows_seen), return_inverse=True)
+                partial = np.bincount(inverse, weights=np.concatenate(partial_seen))
+                theta = np.partition(partial, len(partial) - k)[len(partial) - k]
+                if theta >= remaining[i]:
+                    break
+
+            start = postings["indptr"][term]
+            end = min(postings["indptr"][term + 1], start + self.max_postings)
+            rows_seen.append(np.asarray(postings["rows"][start:end], dtype=np.int64))
+            partial_seen.append(weights[i] * postings["impacts"][start:end])
+            candidates = np.unique(np.concatenate(rows_seen))
+
+        return candidates
+
+    def search(self, query, k=1):
+        """Return ``(scores, rows)`` for the top ``k`` rows, best first."""
+        query_vector = self.index["vectorizer"].transform([query])
+        if query_vector.nnz == 0:
+            return _empty()
+
+        rows = self._candidates(query_vector.indices, query_vector.data, k)
+        if len(rows) == 0:
+            return _empty()
+
+        # Dense query: a CSR-times-vector product over the candidate rows only
+        dense_query = np.zeros(self.index["matrix"].shape[1], dtype=np.float32)
+        dense_query[query_vector.indices] = query_vector.data
+        exact = self.index["matrix"][rows] @ dense_query
+        scores = exact * self.index["row_weights"][rows]
+
+        keep = scores > 0
+        return _top_k(scores[keep], rows[keep], k)
+
+
+BACKENDS = {
+    ExactSearch.name: ExactSearch,
+    InvertedIndexSearch.name: InvertedIndexSearch
+}
+
+
+def make_backend(index, kind="exact", **options):
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown search backend '{kind}'. Choose from {sorted(BACKENDS)}")
+    return BACKENDS[kind](index, **options)
+
+
+def locate(index, row):
+    """Map a global row id to ``(corpus name, row within that corpus)``."""
+    corpus = int(np.searchsorted(index["offsets"], row, side="right")) - 1
+    return index["names"][corpus], int(row - index["offsets"][corpus])
@@ -0,0 +1,123 @@
+"""Query-shape audit: explain() every hot endpoint query and fail on COLLSCAN.
+
+Runs against a scratch database on the configured MongoDB (a real mongod is
+needed; mongomock has no query planner)::
+
+    python -m database.audit            # uses database "wellnest_audit"
+    python -m database.audit --keep     # leave the scratch data for inspection
+
+tests/test_query_audit.py runs the same check under pytest.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from .db import get_client
+from .indexes import ensure_indexes
+from .rollups import ALL_USERS
+
+
+def hot_queries(user_id, email, now):
+    """(endpoint, collection, cursor factory) for every query on a request path."""
+    return [
+        ("signup/login: user by email", "users",
+         lambda d: d.users.find({"email": email}).limit(1)),
+        ("visit: user by id", "users",
+         lambda d: d.users.find({"_id": user_id}).limit(1)),
+        ("physical-health: latest log", "daily_logs",
+         lambda d: d.daily_logs.find({"user_id": user_id}).sort("createdAt", -1).limit(1)),
+        ("daily-log list: first page", "daily_logs",
+         lambda d: d.daily_logs.find({"user_id": user_id}).sort([("date", -1), ("_id", -1)]).limit(51)),
+        ("daily-log list: page after cursor", "daily_logs",
+         lambda d: d.daily_logs.find({"user_id": user_id, "$or": [
+             {"date": {"$lt": now}}, {"date": now, "_id": {"$lt": user_id}}
+         ]}).sort([("date", -1), ("_id", -1)]).limit(51)),
+        ("tracker rebuild: log dates by user", "daily_logs",
+         lambda d: d.daily_logs.find({"user_id": user_id}, {"date": 1, "_id": 0})),
+        ("tracker: summary by user", "tracker_summaries",
+         lambda d: d.tracker_summaries.find({"user_id": user_id}).limit(1)),
+        ("mood-stats: user rollups in range", "mood_rollups",
+         lambda d: d.mood_rollups.find({
+             "granularity": "day", "user_id": user_id,
+             "bucket": {"$gte": now - timedelta(days=30), "$lt": now}
+         })),
+        ("mood-stats: global rollups", "mood_rollups",
+         lambda d: d.mood_rollups.find({"granularity": "day", "user_id": ALL_USERS})),
+    ]
+
+
+def _stages(plan):
+    """Every stage name in a (possibly nested / SBE) winning plan."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def _seed(database, user_id, email, now):
+    database.users.insert_one({"_id": user_id, "email": email, "name": "audit"})
+    database.daily_logs.insert_many([
+        {"user_id": user_id, "mood": "calm", "date": now - timedelta(days=i), "createdAt": now - timedelta(days=i)}
+        for i in range(20)
+    ])
+    database.tracker_summaries.insert_one({"user_id": user_id})
+    database.mood_rollups.insert_one(
+        {"granularity": "day", "user_id": user_id, "bucket": now, "mood": "calm", "count": 1}
+    )
+
+
+def audit(database):
+    """Index and seed an empty ``database``; ``[(query, collection, stages)]`` for every hot query."""
+    ensure_indexes(database)
+
+    user_id = ObjectId()
+    email = "audit@example.com"
+    now = datetime.utcnow()
+    _seed(database, user_id, email, now)
+
+    results = []
+    for name, collection, make_cursor in hot_queries(user_id, email, now):
+        plan = make_cursor(database).explain()["queryPlanner"]["winningPlan"]
+        results.append((name, collection, sorted(set(_stages(plan)))))
+    return results
+
+
+def run(database_name="wellnest_audit", keep=False):
+    client = get_client()
+    client.drop_database(database_name)
+
+    failures = []
+    try:
+        for name, collection, stages in audit(client[database_name]):
+            ok = "COLLSCAN" not in stages
+            print(f"{'✅' if ok else '❌'} {name:<40} {collection:<18} {', '.join(stages)}")
+            if not ok:
+                failures.append(name)
+    finally:
+        if not keep:
+            client.drop_database(database_name)
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default="wellnest_audit")
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    failures = run(args.database, args.keep)
+    if failures:
+        print(f"\n🚨 {len(failures)} hot query(s) do a collection scan")
+        sys.exit(1)
+    print("\n✅ No collection scans on hot queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,219 @@
-from pymongo import MongoClient
+import os
+import threading
+import time
 
-client = MongoClient("mongodb://localhost:27017")
-db = client["wellnest"]
+from pymongo import MongoClient, monitoring
+
+from telemetry import metrics
+
+# 🔹 Connection settings (all overridable from the environment / .env)
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB = os.getenv("MONGO_DB", "wellnest")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters for this process, fed by pymongo's CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.waits = 0
+            self.wait_ms_total = 0.0
+            self.wait_ms_max = 0.0
+            self.clears = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "maxPoolSize": MONGO_MAX_POOL_SIZE,
+                "open": self.open,
+                "checkedOut": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkoutFailures": self.checkout_failures,
+                "waits": self.waits,
+                "waitMsTotal": round(self.wait_ms_total, 3),
+                "waitMsMax": round(self.wait_ms_max, 3),
+                "waitMsAvg": round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "clears": self.clears
+            }
+
+    # Events are published on the thread doing the checkout
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            # Every connection busy: this checkout has to queue for one
+            if self.checked_out >= MONGO_MAX_POOL_SIZE:
+                self.waits += 1
+
+    def connection_checked_out(self, event):
+        wait_ms = (time.perf_counter() - getattr(self._local, "started", time.perf_counter())) * 1000
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+pool_stats = PoolStats()
+
+
+MONGO_FAILURES = metrics.counter(
+    "wellnest_mongo_command_failures_total",
+    "MongoDB commands that returned an error",
+    labels=("command", "collection")
+)
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Times every MongoDB command into the ``mongo`` span (detail: command.collection)."""
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        # {"find": "users", ...}; a getMore names its cursor's collection separately
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        collection = event.command.get(key)
+        with self._lock:
+            self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def _finish(self, event):
+        with self._lock:
+            return self._collections.pop(event.request_id, "")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        metrics.record_span("mongo", event.duration_micros / 1e6, f"{event.command_name}.{collection}")
+
+    def failed(self, event):
+        collection = self._finish(event)
+        metrics.record_span("mongo", event.duration_micros / 1e6, f"{event.command_name}.{collection}")
+        MONGO_FAILURES.inc(command=event.command_name, collection=collection)
+
+
+command_timer = CommandTimer()
+
+metrics.gauge(
+    "wellnest_mongo_pool",
+    "Connection pool counters of this process (see /api/health)",
+    ("stat",),
+    lambda: {(name,): value for name, value in pool_stats.snapshot().items()}
+)
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """This process's MongoClient, created on first use.
+
+    A client must never cross a fork (gunicorn preloading), so a worker
+    that inherits one from its parent builds its own instead.
+    """
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            pool_stats.reset()
+            _client = MongoClient(
+                MONGO_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[pool_stats, command_timer],
+                connect=False
+            )
+            _client_pid = os.getpid()
+    return _client
+
+
+def get_database():
+    return get_client()[MONGO_DB]
+
+
+def ping():
+    """Round-trip time to the server in milliseconds (raises when unreachable)."""
+    started = time.perf_counter()
+    get_client().admin.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+
+class LazyCollection:
+    """Stands in for a Collection at import time; resolves on each use."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_database()[self.name], attr)
+
+
+class LazyDatabase:
+    """Stands in for the Database at import time; no connection until used."""
+
+    def __getitem__(self, name):
+        return LazyCollection(name)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(get_database(), attr)
+
+
+db = LazyDatabase()
 
 users = db["users"]
 daily_logs = db["daily_logs"]
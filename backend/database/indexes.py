@@ -0,0 +1,52 @@
+from pymongo import ASCENDING, DESCENDING
+
+from .db import db
+
+# 🔹 Every index the app relies on, per collection: (name, keys, options)
+INDEXES = {
+    "users": [
+        ("email_unique", [("email", ASCENDING)], {"unique": True}),
+    ],
+    "daily_logs": [
+        # Also serves keyset pagination on (date, _id)
+        ("user_date_id", [("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], {}),
+        ("user_created", [("user_id", ASCENDING), ("createdAt", DESCENDING)], {}),
+        # Online learning reads every new log in insertion order (ml/online.py)
+        ("created_id", [("createdAt", ASCENDING), ("_id", ASCENDING)], {}),
+        # Replayed offline-sync entries are rejected instead of stored twice
+        (
+            "user_idempotency_key",
+            [("user_id", ASCENDING), ("idempotencyKey", ASCENDING)],
+            {"unique": True, "partialFilterExpression": {"idempotencyKey": {"$type": "string"}}}
+        ),
+    ],
+    "tracker_summaries": [
+        ("user_unique", [("user_id", ASCENDING)], {"unique": True}),
+    ],
+    "mood_rollups": [
+        (
+            "rollup_key",
+            [("granularity", ASCENDING), ("user_id", ASCENDING), ("bucket", ASCENDING), ("mood", ASCENDING)],
+            {"unique": True}
+        ),
+    ],
+    "chat_routes": [
+        ("created", [("createdAt", DESCENDING)], {}),
+    ],
+}
+
+
+def ensure_indexes(database=db):
+    """Create any missing index; safe to run on every start (create_index is idempotent)."""
+    created = []
+    for collection, specs in INDEXES.items():
+        for name, keys, options in specs:
+            database[collection].create_index(keys, name=name, **options)
+            created.append(f"{collection}.{name}")
+    return created
+
+
+# 🔹 Migration: python -m database.indexes
+if __name__ == "__main__":
+    for index in ensure_indexes():
+        print(f"✅ {index}")
@@ -0,0 +1,256 @@
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from telemetry.logs import get_logger
+
+from .db import daily_logs
+from .rollups import record_moods
+from .tracker import rebuild_summary, record_log
+
+# 🔹 Only the fields the log endpoints return (journal text stays on the server)
+LOG_PROJECTION = {
+    "user_id": 1,
+    "mood": 1,
+    "sleepHours": 1,
+    "exerciseTime": 1,
+    "waterIntake": 1,
+    "createdAt": 1,
+    "date": 1
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 500
+
+# 🔹 Offline sync: entries per /api/daily-log/batch request, and how far a
+# client clock may run ahead of ours
+MAX_SYNC_BATCH = int(os.getenv("DAILY_LOG_MAX_SYNC_BATCH", "500"))
+MAX_CLOCK_SKEW = timedelta(minutes=int(os.getenv("DAILY_LOG_MAX_CLOCK_SKEW_MIN", "10")))
+
+# Named logger, not log: the functions here take log documents called log
+logger = get_logger(__name__)
+
+NUMERIC_FIELDS = ("sleepHours", "waterIntake", "exerciseTime")
+DUPLICATE_KEY = 11000
+
+
+class InvalidLog(ValueError):
+    pass
+
+
+def _client_date(value):
+    """Naive UTC datetime from a client ISO timestamp (when the log was made offline)."""
+    if not isinstance(value, str):
+        raise InvalidLog("date must be an ISO 8601 string")
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise InvalidLog("date must be an ISO 8601 string")
+    if when.tzinfo:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    if when > datetime.utcnow() + MAX_CLOCK_SKEW:
+        raise InvalidLog("date is in the future")
+    return when
+
+
+def build_log(data, user_id=None):
+    """Validated daily_logs document from a client payload (raises InvalidLog)."""
+    if not isinstance(data, dict):
+        raise InvalidLog("log must be an object")
+
+    try:
+        owner = user_id or ObjectId(data.get("user_id"))
+    except Exception:
+        raise InvalidLog("invalid user_id")
+
+    for field in NUMERIC_FIELDS:
+        value = data.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise InvalidLog(f"{field} must be a number")
+
+    for field in ("journalEntry", "mood", "idempotencyKey"):
+        value = data.get(field)
+        if value is not None and not isinstance(value, str):
+            raise InvalidLog(f"{field} must be a string")
+
+    now = datetime.utcnow()
+    log = {
+        "user_id": owner,
+        "sleepHours": data.get("sleepHours"),
+        "waterIntake": data.get("waterIntake"),
+        "exerciseTime": data.get("exerciseTime"),
+        "journalEntry": data.get("journalEntry"),
+        "mood": data.get("mood"),
+        "date": _client_date(data["date"]) if data.get("date") else now,
+        "createdAt": now
+    }
+    if data.get("idempotencyKey"):
+        log["idempotencyKey"] = data["idempotencyKey"]
+    return log
+
+
+def update_derived(user_id, logs):
+    """Fold newly inserted logs into the tracker summary and mood rollups."""
+    if not logs:
+        return
+    if len(logs) == 1:
+        record_log(user_id, logs[0]["date"])
+    else:
+        # One rebuild beats N optimistic updates (and handles backdated entries)
+        rebuild_summary(user_id)
+    record_moods(user_id, [(log["mood"], log["date"]) for log in logs])
+
+
+def insert_log(log):
+    """Insert one log; returns ``(id, created)`` (created False on a replayed key)."""
+    try:
+        daily_logs.insert_one(log)
+        return log["_id"], True
+    except DuplicateKeyError:
+        existing = daily_logs.find_one(
+            {"user_id": log["user_id"], "idempotencyKey": log.get("idempotencyKey")},
+            {"_id": 1}
+        )
+        if existing is None:
+            raise
+        return existing["_id"], False
+
+
+def insert_logs(user_id, entries):
+    """Validate and store a batch of one user's logs with one unordered insert_many.
+
+    Returns one ``{"index", "status", ...}`` result per entry, status being
+    ``created``, ``duplicate`` (idempotency key already stored), ``invalid``
+    or ``error`` (the write itself failed).
+    """
+    results = [None] * len(entries)
+    docs, positions = [], []
+
+    for i, entry in enumerate(entries):
+        try:
+            docs.append(build_log(entry, user_id))
+            positions.append(i)
+        except InvalidLog as e:
+            results[i] = {"index": i, "status": "invalid", "error": str(e)}
+
+    failed = {}
+    if docs:
+        try:
+            daily_logs.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+
+    duplicate_keys = [
+        docs[i]["idempotencyKey"] for i, err in failed.items()
+        if err.get("code") == DUPLICATE_KEY and docs[i].get("idempotencyKey")
+    ]
+    existing = {}
+    if duplicate_keys:
+        for log in daily_logs.find(
+            {"user_id": user_id, "idempotencyKey": {"$in": duplicate_keys}},
+            {"idempotencyKey": 1}
+        ):
+            existing[log["idempotencyKey"]] = log["_id"]
+
+    created = []
+    for doc_index, (position, doc) in enumerate(zip(positions, docs)):
+        err = failed.get(doc_index)
+        if err is None:
+            created.append(doc)
+            results[position] = {"index": position, "status": "created", "id": str(doc["_id"])}
+        elif doc.get("idempotencyKey") in existing:
+            results[position] = {
+                "index": position,
+                "status": "duplicate",
+                "id": str(existing[doc["idempotencyKey"]])
+            }
+        else:
+            results[position] = {"index": position, "status": "error", "error": err.get("errmsg")}
+
+    try:
+        update_derived(user_id, created)
+    except Exception as e:
+        logger.warning("Log summary update failed for %d logs: %s", len(created), e)
+
+    return results
+
+
+def serialize_log(log):
+    return {
+        "id": str(log["_id"]),
+        "user_id": str(log["user_id"]),
+        "mood": log.get("mood"),
+        "sleepHours": log.get("sleepHours", 0),
+        "exerciseTime": log.get("exerciseTime", 0),
+        "waterIntake": log.get("waterIntake", 0),
+        "createdAt": log.get("createdAt").isoformat() if log.get("createdAt") else None,
+    }
+
+
+def encode_cursor(log):
+    """Opaque keyset cursor for the (date, _id) position of ``log``."""
+    raw = f"{log['date'].isoformat()}|{log['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """``(date, _id)`` from an ``encode_cursor`` string; ``ValueError`` when it isn't one."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, log_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(date), ObjectId(log_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _query(user_id, start=None, end=None, after=None, order=-1):
+    query = {"user_id": user_id}
+
+    if start or end:
+        query["date"] = {}
+        if start:
+            query["date"]["$gte"] = start
+        if end:
+            query["date"]["$lt"] = end
+
+    if after:
+        date, log_id = after
+        op = "$lt" if order < 0 else "$gt"
+        query["$or"] = [
+            {"date": {op: date}},
+            {"date": date, "_id": {op: log_id}}
+        ]
+
+    return query
+
+
+def find_user_logs(user_id, limit=DEFAULT_PAGE_SIZE, after=None, start=None, end=None, order=-1):
+    """One page of a user's logs, ordered by (date, _id); returns ``(logs, next_cursor)``.
+
+    ``after`` is a decoded cursor (see ``decode_cursor``): the page starts
+    past that (date, _id) position.
+
+    Keyset pagination on the (user_id, date, _id) index: each page is an
+    index range scan of ``limit`` entries no matter how deep it is.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = daily_logs.find(
+        _query(user_id, start, end, after, order),
+        LOG_PROJECTION
+    ).sort([("date", order), ("_id", order)]).limit(limit + 1)
+
+    logs = list(cursor)
+    next_cursor = encode_cursor(logs[limit - 1]) if len(logs) > limit else None
+    return logs[:limit], next_cursor
+
+
+def iter_user_logs(user_id, start=None, end=None, order=-1):
+    """Every matching log, streamed from the server in batches (for exports)."""
+    return daily_logs.find(
+        _query(user_id, start, end, order=order),
+        LOG_PROJECTION
+    ).sort([("date", order), ("_id", order)]).batch_size(EXPORT_BATCH_SIZE)
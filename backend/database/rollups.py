@@ -0,0 +1,152 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from .db import db
+from .indexes import ensure_indexes
+
+# 🔹 Materialised mood counts per (user, bucket, mood)
+mood_rollups = db["mood_rollups"]
+
+# 🔹 user_id of the all-users rollups: $merge rejects a null "on" field, so
+# the global scope needs a real value (user ids are ObjectIds, never this)
+ALL_USERS = "all"
+
+GRANULARITIES = ("day", "hour")
+
+# 🔹 Fields of the unique "rollup_key" index (see database/indexes.py)
+ROLLUP_KEY = ["granularity", "user_id", "bucket", "mood"]
+
+
+def bucket_start(when, granularity):
+    if granularity == "hour":
+        return datetime(when.year, when.month, when.day, when.hour)
+    return datetime(when.year, when.month, when.day)
+
+
+def _mood(value):
+    return value or "unknown"
+
+
+def record_mood(user_id, mood, when):
+    """Count one log in the user's and the global day/hour buckets."""
+    record_moods(user_id, [(mood, when)])
+
+
+def record_moods(user_id, entries, collection=mood_rollups):
+    """Count many ``(mood, when)`` logs of one user in a single bulk write."""
+    owners = (user_id, ALL_USERS) if user_id is not None else (ALL_USERS,)
+    counts = {}
+    for mood, when in entries:
+        for granularity in GRANULARITIES:
+            for owner in owners:
+                key = (granularity, owner, bucket_start(when, granularity), _mood(mood))
+                counts[key] = counts.get(key, 0) + 1
+
+    if not counts:
+        return
+
+    ops = [
+        UpdateOne(
+            dict(zip(ROLLUP_KEY, key)),
+            {"$inc": {"count": count}},
+            upsert=True
+        )
+        for key, count in counts.items()
+    ]
+    collection.bulk_write(ops, ordered=False)
+
+
+def mood_counts(user_id=None, start=None, end=None, granularity="all", collection=mood_rollups):
+    """Mood counts from the rollups.
+
+    ``granularity="all"`` returns ``{mood: count}``; ``"day"``/``"hour"``
+    return a list of ``{"bucket": iso, "moods": {mood: count}}`` sorted by
+    bucket. Cost depends on the number of buckets in range, not on how
+    many logs exist.
+    """
+    aligned = all(
+        bound is None or bound == bucket_start(bound, "day")
+        for bound in (start, end)
+    )
+    source = "day" if granularity == "day" or (granularity == "all" and aligned) else "hour"
+
+    match = {"granularity": source, "user_id": user_id if user_id is not None else ALL_USERS}
+    if start or end:
+        match["bucket"] = {}
+        if start:
+            match["bucket"]["$gte"] = start
+        if end:
+            match["bucket"]["$lt"] = end
+
+    if granularity == "all":
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": "$mood", "count": {"$sum": "$count"}}}
+        ]
+        return {row["_id"]: row["count"] for row in collection.aggregate(pipeline)}
+
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, "bucket": 1, "mood": 1, "count": 1}},
+        {"$sort": {"bucket": 1}}
+    ]
+    series = {}
+    for row in collection.aggregate(pipeline):
+        point = series.setdefault(row["bucket"], {})
+        point[row["mood"]] = point.get(row["mood"], 0) + row["count"]
+
+    return [
+        {"bucket": bucket.isoformat(), "moods": moods}
+        for bucket, moods in series.items()
+    ]
+
+
+def rebuild_rollups(database=db):
+    """Recompute every rollup from daily_logs with server-side $group + $merge."""
+    # $merge needs the unique rollup_key index
+    ensure_indexes(database)
+    rollups = database["mood_rollups"]
+
+    # Global rollups written before ALL_USERS existed (user_id null)
+    rollups.delete_many({"user_id": None})
+
+    for granularity in GRANULARITIES:
+        for per_user in (True, False):
+            group_id = {
+                "mood": {"$ifNull": ["$mood", "unknown"]},
+                "bucket": {"$dateTrunc": {"date": "$date", "unit": granularity}}
+            }
+            if per_user:
+                group_id["user_id"] = "$user_id"
+
+            match = {"date": {"$type": "date"}}
+            if per_user:
+                # Every "on" field must be set: logs without a user only count globally
+                match["user_id"] = {"$ne": None}
+
+            database["daily_logs"].aggregate([
+                {"$match": match},
+                {"$project": {"_id": 0, "user_id": 1, "mood": 1, "date": 1}},
+                {"$group": {"_id": group_id, "count": {"$sum": 1}}},
+                {"$project": {
+                    "_id": 0,
+                    "granularity": {"$literal": granularity},
+                    "user_id": "$_id.user_id" if per_user else {"$literal": ALL_USERS},
+                    "bucket": "$_id.bucket",
+                    "mood": "$_id.mood",
+                    "count": 1
+                }},
+                {"$merge": {
+                    "into": rollups.name,
+                    "on": ROLLUP_KEY,
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert"
+                }}
+            ])
+
+
+# 🔹 Backfill: python -m database.rollups
+if __name__ == "__main__":
+    rebuild_rollups()
+    print("✅ Mood rollups rebuilt")
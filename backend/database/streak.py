@@ -1,49 +1,114 @@
 from datetime import datetime
 
-BADGES = [
-    {"days": 3, "name": "🌱 Starter", "freeze": 0},
-    {"days": 7, "name": "💪 Consistent Visitor", "freeze": 1},
-    {"days": 14, "name": "🧠 Habit Builder", "freeze": 2},
-    {"days": 30, "name": "🏆 Wellnest Regular", "freeze": 3}
-]
+from pymongo import ReturnDocument
 
-def update_visit_streak(user):
-    today = datetime.utcnow()  # ✅ FIXED
+from .db import users
+from .streak_engine import BADGES, advance_visits, badge_bits, badge_names
 
-    streak = user.get("streak", {})
-    last_visit = streak.get("lastVisit")
-    current = streak.get("current", 0)
-    longest = streak.get("longest", 0)
-    freeze_available = streak.get("freezeAvailable", 0)
+STREAK_PROJECTION = {"_id": 0, "streak": 1, "badges": 1}
 
-    badges = set(user.get("badges", []))
 
-    if not last_visit:
-        current = 1
-    else:
-        days_gap = (today.date() - last_visit.date()).days
+def update_visit_streak(user, today=None):
+    """One visit applied in Python (reference for ``visit_pipeline``)."""
+    today = today or datetime.utcnow()  # ✅ FIXED
 
-        if days_gap == 1:
-            current += 1
-        elif days_gap > 1:
-            if freeze_available > 0:
-                freeze_available -= 1
-            else:
-                current = 1
+    streak = user.get("streak", {})
+    last_visit = streak.get("lastVisit")
+    held = user.get("badges", [])
 
-    longest = max(longest, current)
+    gap = (today.date() - last_visit.date()).days if last_visit else -1
+    current, longest, freeze_available, bits = advance_visits(
+        [streak.get("current", 0)],
+        [streak.get("longest", 0)],
+        [streak.get("freezeAvailable", 0)],
+        [gap],
+        [badge_bits(held)]
+    )
 
-    for badge in BADGES:
-        if current >= badge["days"] and badge["name"] not in badges:
-            badges.add(badge["name"])
-            freeze_available += badge["freeze"]
+    badges = list(held) + [name for name in badge_names(bits[0]) if name not in held]
 
     return {
         "streak": {
-            "current": current,
-            "longest": longest,
+            "current": int(current[0]),
+            "longest": int(longest[0]),
             "lastVisit": today,   # ✅ datetime, not date
-            "freezeAvailable": freeze_available
+            "freezeAvailable": int(freeze_available[0])
         },
-        "badges": list(badges)
+        "badges": badges
     }
+
+
+def visit_pipeline(now):
+    """``update_visit_streak`` as an update pipeline, so the server applies it atomically."""
+    gap = {"$dateDiff": {"startDate": "$streak.lastVisit", "endDate": now, "unit": "day"}}
+
+    return [
+        {"$set": {"_visit": {"$let": {
+            "vars": {
+                # null when there is no previous visit
+                "gap": gap,
+                "current": {"$ifNull": ["$streak.current", 0]},
+                "freeze": {"$ifNull": ["$streak.freezeAvailable", 0]}
+            },
+            "in": {"$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$$gap", None]},
+                     "then": {"current": 1, "freeze": "$$freeze"}},
+                    {"case": {"$eq": ["$$gap", 1]},
+                     "then": {"current": {"$add": ["$$current", 1]}, "freeze": "$$freeze"}},
+                    {"case": {"$and": [{"$gt": ["$$gap", 1]}, {"$gt": ["$$freeze", 0]}]},
+                     "then": {"current": "$$current", "freeze": {"$subtract": ["$$freeze", 1]}}},
+                    {"case": {"$gt": ["$$gap", 1]},
+                     "then": {"current": 1, "freeze": "$$freeze"}}
+                ],
+                "default": {"current": "$$current", "freeze": "$$freeze"}
+            }}
+        }}}},
+        {"$set": {"_visit.earned": {"$filter": {
+            "input": {"$literal": BADGES},
+            "as": "badge",
+            "cond": {"$and": [
+                {"$gte": ["$_visit.current", "$$badge.days"]},
+                {"$not": [{"$in": ["$$badge.name", {"$ifNull": ["$badges", []]}]}]}
+            ]}
+        }}}},
+        {"$set": {
+            "streak": {
+                "current": "$_visit.current",
+                "longest": {"$max": [{"$ifNull": ["$streak.longest", 0]}, "$_visit.current"]},
+                "lastVisit": now,
+                "freezeAvailable": {"$add": ["$_visit.freeze", {"$sum": "$_visit.earned.freeze"}]}
+            },
+            "badges": {"$concatArrays": [{"$ifNull": ["$badges", []]}, "$_visit.earned.name"]}
+        }},
+        {"$unset": "_visit"}
+    ]
+
+
+def record_visit(user_id, now=None, collection=users):
+    """Apply one visit; returns ``{"streak", "badges"}`` or ``None`` for an unknown user.
+
+    Only the first visit of a UTC day writes (one atomic find_one_and_update,
+    so concurrent visits can't lose increments); later visits that day
+    change nothing and are answered with a read.
+    """
+    now = now or datetime.utcnow()
+    day_start = datetime(now.year, now.month, now.day)
+
+    updated = collection.find_one_and_update(
+        {
+            "_id": user_id,
+            "$or": [
+                {"streak.lastVisit": {"$lt": day_start}},
+                {"streak.lastVisit": None}
+            ]
+        },
+        visit_pipeline(now),
+        projection=STREAK_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is not None:
+        return updated
+
+    # Already counted today (or no such user)
+    return collection.find_one({"_id": user_id}, STREAK_PROJECTION)
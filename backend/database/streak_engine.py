@@ -0,0 +1,151 @@
+"""Vectorised streak maths on NumPy day numbers (``datetime64[D]``).
+
+Every function works on a batch: one user is just a batch of one. Log
+histories come in as two parallel arrays, ``user_index`` and ``days``,
+sorted by (user, day), so a whole collection can be processed with a
+handful of array operations instead of a Python loop per user.
+"""
+from datetime import datetime, time
+
+import numpy as np
+
+BADGES = [
+    {"days": 3, "name": "🌱 Starter", "freeze": 0},
+    {"days": 7, "name": "💪 Consistent Visitor", "freeze": 1},
+    {"days": 14, "name": "🧠 Habit Builder", "freeze": 2},
+    {"days": 30, "name": "🏆 Wellnest Regular", "freeze": 3}
+]
+
+BADGE_NAMES = [badge["name"] for badge in BADGES]
+BADGE_DAYS = np.array([badge["days"] for badge in BADGES], dtype=np.int64)
+BADGE_FREEZE = np.array([badge["freeze"] for badge in BADGES], dtype=np.int64)
+BADGE_BITS = np.int64(1) << np.arange(len(BADGES), dtype=np.int64)
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+def to_days(values):
+    """``datetime64[D]`` array from datetimes (time of day dropped)."""
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def to_datetime(day):
+    """Midnight ``datetime`` for one ``datetime64[D]`` value."""
+    return datetime.combine(day.astype(object), time())
+
+
+def weekday(days):
+    """Monday = 0 ... Sunday = 6 (1970-01-01 was a Thursday)."""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def week_start(days):
+    return days - weekday(days).astype("timedelta64[D]")
+
+
+def _starts(flags):
+    return np.flatnonzero(np.concatenate(([True], flags)))
+
+
+def log_streaks(user_index, days):
+    """Per-user streak stats from log days sorted by (user, day); duplicates allowed.
+
+    Returns a dict of parallel arrays, one entry per distinct user:
+    ``user_index``, ``last_day``, ``current`` (run ending on the last
+    day), ``longest``, ``week_start`` (of the last day) and ``week_bits``
+    (bit ``i`` set = logged on weekday ``i`` of that week).
+    """
+    user_index = np.asarray(user_index)
+    days = to_days(days)
+
+    if not len(days):
+        empty = np.array([], dtype=np.int64)
+        return {
+            "user_index": user_index[:0],
+            "last_day": days[:0],
+            "current": empty,
+            "longest": empty,
+            "week_start": days[:0],
+            "week_bits": empty
+        }
+
+    # One entry per (user, day)
+    keep = _starts((user_index[1:] != user_index[:-1]) | (days[1:] != days[:-1]))
+    user_index, days = user_index[keep], days[keep]
+    n = len(days)
+
+    new_user = np.concatenate(([True], user_index[1:] != user_index[:-1]))
+    new_run = new_user | np.concatenate(([True], np.diff(days) != ONE_DAY))
+
+    run_starts = np.flatnonzero(new_run)
+    run_lengths = np.diff(np.append(run_starts, n))
+    user_first_run = _starts(user_index[run_starts][1:] != user_index[run_starts][:-1])
+    user_last_run = np.append(user_first_run[1:], len(run_starts)) - 1
+
+    user_starts = np.flatnonzero(new_user)
+    user_sizes = np.diff(np.append(user_starts, n))
+    last_day = days[user_starts + user_sizes - 1]
+    last_week = week_start(last_day)
+
+    in_week = days >= np.repeat(last_week, user_sizes)
+    bits = np.where(in_week, np.int64(1) << weekday(days), 0)
+
+    return {
+        "user_index": user_index[user_starts],
+        "last_day": last_day,
+        "current": run_lengths[user_last_run],
+        "longest": np.maximum.reduceat(run_lengths, user_first_run),
+        "week_start": last_week,
+        "week_bits": np.bitwise_or.reduceat(bits, user_starts)
+    }
+
+
+def current_as_of(last_day, current, today):
+    """Streaks still alive on ``today``: logged today or yesterday, else 0."""
+    return np.where(to_days(today) - to_days(last_day) <= ONE_DAY, current, 0)
+
+
+def week_grid(week_starts, week_bits, today):
+    """``(users, 7)`` bool grid of this week's logged weekdays (stale weeks are empty)."""
+    this_week = to_days(week_starts) == week_start(to_days(today))
+    grid = (np.asarray(week_bits)[:, None] >> np.arange(7)) & 1
+    return (grid == 1) & np.asarray(this_week).reshape(-1, 1)
+
+
+def badge_bits(names):
+    """Bitmask of the BADGES a user already holds (other names are ignored)."""
+    held = set(names or [])
+    return int(sum(int(bit) for name, bit in zip(BADGE_NAMES, BADGE_BITS) if name in held))
+
+
+def badge_names(bits):
+    return [name for name, bit in zip(BADGE_NAMES, BADGE_BITS) if int(bits) & int(bit)]
+
+
+def advance_visits(current, longest, freeze, gap, badges):
+    """One visit for each user: the visit-streak rules over parallel arrays.
+
+    ``gap`` is days since the previous visit (negative = first visit) and
+    ``badges`` the held-badge bitmask. A gap of more than a day uses up a
+    freeze if one is left, otherwise the streak restarts; every newly
+    reached badge adds its freezes. Returns ``(current, longest, freeze,
+    badges)``.
+    """
+    current, longest, freeze, gap, badges = (
+        np.asarray(a, dtype=np.int64) for a in (current, longest, freeze, gap, badges)
+    )
+
+    missed = gap > 1
+    frozen = missed & (freeze > 0)
+
+    current = np.where(gap < 0, 1,
+              np.where(gap == 1, current + 1,
+              np.where(missed & ~frozen, 1, current)))
+    freeze = freeze - frozen
+    longest = np.maximum(longest, current)
+
+    earned = (current[:, None] >= BADGE_DAYS) & ((badges[:, None] & BADGE_BITS) == 0)
+    freeze = freeze + earned @ BADGE_FREEZE
+    badges = badges | (earned * BADGE_BITS).sum(axis=1)
+
+    return current, longest, freeze, badges
@@ -0,0 +1,235 @@
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from .db import db, daily_logs
+from .streak_engine import current_as_of, log_streaks, to_datetime, to_days, week_grid
+
+# 🔹 One precomputed document per user, kept current by every daily-log insert
+tracker_summaries = db["tracker_summaries"]
+
+RECENT_LIMIT = 5
+UPDATE_RETRIES = 3
+
+# 🔹 Full rebuilds: logs per vectorised chunk and per server round trip
+REBUILD_CHUNK_LOGS = 200_000
+REBUILD_BATCH_SIZE = 10_000
+
+
+def _day(value):
+    return datetime(value.year, value.month, value.day)
+
+
+def _week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _summaries(user_index, log_dates):
+    """Summaries for every user in parallel arrays sorted by (user, date)."""
+    stats = log_streaks(user_index, to_days(log_dates))
+    starts = np.searchsorted(user_index, stats["user_index"], side="left")
+    ends = np.searchsorted(user_index, stats["user_index"], side="right")
+
+    return [
+        {
+            "lastLogDate": to_datetime(stats["last_day"][i]),
+            "currentStreak": int(stats["current"][i]),
+            "longestStreak": int(stats["longest"][i]),
+            "weekStart": to_datetime(stats["week_start"][i]),
+            "weekBits": int(stats["week_bits"][i]),
+            "recent": list(reversed(log_dates[max(start, end - RECENT_LIMIT):end]))
+        }
+        for i, (start, end) in enumerate(zip(starts, ends))
+    ]
+
+
+def summarize_dates(log_dates):
+    """Build a summary from every log datetime of one user (any order)."""
+    if not log_dates:
+        return None
+
+    log_dates = sorted(log_dates)
+    return _summaries(np.zeros(len(log_dates), dtype=np.int64), log_dates)[0]
+
+
+def rebuild_summary(user_id):
+    """Recompute one user's summary from their logs (backfill / repair)."""
+    dates = [
+        log["date"]
+        for log in daily_logs.find({"user_id": user_id}, {"date": 1, "_id": 0})
+        if log.get("date")
+    ]
+    summary = summarize_dates(dates)
+
+    if summary is None:
+        tracker_summaries.delete_one({"user_id": user_id})
+        return None
+
+    summary["updatedAt"] = datetime.utcnow()
+    tracker_summaries.update_one(
+        {"user_id": user_id},
+        {"$set": summary, "$inc": {"rev": 1}},
+        upsert=True
+    )
+    return summary
+
+
+def _advance(summary, log_date):
+    """Summary after one more log, or ``None`` if it needs a full rebuild."""
+    day = _day(log_date)
+    last_day = summary["lastLogDate"]
+
+    if day < last_day:
+        # Backdated entry (e.g. offline sync): streaks before it may change
+        return None
+
+    current = summary["currentStreak"]
+    if day == last_day + timedelta(days=1):
+        current += 1
+    elif day > last_day:
+        current = 1
+
+    week_start = _week_start(day)
+    week_bits = summary["weekBits"] if week_start == summary["weekStart"] else 0
+
+    return {
+        "lastLogDate": day,
+        "currentStreak": current,
+        "longestStreak": max(summary["longestStreak"], current),
+        "weekStart": week_start,
+        "weekBits": week_bits | (1 << day.weekday()),
+        "recent": ([log_date] + summary["recent"])[:RECENT_LIMIT],
+        "updatedAt": datetime.utcnow()
+    }
+
+
+def record_log(user_id, log_date):
+    """Fold a newly inserted log into the user's summary.
+
+    Uses the ``rev`` counter as an optimistic lock so concurrent inserts
+    for the same user can't overwrite each other; anything unusual falls
+    back to a rebuild from the logs.
+    """
+    for _ in range(UPDATE_RETRIES):
+        summary = tracker_summaries.find_one({"user_id": user_id})
+
+        if summary is None:
+            # First log, or a user from before summaries existed
+            if daily_logs.count_documents({"user_id": user_id}, limit=2) > 1:
+                return rebuild_summary(user_id)
+            fresh = summarize_dates([log_date])
+            fresh.update({"user_id": user_id, "rev": 1, "updatedAt": datetime.utcnow()})
+            try:
+                tracker_summaries.insert_one(fresh)
+                return fresh
+            except DuplicateKeyError:
+                continue
+
+        updated = _advance(summary, log_date)
+        if updated is None:
+            return rebuild_summary(user_id)
+
+        result = tracker_summaries.update_one(
+            {"_id": summary["_id"], "rev": summary.get("rev")},
+            {"$set": updated, "$inc": {"rev": 1}}
+        )
+        if result.matched_count:
+            return updated
+
+    return rebuild_summary(user_id)
+
+
+def get_summary(user_id):
+    summary = tracker_summaries.find_one({"user_id": user_id})
+    if summary is None:
+        # Lazily backfill users whose logs predate the summary collection
+        summary = rebuild_summary(user_id)
+    return summary
+
+
+def tracker_view(summary, today=None):
+    """Streak block and recent activities as of ``today`` (UTC date)."""
+    today = _day(today or datetime.utcnow())
+
+    if not summary:
+        return {
+            "streak": {"current": 0, "longest": 0, "thisWeek": [False] * 7},
+            "recentActivities": []
+        }
+
+    current = current_as_of([summary["lastLogDate"]], [summary["currentStreak"]], today)
+    this_week = week_grid([summary["weekStart"]], [summary["weekBits"]], today)
+
+    return {
+        "streak": {
+            "current": int(current[0]),
+            "longest": summary["longestStreak"],
+            "thisWeek": this_week[0].tolist()
+        },
+        "recentActivities": [
+            {
+                "action": "Logged daily wellness data",
+                "time": date.strftime("%b %d"),
+                "points": "+10"
+            }
+            for date in summary["recent"]
+        ]
+    }
+
+
+def _flush(user_ids, user_index, log_dates):
+    summaries = _summaries(np.asarray(user_index), log_dates)
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"user_id": user_id},
+            {"$set": dict(summary, updatedAt=now), "$inc": {"rev": 1}},
+            upsert=True
+        )
+        for user_id, summary in zip(user_ids, summaries)
+    ]
+    if ops:
+        tracker_summaries.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def rebuild_all(chunk_size=REBUILD_CHUNK_LOGS):
+    """Backfill / nightly recompute of every user that has logs.
+
+    Streams (user_id, date) pairs in index order and computes summaries
+    for ``chunk_size`` logs' worth of users at a time with the vectorised
+    streak engine, writing each chunk with one bulk_write.
+    """
+    # (user_id desc, date asc) walks the (user_id, date desc, _id desc) index backwards
+    cursor = daily_logs.find(
+        {"date": {"$type": "date"}},
+        {"_id": 0, "user_id": 1, "date": 1}
+    ).sort([("user_id", -1), ("date", 1)]).batch_size(REBUILD_BATCH_SIZE)
+
+    count = 0
+    user_ids, user_index, log_dates = [], [], []
+    for log in cursor:
+        if not user_ids or log["user_id"] != user_ids[-1]:
+            if len(log_dates) >= chunk_size:
+                count += _flush(user_ids, user_index, log_dates)
+                user_ids, user_index, log_dates = [], [], []
+            user_ids.append(log["user_id"])
+        user_index.append(len(user_ids) - 1)
+        log_dates.append(log["date"])
+
+    if log_dates:
+        count += _flush(user_ids, user_index, log_dates)
+    return count
+
+
+# 🔹 Backfill: python -m database.tracker [user_id]
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        summary = rebuild_summary(ObjectId(sys.argv[1]))
+        print("✅ Rebuilt summary:", summary)
+    else:
+        print(f"✅ Rebuilt {rebuild_all()} tracker summaries")
@@ -1,32 +1,234 @@
+"""Merge every CSV in dataset/ into one deduplicated corpus, streaming.
+
+Each input is read in chunks, normalised to ``text,label`` (the way
+fix_dataset.py fixes the sentiment file) and deduplicated on normalised
+text with a set of 64-bit hashes, so memory grows with the number of
+distinct rows, not with file sizes. Output:
+
+- ``dataset/merged/source=<name>/part-0.parquet`` (one partition per input,
+  kept across runs so unchanged inputs aren't re-read)
+- ``dataset/merged_dataset.csv`` (all partitions as one CSV export)
+
+Nothing in the app reads these: train_model.py, the online learner and
+the chatbot index read the Parquet catalog built by catalog/store.py from
+the raw sources. The merged corpus is for ad-hoc analysis and tools that
+want a single deduplicated ``text,label`` file.
+
+Inputs whose content hash is unchanged since the last run are not re-read;
+their stored row hashes still seed the dedupe set. ``--force`` rebuilds all.
+"""
+import argparse
+import hashlib
+import json
 import os
+import shutil
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ml.cache import normalize_text
 
-# Path to datasets folder
+# Paths
 data_dir = os.path.join(os.path.dirname(__file__), '../dataset')
 output_file = os.path.join(data_dir, 'merged_dataset.csv')
+merged_dir = os.path.join(data_dir, 'merged')
+state_file = os.path.join(merged_dir, '_state.json')
+
+CHUNK_ROWS = 50_000
+STATE_FORMAT = 1
+
+# 🔹 Files this pipeline (or fix_dataset.py) writes: never inputs
+DERIVED_FILES = {'merged_dataset.csv', 'sentiment_analysis_fixed.csv'}
+
+# 🔹 Per-source column names -> the merged schema
+COLUMN_ALIASES = {'sentiment': 'label'}
+
+SCHEMA = pa.schema([('text', pa.string()), ('label', pa.string())])
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(text):
+    return int.from_bytes(
+        hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=8).digest(),
+        'little',
+        signed=True
+    )
+
+
+def normalize_chunk(df):
+    """``text,label`` frame with blank rows dropped (None when the columns are missing)."""
+    df = df.rename(columns=COLUMN_ALIASES)
+    if 'text' not in df.columns or 'label' not in df.columns:
+        return None
+
+    df = df[['text', 'label']].dropna()
+    df['text'] = df['text'].astype(str).str.strip()
+    df['label'] = df['label'].astype(str).str.strip()
+    return df[df['text'] != '']
+
+
+def source_name(file):
+    return os.path.splitext(file)[0]
+
+
+def partition_dir(source):
+    return os.path.join(merged_dir, f'source={source}')
 
-# List all CSV files
-csv_files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
 
-if not csv_files:
-    print("❌ No CSV files found to merge!")
-else:
+def read_state():
+    try:
+        with open(state_file) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {'format': STATE_FORMAT, 'files': {}}
+    if state.get('format') != STATE_FORMAT:
+        return {'format': STATE_FORMAT, 'files': {}}
+    return state
+
+
+def write_state(state):
+    tmp = state_file + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, state_file)
+
+
+def merge_file(path, source, seen):
+    """Stream one CSV into its partition; returns (rows read, rows kept)."""
+    target = partition_dir(source)
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+
+    rows = kept = 0
+    hashes = []
+    writer = None
+    try:
+        for chunk in pd.read_csv(path, chunksize=CHUNK_ROWS):
+            rows += len(chunk)
+            chunk = normalize_chunk(chunk)
+            if chunk is None:
+                print(f"⚠️ {source}: no text/label columns, skipped")
+                break
+
+            keys = chunk['text'].map(text_hash)
+            fresh = []
+            for key in keys:
+                fresh.append(key not in seen)
+                seen.add(key)
+            chunk = chunk[fresh]
+            if chunk.empty:
+                continue
+
+            hashes.append(keys[fresh].to_numpy(dtype=np.int64))
+            kept += len(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(os.path.join(target, 'part-0.parquet'), SCHEMA)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=SCHEMA, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    # Lets the next run skip this file and still dedupe against it
+    np.save(os.path.join(target, '_hashes.npy'), np.concatenate(hashes) if hashes else np.zeros(0, np.int64))
+    return rows, kept
+
+
+def write_csv(sources):
+    """Concatenate the partitions into merged_dataset.csv, one row group at a time."""
+    tmp = output_file + '.tmp'
+    total = 0
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        pd.DataFrame(columns=['text', 'label']).to_csv(f, index=False)
+        for source in sources:
+            part = os.path.join(partition_dir(source), 'part-0.parquet')
+            if not os.path.exists(part):
+                continue
+            parquet = pq.ParquetFile(part)
+            for i in range(parquet.num_row_groups):
+                df = parquet.read_row_group(i).to_pandas()
+                df.to_csv(f, index=False, header=False)
+                total += len(df)
+    os.replace(tmp, output_file)
+    return total
+
+
+def merge(force=False):
+    csv_files = sorted(
+        f for f in os.listdir(data_dir)
+        if f.endswith('.csv') and f not in DERIVED_FILES
+    )
+    if not csv_files:
+        print("❌ No CSV files found to merge!")
+        return None
+
     print(f"🔹 Found {len(csv_files)} CSV files to merge: {csv_files}")
+    os.makedirs(merged_dir, exist_ok=True)
+
+    previous = {} if force else read_state()['files']
+    previous_order = list(previous)
+    state = {'format': STATE_FORMAT, 'files': {}}
+    seen = set()
+    by_hash = {}
+    sources = []
+    # Dedupe keeps the first copy, so once one input changes (or an earlier
+    # one appears or disappears) every later one is redone
+    dirty = False
 
-    dfs = []
     for file in csv_files:
-        file_path = os.path.join(data_dir, file)
-        print(f"➡️ Reading {file_path} ...")
-        df = pd.read_csv(file_path)
-        dfs.append(df)
+        path = os.path.join(data_dir, file)
+        digest = file_sha256(path)
+
+        if digest in by_hash:
+            print(f"⏭️ {file}: same content as {by_hash[digest]}, skipped")
+            continue
+        by_hash[digest] = file
+
+        source = source_name(file)
+        hashes_path = os.path.join(partition_dir(source), '_hashes.npy')
+        entry = previous.get(file)
+        same_prefix = previous_order[:len(sources) + 1] == list(state['files']) + [file]
+
+        if not dirty and same_prefix and entry and entry['sha256'] == digest and os.path.exists(hashes_path):
+            seen.update(np.load(hashes_path).tolist())
+            print(f"✅ {file}: unchanged, {entry['kept']} rows reused")
+        else:
+            dirty = True
+            print(f"➡️ Reading {path} ...")
+            rows, kept = merge_file(path, source, seen)
+            entry = {'sha256': digest, 'rows': rows, 'kept': kept}
+            print(f"   {rows} rows read, {kept} kept")
+
+        state['files'][file] = dict(entry, source=source)
+        sources.append(source)
+
+    # Partitions of inputs that are gone (or now duplicates) must not linger
+    for file, entry in previous.items():
+        if file not in state['files'] and entry.get('source') not in sources:
+            shutil.rmtree(partition_dir(entry['source']), ignore_errors=True)
+
+    if dirty or set(previous) != set(state['files']) or not os.path.exists(output_file):
+        total = write_csv(sources)
+    else:
+        total = sum(entry['kept'] for entry in state['files'].values())
+        print("✅ Nothing changed, merged_dataset.csv kept as is")
+    write_state(state)
 
-    # Merge all
-    merged_df = pd.concat(dfs, ignore_index=True)
+    print(f"✅ Merged dataset saved as: {output_file} (Parquet: {merged_dir})")
+    print(f"📊 Total rows: {total}")
+    return state
 
-    # Drop duplicates
-    merged_df.drop_duplicates(inplace=True)
 
-    # Save merged file
-    merged_df.to_csv(output_file, index=False)
-    print(f"✅ Merged dataset saved as: {output_file}")
-    print(f"📊 Total rows: {len(merged_df)}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="ignore the saved state and re-read every input")
+    args = parser.parse_args()
+    merge(force=args.force)
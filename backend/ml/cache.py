@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 🔹 Cache settings (shared tier is off unless INFERENCE_CACHE_DB is set)
+CACHE_SIZE = int(os.getenv("INFERENCE_CACHE_SIZE", "10000"))
+CACHE_TTL = float(os.getenv("INFERENCE_CACHE_TTL", "3600"))
+SHARED_CACHE_PATH = os.getenv("INFERENCE_CACHE_DB")
+
+# 🔹 How often a worker checks the shared tier for an invalidation
+GENERATION_CHECK_SECONDS = 1.0
+
+# 🔹 Expired rows are pruned from the shared tier every this many writes
+SHARED_PRUNE_EVERY = 1000
+
+# 🔹 Every cache created in this process, by namespace (for stats)
+CACHES = {}
+
+
+def normalize_text(text):
+    return " ".join(str(text).lower().split())
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " namespace TEXT, key TEXT, value TEXT, expires REAL,"
+        " PRIMARY KEY (namespace, key))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS generations ("
+        " namespace TEXT PRIMARY KEY, generation INTEGER)"
+    )
+    return conn
+
+
+def invalidate_shared(namespace, path=SHARED_CACHE_PATH):
+    """Drop a namespace from the shared tier and tell every worker to clear its own tier."""
+    if not path:
+        return
+    conn = _connect(path)
+    try:
+        conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+        conn.execute(
+            "INSERT INTO generations (namespace, generation) VALUES (?, 1) "
+            "ON CONFLICT(namespace) DO UPDATE SET generation = generation + 1",
+            (namespace,)
+        )
+    finally:
+        conn.close()
+
+
+class InferenceCache:
+    """Bounded LRU + TTL cache keyed on normalised text and a model version.
+
+    The in-process tier is an ``OrderedDict``. When ``shared_path`` is set,
+    misses fall through to a SQLite file so workers on the same host share
+    hits; values must be JSON-serialisable.
+    """
+
+    def __init__(self, namespace, max_entries=CACHE_SIZE, ttl_seconds=CACHE_TTL,
+                 shared_path=SHARED_CACHE_PATH):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.shared_path = shared_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = None
+        self._generation_checked = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+        self._shared_writes = 0
+
+        CACHES[namespace] = self
+
+    def _key(self, text, version):
+        return f"{version}:{normalize_text(text)}"
+
+    def _shared(self):
+        if not self.shared_path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = _connect(self.shared_path)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _check_generation(self):
+        now = time.monotonic()
+        if not self.shared_path or now - self._generation_checked < GENERATION_CHECK_SECONDS:
+            return
+        self._generation_checked = now
+
+        row = self._shared().execute(
+            "SELECT generation FROM generations WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        generation = row[0] if row else 0
+
+        if self._generation is not None and generation != self._generation:
+            with self._lock:
+                self._entries.clear()
+        self._generation = generation
+
+    def get(self, text, version):
+        key = self._key(text, version)
+        now = time.time()
+
+        try:
+            self._check_generation()
+        except sqlite3.Error:
+            pass
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._get_shared(key, now)
+        if value is not None:
+            self._set_local(key, value, now, shared_hit=True)
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _get_shared(self, key, now):
+        try:
+            conn = self._shared()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT value, expires FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if row is None or row[1] <= now:
+            return None
+        return json.loads(row[0])
+
+    def _set_local(self, key, value, now, shared_hit=False):
+        with self._lock:
+            if shared_hit:
+                self.shared_hits += 1
+                self.hits += 1
+            self._entries[key] = (value, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set(self, text, version, value):
+        key = self._key(text, version)
+        now = time.time()
+        self._set_local(key, value, now)
+
+        try:
+            conn = self._shared()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now + self.ttl)
+                )
+                with self._lock:
+                    self._shared_writes += 1
+                    prune = self._shared_writes % SHARED_PRUNE_EVERY == 0
+                if prune:
+                    conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        except sqlite3.Error:
+            pass
+
+    def get_or_compute(self, text, version, compute):
+        value = self.get(text, version)
+        if value is None:
+            value = compute()
+            self.set(text, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        invalidate_shared(self.namespace, self.shared_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "sharedHits": self.shared_hits
+            }
+
+
+def artifact_version(*paths):
+    """Cheap version tag for on-disk artifacts: changes whenever a file is rewritten."""
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        except OSError:
+            digest.update(f"{path}:missing".encode())
+    return digest.hexdigest()[:12]
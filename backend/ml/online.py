@@ -0,0 +1,352 @@
+"""Online learning: fold newly logged journal entries into the emotion model.
+
+A daily log carries the user's own ``mood``, so every journal entry whose
+mood names an emotion is a labelled example. Each run:
+
+1. reads the logs created since the last run (keyset on ``createdAt, _id``)
+2. holds out a stable slice of them (by text hash) in a bounded buffer
+3. updates a HashingVectorizer + SGDClassifier with ``partial_fit`` (the
+   hashed feature space never changes, so no refit of the vocabulary)
+4. scores the update on the holdout buffer and publishes a registry
+   version only when it is no worse than the model it would replace
+
+The learner state (model, watermark, holdout buffer) lives next to the
+registry; the first run seeds it from the catalog with one streamed pass::
+
+    python -m ml.online              # one run (cron)
+    python -m ml.online --loop       # every ONLINE_INTERVAL_SECONDS
+    python -m ml.online --dry-run    # score the update, publish nothing
+"""
+import argparse
+import copy
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: byte-range locks from msvcrt instead of flock
+    fcntl = None
+    import msvcrt
+
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score
+
+from . import training
+from .cache import invalidate_shared
+from .predictor import emotion_name
+from .registry import REGISTRY_DIR, current_version, load_version, publish
+
+ONLINE_DIR = os.getenv("ONLINE_LEARNING_DIR", os.path.join(REGISTRY_DIR, ".online"))
+STATE_FILE = "state.joblib"
+LOCK_FILE = "online.lock"
+STATE_FORMAT = 1
+
+# 🔹 Catalog sources the learner is seeded from (its first run only)
+ONLINE_BASE_SOURCES = os.getenv("ONLINE_BASE_SOURCES", "emotion")
+
+# 🔹 Per run: logs read per batch, at most this many logs, and the fewest worth an update
+ONLINE_BATCH_ROWS = int(os.getenv("ONLINE_BATCH_ROWS", "1000"))
+ONLINE_MAX_ROWS = int(os.getenv("ONLINE_MAX_ROWS", "50000"))
+ONLINE_MIN_ROWS = int(os.getenv("ONLINE_MIN_ROWS", "50"))
+
+# 🔹 Logs younger than this are left for the next run (inserts still in flight)
+ONLINE_SETTLE_SECONDS = int(os.getenv("ONLINE_SETTLE_SECONDS", "60"))
+ONLINE_INTERVAL_SECONDS = int(os.getenv("ONLINE_INTERVAL_SECONDS", "3600"))
+
+# 🔹 Holdout buffer: a fixed catalog sample plus the most recent held-out journals
+ONLINE_BASE_HOLDOUT = int(os.getenv("ONLINE_BASE_HOLDOUT", "5000"))
+ONLINE_HOLDOUT_MAX = int(os.getenv("ONLINE_HOLDOUT_MAX", "5000"))
+
+# 🔹 Replay: catalog rows mixed into every update (journal moods cover only three
+# emotions; updating on them alone makes the model forget the other three)
+ONLINE_REPLAY_SIZE = int(os.getenv("ONLINE_REPLAY_SIZE", "20000"))
+ONLINE_REPLAY_RATIO = float(os.getenv("ONLINE_REPLAY_RATIO", "3.0"))
+
+# 🔹 Accuracy an update may lose on the holdout and still count as "no regression"
+ONLINE_TOLERANCE = float(os.getenv("ONLINE_TOLERANCE", "0.002"))
+
+HISTORY_SIZE = 50
+
+
+def _state_path(online_dir):
+    return os.path.join(online_dir, STATE_FILE)
+
+
+def _lock(f, locked):
+    # Non-blocking; both raise OSError when another process holds the lock
+    if fcntl is not None:
+        fcntl.flock(f, (fcntl.LOCK_EX | fcntl.LOCK_NB) if locked else fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK if locked else msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _run_lock(online_dir):
+    """One learner at a time (a cron run overlapping a --loop one would fork the state)."""
+    os.makedirs(online_dir, exist_ok=True)
+    with open(os.path.join(online_dir, LOCK_FILE), "w") as f:
+        try:
+            _lock(f, True)
+        except OSError:
+            raise RuntimeError("Another online learning run holds the lock")
+        try:
+            yield
+        finally:
+            _lock(f, False)
+
+
+def load_state(online_dir=ONLINE_DIR):
+    try:
+        state = joblib.load(_state_path(online_dir))
+    except (OSError, EOFError, ValueError):
+        return None
+    if state.get("format") != STATE_FORMAT:
+        return None
+    return state
+
+
+def save_state(state, online_dir=ONLINE_DIR):
+    os.makedirs(online_dir, exist_ok=True)
+    path = _state_path(online_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(state, tmp)
+    os.replace(tmp, path)
+
+
+def seed_state(sources):
+    """Learner state from one streamed pass over the catalog (first run only)."""
+    print(f"🌱 Seeding the online learner from {', '.join(sources)}")
+    model, vectorizer, result = training.train_stream(sources, epochs=1)
+
+    # The seed's own holdout rule, so holdout rows were never trained on
+    base_texts, base_labels = [], []
+    replay_texts, replay_labels = [], []
+    for texts, labels in training.iter_batches(sources):
+        for text, label in zip(texts, labels):
+            if training.is_holdout(text):
+                base_texts.append(text)
+                base_labels.append(label)
+            else:
+                replay_texts.append(text)
+                replay_labels.append(label)
+        if len(base_texts) >= ONLINE_BASE_HOLDOUT and len(replay_texts) >= ONLINE_REPLAY_SIZE:
+            break
+
+    return {
+        "format": STATE_FORMAT,
+        "model": model,
+        "vectorizer": vectorizer,
+        # Journals are left to the first run, behind the regression gate
+        "watermark": None,
+        "seededAt": datetime.utcnow(),
+        "seedRows": result["rows"],
+        "base": (base_texts[:ONLINE_BASE_HOLDOUT], base_labels[:ONLINE_BASE_HOLDOUT]),
+        "replay": (replay_texts[:ONLINE_REPLAY_SIZE], replay_labels[:ONLINE_REPLAY_SIZE]),
+        "recent": deque(maxlen=ONLINE_HOLDOUT_MAX),
+        "rows": 0,
+        "publishedVersion": None,
+        "history": []
+    }
+
+
+def _log_query(watermark, until):
+    query = {
+        "journalEntry": {"$nin": [None, ""]},
+        "mood": {"$in": list(training.MOOD_EMOTIONS)},
+        "createdAt": {"$lt": until}
+    }
+    if watermark:
+        created, log_id = watermark
+        query["$or"] = [
+            {"createdAt": {"$gt": created}},
+            {"createdAt": created, "_id": {"$gt": log_id}}
+        ]
+    return query
+
+
+def iter_new_logs(watermark, until, batch_rows=ONLINE_BATCH_ROWS, max_rows=ONLINE_MAX_ROWS, collection=None):
+    """``(texts, labels, last_key)`` batches of labelled logs after ``watermark``, oldest first."""
+    if collection is None:
+        from database.db import daily_logs as collection
+
+    cursor = collection.find(
+        _log_query(watermark, until),
+        {"journalEntry": 1, "mood": 1, "createdAt": 1}
+    ).sort([("createdAt", 1), ("_id", 1)]).limit(max_rows).batch_size(batch_rows)
+
+    texts, labels, last = [], [], None
+    for log in cursor:
+        texts.append(log["journalEntry"])
+        labels.append(training.MOOD_EMOTIONS[log["mood"]])
+        last = (log["createdAt"], log["_id"])
+        if len(texts) >= batch_rows:
+            yield texts, labels, last
+            texts, labels = [], []
+    if texts:
+        yield texts, labels, last
+
+
+def with_replay(state, texts, labels, rng):
+    """A journal batch plus a random sample of the catalog rows the seed was trained on."""
+    replay_texts, replay_labels = state["replay"]
+    count = min(int(len(texts) * ONLINE_REPLAY_RATIO), len(replay_texts))
+    if not count:
+        return texts, labels
+    picked = rng.choice(len(replay_texts), count, replace=False)
+    return (
+        texts + [replay_texts[i] for i in picked],
+        labels + [replay_labels[i] for i in picked]
+    )
+
+
+def holdout_set(state):
+    texts, labels = list(state["base"][0]), list(state["base"][1])
+    for text, label in state["recent"]:
+        texts.append(text)
+        labels.append(label)
+    return texts, labels
+
+
+def score(model, vectorizer, texts, labels):
+    if not texts:
+        return None
+    predicted = [emotion_name(label) for label in model.predict(vectorizer.transform(texts))]
+    return round(float(accuracy_score(labels, predicted)), 4)
+
+
+def _live_accuracy(state, texts, labels):
+    """Holdout accuracy of the served registry version, unless it is this learner's own."""
+    version = current_version()
+    if not version or version == state["publishedVersion"]:
+        return version, None
+    try:
+        live = load_version(version)
+        return version, score(live["model"], live["vectorizer"], texts, labels)
+    except Exception as e:
+        print(f"⚠️ Could not score live version {version}: {e}")
+        return version, None
+
+
+def run_once(dry_run=False, online_dir=ONLINE_DIR, collection=None, now=None):
+    """One learning step; returns the run record (also kept in the state's history)."""
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    until = now - timedelta(seconds=ONLINE_SETTLE_SECONDS)
+
+    with _run_lock(online_dir):
+        state = load_state(online_dir)
+        seeded = state is None
+        if seeded:
+            sources = [name.strip() for name in ONLINE_BASE_SOURCES.split(",") if name.strip()]
+            state = seed_state(sources)
+
+        record = {"startedAt": now.isoformat(), "rows": 0, "trainRows": 0, "holdoutRows": 0}
+        candidate = copy.deepcopy(state["model"])
+        vectorizer = state["vectorizer"]
+        new_holdout = []
+        watermark = state["watermark"]
+        rng = np.random.default_rng(len(state["history"]))
+
+        for texts, labels, last in iter_new_logs(state["watermark"], until, collection=collection):
+            held = [training.is_holdout(text) for text in texts]
+            train_texts = [t for t, h in zip(texts, held) if not h]
+            train_labels = [l for l, h in zip(labels, held) if not h]
+            new_holdout.extend((t, l) for t, l, h in zip(texts, labels, held) if h)
+
+            record["rows"] += len(texts)
+            record["trainRows"] += len(train_texts)
+            if train_texts:
+                train_texts, train_labels = with_replay(state, train_texts, train_labels, rng)
+                candidate.partial_fit(vectorizer.transform(train_texts), train_labels)
+            watermark = last
+
+        if record["rows"] < ONLINE_MIN_ROWS:
+            # Not worth a version yet: leave the logs for a later run
+            record["status"] = "waiting"
+            print(f"⏳ {record['rows']} new labelled logs (< {ONLINE_MIN_ROWS}), nothing to do")
+            if seeded and not dry_run:
+                save_state(state, online_dir)
+            return record
+
+        record["holdoutRows"] = len(new_holdout)
+        # Score the update and what it replaces on the same rows, including the new holdout
+        state["recent"].extend(new_holdout)
+        texts, labels = holdout_set(state)
+        record["holdoutSize"] = len(texts)
+        record["previousAccuracy"] = score(state["model"], vectorizer, texts, labels)
+        record["accuracy"] = score(candidate, vectorizer, texts, labels)
+        record["liveVersion"], record["liveAccuracy"] = _live_accuracy(state, texts, labels)
+
+        baseline = max(a for a in (record["previousAccuracy"], record["liveAccuracy"], 0.0) if a is not None)
+        improved = record["accuracy"] >= record["previousAccuracy"] - ONLINE_TOLERANCE
+        publishable = record["accuracy"] >= baseline - ONLINE_TOLERANCE
+
+        print(f"🔹 {record['rows']} logs ({record['trainRows']} trained, {record['holdoutRows']} held out); "
+              f"holdout accuracy {record['previousAccuracy']} -> {record['accuracy']}"
+              + (f", live {record['liveVersion']} {record['liveAccuracy']}" if record["liveAccuracy"] is not None else ""))
+
+        if dry_run:
+            record["status"] = "dry-run"
+            return record
+
+        if improved:
+            # The learner keeps the update even when a stronger offline model is live
+            state["model"] = candidate
+            state["rows"] += record["trainRows"]
+        else:
+            candidate = None
+        # Consumed either way: a rejected batch is not retried forever
+        state["watermark"] = watermark
+
+        if candidate is not None and publishable:
+            record["version"] = publish(candidate, vectorizer, {
+                "accuracy": record["accuracy"],
+                "mode": "online",
+                "dataSource": ",".join([ONLINE_BASE_SOURCES, training.JOURNAL_SOURCE]),
+                "dataHash": f"journal@{watermark[0].isoformat()}/{watermark[1]}",
+                "labels": [str(label) for label in candidate.classes_],
+                "rows": state["seedRows"] + state["rows"],
+                "holdoutSize": record["holdoutSize"],
+                "replaces": record["liveVersion"],
+                "trainedAt": datetime.utcnow().isoformat()
+            })
+            state["publishedVersion"] = record["version"]
+            record["status"] = "published"
+            print(f"✅ Model version {record['version']} published")
+            # Cached predictions came from the old model
+            invalidate_shared("predict")
+        else:
+            record["status"] = "learned" if candidate is not None else "rejected"
+            print("🛑 Update regressed on the holdout, not published" if candidate is None
+                  else "🔸 Update kept by the learner, live model still scores higher")
+
+        record["seconds"] = round(time.perf_counter() - started, 2)
+        state["history"] = (state["history"] + [record])[-HISTORY_SIZE:]
+        save_state(state, online_dir)
+        return record
+
+
+# 🔹 Service: python -m ml.online [--loop] [--dry-run]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loop", action="store_true", help="run every --interval seconds")
+    parser.add_argument("--interval", type=int, default=ONLINE_INTERVAL_SECONDS)
+    parser.add_argument("--dry-run", action="store_true", help="score the update without saving or publishing")
+    args = parser.parse_args()
+
+    while True:
+        try:
+            run_once(dry_run=args.dry_run)
+        except Exception as e:
+            if not args.loop:
+                raise
+            print("❌ Online learning run failed:", e)
+        if not args.loop:
+            break
+        time.sleep(args.interval)
@@ -0,0 +1,67 @@
+import numpy as np
+
+from catalog.sources import EMOTION_NAMES
+from telemetry.metrics import span
+
+# 🔹 Model label id → emotion name (models trained before the catalog predict ids)
+EMOTION_LABELS = dict(enumerate(EMOTION_NAMES))
+
+# 🔊 Emotion → Sound mapping
+SOUND_MAP = {
+    "sadness": "rain.mp3",
+    "anger": "om.mp3",
+    "fear": "jungle.mp3",
+    "joy": "happy.mp3",
+    "love": "calm.mp3",
+    "surprise": "waves.mp3",
+    "stress": "bowls.mp3"
+}
+DEFAULT_SOUND = "calm.mp3"
+
+
+def emotion_name(label):
+    """Emotion name for a model class, whether it was trained on ids or names."""
+    if isinstance(label, (int, np.integer)):
+        return EMOTION_LABELS.get(int(label), "unknown")
+    return str(label)
+
+
+def _json_label(label):
+    return int(label) if isinstance(label, (int, np.integer)) else str(label)
+
+
+def predict_texts(model, vectorizer, texts):
+    """Predict emotions for a list of texts with one vectorisation and one model call.
+
+    Each result carries the argmax label, the emotion and its sound, plus the
+    per-class probabilities when the model exposes ``predict_proba``.
+    """
+    with span("vectorize", "emotion"):
+        X = vectorizer.transform(texts)
+
+    with span("inference", "emotion"):
+        if hasattr(model, "predict_proba"):
+            proba = model.predict_proba(X)
+            predictions = model.classes_[proba.argmax(axis=1)]
+        else:
+            proba = None
+            predictions = model.predict(X)
+    if proba is not None:
+        class_names = [emotion_name(c) for c in model.classes_]
+
+    results = []
+    for i, text in enumerate(texts):
+        emotion = emotion_name(predictions[i])
+        result = {
+            "text": text,
+            "predicted_label": _json_label(predictions[i]),
+            "emotion": emotion,
+            "sound": SOUND_MAP.get(emotion, DEFAULT_SOUND)
+        }
+        if proba is not None:
+            result["probabilities"] = {
+                name: round(float(p), 4) for name, p in zip(class_names, proba[i])
+            }
+        results.append(result)
+
+    return results
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import joblib
+
+from ml.cache import artifact_version
+from telemetry.logs import get_logger
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# 🔹 Versioned artifacts: <registry>/<version>/{emotion_model.pkl, vectorizer.pkl, meta.json}
+REGISTRY_DIR = os.getenv(
+    "MODEL_REGISTRY_DIR",
+    os.path.join(BACKEND_DIR, "models", "registry")
+)
+CURRENT_FILE = "CURRENT"
+MODEL_FILE = "emotion_model.pkl"
+VECTORIZER_FILE = "vectorizer.pkl"
+META_FILE = "meta.json"
+
+# 🔹 Bundled artifacts served until the first version is published
+LEGACY_MODEL_PATH = os.path.join(BACKEND_DIR, "models", MODEL_FILE)
+LEGACY_VECTORIZER_PATH = os.path.join(BACKEND_DIR, "models", VECTORIZER_FILE)
+
+# 🔹 How often a worker looks for a newly published version
+CHECK_INTERVAL_SECONDS = float(os.getenv("MODEL_REGISTRY_CHECK_SECONDS", "5"))
+
+log = get_logger(__name__)
+
+
+def data_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def publish(model, vectorizer, metadata=None, registry_dir=REGISTRY_DIR, activate=True):
+    """Write a new model version and, by default, point CURRENT at it.
+
+    Artifacts are dumped uncompressed so workers can load them with
+    ``mmap_mode`` and share the pages. ``metadata`` should carry at least
+    ``accuracy`` and ``dataHash``.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    version = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    tmp_dir = tempfile.mkdtemp(prefix=".publish-", dir=registry_dir)
+
+    try:
+        joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE))
+        joblib.dump(vectorizer, os.path.join(tmp_dir, VECTORIZER_FILE))
+
+        meta = dict(metadata or {})
+        meta.update({"version": version, "publishedAt": datetime.utcnow().isoformat()})
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        os.replace(tmp_dir, os.path.join(registry_dir, version))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if activate:
+        activate_version(version, registry_dir)
+    return version
+
+
+def activate_version(version, registry_dir=REGISTRY_DIR):
+    """Point CURRENT at an existing version (also used for rollbacks)."""
+    if not os.path.exists(os.path.join(registry_dir, version, META_FILE)):
+        raise ValueError(f"Unknown model version '{version}'")
+    _write_atomic(os.path.join(registry_dir, CURRENT_FILE), version)
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    versions = []
+    if not os.path.isdir(registry_dir):
+        return versions
+    for name in sorted(os.listdir(registry_dir)):
+        meta_path = os.path.join(registry_dir, name, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                versions.append(json.load(f))
+    return versions
+
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    version_dir = os.path.join(registry_dir, version)
+    with open(os.path.join(version_dir, META_FILE), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    return {
+        "version": version,
+        "meta": meta,
+        "model": joblib.load(os.path.join(version_dir, MODEL_FILE), mmap_mode="r"),
+        "vectorizer": joblib.load(os.path.join(version_dir, VECTORIZER_FILE), mmap_mode="r")
+    }
+
+
+def load_legacy():
+    return {
+        "version": f"legacy-{artifact_version(LEGACY_MODEL_PATH, LEGACY_VECTORIZER_PATH)}",
+        "meta": {"source": "bundled"},
+        "model": joblib.load(LEGACY_MODEL_PATH),
+        "vectorizer": joblib.load(LEGACY_VECTORIZER_PATH)
+    }
+
+
+class ModelRegistry:
+    """Worker-side view of the registry that hot-swaps to new versions.
+
+    :meth:`get` returns an immutable snapshot (model, vectorizer, version),
+    so a request keeps using the model it started with. At most every
+    ``check_interval`` seconds it stats CURRENT; a new version is loaded
+    in a background thread and swapped in with a single assignment once
+    fully loaded, so no request ever waits on a reload.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, check_interval=CHECK_INTERVAL_SECONDS):
+        self.registry_dir = registry_dir
+        self.check_interval = check_interval
+
+        self._active = None
+        self._lock = threading.Lock()
+        self._loading = False
+        self._checked_at = 0.0
+        self._current_mtime = None
+
+    def _current_mtime_ns(self):
+        try:
+            return os.stat(os.path.join(self.registry_dir, CURRENT_FILE)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_current(self):
+        version = current_version(self.registry_dir)
+        if version:
+            return load_version(version, self.registry_dir)
+        return load_legacy()
+
+    def _reload(self, mtime):
+        try:
+            snapshot = self._load_current()
+            self._active = snapshot
+            log.info("Model version %s is now live", snapshot["version"])
+        except Exception as e:
+            log.warning("Model reload failed, keeping current version: %s", e)
+        finally:
+            with self._lock:
+                self._current_mtime = mtime
+                self._loading = False
+
+    def get(self):
+        """Active snapshot dict, or ``None`` when no model could be loaded."""
+        if self._active is None:
+            with self._lock:
+                if self._active is None:
+                    # Don't retry a failing load on every request
+                    now = time.monotonic()
+                    if self._checked_at and now - self._checked_at < self.check_interval:
+                        return None
+                    self._current_mtime = self._current_mtime_ns()
+                    self._checked_at = now
+                    try:
+                        self._active = self._load_current()
+                        log.info("Model version %s loaded", self._active["version"])
+                    except Exception as e:
+                        log.warning("Model not loaded yet: %s", e)
+                        return None
+            return self._active
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            mtime = self._current_mtime_ns()
+            with self._lock:
+                start = mtime != self._current_mtime and not self._loading
+                if start:
+                    self._loading = True
+            if start:
+                threading.Thread(target=self._reload, args=(mtime,), daemon=True).start()
+
+        return self._active
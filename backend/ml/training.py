@@ -0,0 +1,368 @@
+"""Training modes for the emotion classifier (driven by train_model.py).
+
+- ``full``: TF-IDF + LogisticRegression on an in-memory split (the original job)
+- ``stream``: HashingVectorizer + SGDClassifier.partial_fit over batches read
+  straight from the catalog's Parquet files (and optionally daily-log
+  journals), so memory stays flat however large the corpus grows
+- ``search``: parallel cross-validated search over vectorizer and model
+  settings; each vectorised fold is computed once, cached on disk and
+  memory-mapped by every candidate that shares it
+"""
+import hashlib
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+import zlib
+
+try:
+    import resource
+except ImportError:
+    # Windows: no getrusage, so no peak RSS in the report
+    resource = None
+
+import joblib
+import numpy as np
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from catalog.sources import EMOTION_NAMES
+from catalog.store import CATALOG_DIR, load as load_dataset, source_info
+from .registry import REGISTRY_DIR
+
+STREAM_BATCH_ROWS = 10_000
+HASH_FEATURES = 1 << 18
+# Every HOLDOUT_EVERY-th text (by content hash) is held out, up to HOLDOUT_MAX rows
+HOLDOUT_EVERY = 10
+HOLDOUT_MAX = 50_000
+
+FOLD_CACHE_DIR = os.getenv("TRAINING_FOLD_CACHE", os.path.join(REGISTRY_DIR, ".fold_cache"))
+
+# 🔹 Journal moods that name an emotion the model knows (calm/neutral have none)
+MOOD_EMOTIONS = {"happy": "joy", "sad": "sadness", "angry": "anger"}
+JOURNAL_SOURCE = "journal"
+
+# 🔹 Search space (kept small: every vectorizer x model x fold is one fit)
+VECTORIZER_GRID = [
+    {"kind": "tfidf", "max_features": 5000, "ngram_range": [1, 1]},
+    {"kind": "tfidf", "max_features": 20000, "ngram_range": [1, 2], "sublinear_tf": True},
+    {"kind": "hashing", "n_features": 1 << 16, "ngram_range": [1, 2]},
+]
+MODEL_GRID = [
+    {"kind": "logreg", "C": 1.0},
+    {"kind": "logreg", "C": 4.0},
+    {"kind": "sgd", "alpha": 1e-5},
+]
+
+LATENCY_SAMPLES = 200
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, ``None`` where it can't be read."""
+    if resource is None:
+        return None
+    # Linux reports KiB, macOS bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def make_vectorizer(params):
+    params = dict(params)
+    kind = params.pop("kind")
+    if "ngram_range" in params:
+        params["ngram_range"] = tuple(params["ngram_range"])
+    if kind == "hashing":
+        return HashingVectorizer(alternate_sign=False, **params)
+    return TfidfVectorizer(**params)
+
+
+def make_model(params):
+    params = dict(params)
+    kind = params.pop("kind")
+    if kind == "sgd":
+        return SGDClassifier(loss="log_loss", random_state=42, **params)
+    return LogisticRegression(max_iter=1000, **params)
+
+
+def classes_for(sources):
+    labels = []
+    for name in sources:
+        names = EMOTION_NAMES if name == JOURNAL_SOURCE else source_info(name)["labels"]
+        labels.extend(label for label in names or [] if label not in labels)
+    return labels
+
+
+def iter_source_batches(name, batch_rows=STREAM_BATCH_ROWS):
+    """``(texts, labels)`` batches of one catalog source, never the whole file."""
+    parquet = pq.ParquetFile(os.path.join(CATALOG_DIR, source_info(name)["file"]), memory_map=True)
+    for batch in parquet.iter_batches(batch_size=batch_rows, columns=["text", "label"]):
+        columns = batch.to_pydict()
+        yield columns["text"], [str(label) for label in columns["label"]]
+
+
+def iter_journal_batches(batch_rows=STREAM_BATCH_ROWS):
+    """Daily-log journal entries labelled through their mood."""
+    from database.db import daily_logs
+
+    cursor = daily_logs.find(
+        {"journalEntry": {"$nin": [None, ""]}, "mood": {"$in": list(MOOD_EMOTIONS)}},
+        {"_id": 0, "journalEntry": 1, "mood": 1}
+    ).batch_size(batch_rows)
+
+    texts, labels = [], []
+    for log in cursor:
+        texts.append(log["journalEntry"])
+        labels.append(MOOD_EMOTIONS[log["mood"]])
+        if len(texts) >= batch_rows:
+            yield texts, labels
+            texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+
+def iter_batches(sources, batch_rows=STREAM_BATCH_ROWS):
+    for name in sources:
+        if name == JOURNAL_SOURCE:
+            yield from iter_journal_batches(batch_rows)
+        else:
+            yield from iter_source_batches(name, batch_rows)
+
+
+def load_texts(sources):
+    """All texts and labels of ``sources`` in memory (full and search modes)."""
+    texts, labels = [], []
+    for name in sources:
+        if name == JOURNAL_SOURCE:
+            for batch_texts, batch_labels in iter_journal_batches():
+                texts.extend(batch_texts)
+                labels.extend(batch_labels)
+        else:
+            df = load_dataset(name, columns=["text", "label"])
+            texts.extend(df["text"].astype(str).tolist())
+            labels.extend(df["label"].astype(str).tolist())
+    return texts, labels
+
+
+def is_holdout(text):
+    return zlib.crc32(text.encode("utf-8")) % HOLDOUT_EVERY == 0
+
+
+def measure_latency(model, vectorizer, texts, samples=LATENCY_SAMPLES):
+    """Per-row batch latency and single-message latency (vectorise + predict)."""
+    texts = list(texts)
+    if not texts:
+        return {}
+
+    started = time.perf_counter()
+    model.predict_proba(vectorizer.transform(texts))
+    batch_us = (time.perf_counter() - started) / len(texts) * 1e6
+
+    singles = []
+    for text in texts[:samples]:
+        started = time.perf_counter()
+        model.predict_proba(vectorizer.transform([text]))
+        singles.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "batchUsPerRow": round(batch_us, 2),
+        "singleMsP50": round(float(np.percentile(singles, 50)), 3),
+        "singleMsP95": round(float(np.percentile(singles, 95)), 3)
+    }
+
+
+def train_full(sources, test_size=0.2):
+    """The original job: TF-IDF(5000) + LogisticRegression on one fixed split."""
+    started = time.perf_counter()
+    texts, labels = load_texts(sources)
+    X_train, X_test, y_train, y_test = train_test_split(
+        texts, labels, test_size=test_size, random_state=42
+    )
+
+    vectorizer = make_vectorizer(VECTORIZER_GRID[0])
+    model = make_model(MODEL_GRID[0])
+    model.fit(vectorizer.fit_transform(X_train), y_train)
+    accuracy = accuracy_score(y_test, model.predict(vectorizer.transform(X_test)))
+
+    return model, vectorizer, {
+        "mode": "full",
+        "rows": len(texts),
+        "accuracy": round(float(accuracy), 4),
+        "wallSeconds": round(time.perf_counter() - started, 2),
+        "peakRssMb": peak_rss_mb(),
+        "latency": measure_latency(model, vectorizer, X_test)
+    }
+
+
+def train_stream(sources, epochs=3, batch_rows=STREAM_BATCH_ROWS, alpha=1e-5,
+                 n_features=HASH_FEATURES, ngram_range=(1, 2)):
+    """Out-of-core training: memory depends on ``batch_rows`` and the holdout cap, not the corpus."""
+    started = time.perf_counter()
+    vectorizer = make_vectorizer({"kind": "hashing", "n_features": n_features, "ngram_range": ngram_range})
+    model = make_model({"kind": "sgd", "alpha": alpha})
+    classes = classes_for(sources)
+
+    holdout_texts, holdout_labels = [], []
+    rows = 0
+    for epoch in range(epochs):
+        for texts, labels in iter_batches(sources, batch_rows):
+            held = [is_holdout(text) for text in texts]
+            train_texts = [t for t, h in zip(texts, held) if not h]
+            train_labels = [l for l, h in zip(labels, held) if not h]
+
+            if epoch == 0:
+                rows += len(texts)
+                for text, label, h in zip(texts, labels, held):
+                    if h and len(holdout_texts) < HOLDOUT_MAX:
+                        holdout_texts.append(text)
+                        holdout_labels.append(label)
+
+            if train_texts:
+                model.partial_fit(vectorizer.transform(train_texts), train_labels, classes=classes)
+        print(f"   epoch {epoch + 1}/{epochs} done")
+
+    accuracy = None
+    if holdout_texts:
+        accuracy = accuracy_score(holdout_labels, model.predict(vectorizer.transform(holdout_texts)))
+
+    return model, vectorizer, {
+        "mode": "stream",
+        "rows": rows,
+        "epochs": epochs,
+        "batchRows": batch_rows,
+        "holdoutRows": len(holdout_texts),
+        "accuracy": round(float(accuracy), 4) if accuracy is not None else None,
+        "wallSeconds": round(time.perf_counter() - started, 2),
+        "peakRssMb": peak_rss_mb(),
+        "latency": measure_latency(model, vectorizer, holdout_texts)
+    }
+
+
+def _data_key(texts, labels):
+    digest = hashlib.sha1()
+    for text, label in zip(texts, labels):
+        digest.update(f"{label}\t{text}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _params_key(params):
+    return hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()[:12]
+
+
+def _fold_path(data_key, vec_params, fold):
+    return os.path.join(FOLD_CACHE_DIR, f"{data_key}-{_params_key(vec_params)}-{fold}.joblib")
+
+
+def _vectorize_fold(texts, labels, train_idx, test_idx, vec_params, path):
+    """Fit the vectorizer on one fold's training rows and cache both matrices."""
+    if os.path.exists(path):
+        return path
+    vectorizer = make_vectorizer(vec_params)
+    train_texts = [texts[i] for i in train_idx]
+    test_texts = [texts[i] for i in test_idx]
+    fold = {
+        "vectorizer": vectorizer,
+        "X_train": vectorizer.fit_transform(train_texts),
+        "y_train": np.asarray([labels[i] for i in train_idx]),
+        "X_test": vectorizer.transform(test_texts),
+        "y_test": np.asarray([labels[i] for i in test_idx]),
+        "test_texts": test_texts[:LATENCY_SAMPLES]
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(fold, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _fit_candidate(path, model_params):
+    """One (vectorizer, model, fold) fit on a memory-mapped cached fold."""
+    fold = joblib.load(path, mmap_mode="r")
+    tracemalloc.start()
+    started = time.perf_counter()
+    model = make_model(model_params)
+    model.fit(fold["X_train"], fold["y_train"])
+    fit_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    predicted = model.predict(fold["X_test"])
+    return {
+        "accuracy": float(accuracy_score(fold["y_test"], predicted)),
+        "fitSeconds": fit_seconds,
+        "peakMemoryMb": peak / (1 << 20),
+        "latency": measure_latency(model, fold["vectorizer"], fold["test_texts"], samples=50)
+    }
+
+
+def search(sources, folds=3, n_jobs=-1, vectorizer_grid=None, model_grid=None, test_size=0.2):
+    """Cross-validated grid search, then refit the best candidate and score it on a held-out split."""
+    started = time.perf_counter()
+    vectorizer_grid = vectorizer_grid or VECTORIZER_GRID
+    model_grid = model_grid or MODEL_GRID
+
+    texts, labels = load_texts(sources)
+    X_dev, X_test, y_dev, y_test = train_test_split(texts, labels, test_size=test_size, random_state=42)
+    data_key = _data_key(X_dev, y_dev)
+    os.makedirs(FOLD_CACHE_DIR, exist_ok=True)
+
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(X_dev, y_dev))
+
+    # Vectorise every (vectorizer, fold) once; cached folds from earlier runs are reused
+    fold_jobs = [
+        (vec_params, fold, _fold_path(data_key, vec_params, fold))
+        for vec_params in vectorizer_grid
+        for fold in range(folds)
+    ]
+    cached = sum(os.path.exists(path) for _, _, path in fold_jobs)
+    Parallel(n_jobs=n_jobs)(
+        delayed(_vectorize_fold)(X_dev, y_dev, splits[fold][0], splits[fold][1], vec_params, path)
+        for vec_params, fold, path in fold_jobs
+        if not os.path.exists(path)
+    )
+
+    tasks = list(itertools.product(range(len(vectorizer_grid)), range(len(model_grid)), range(folds)))
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_candidate)(_fold_path(data_key, vectorizer_grid[v], f), model_grid[m])
+        for v, m, f in tasks
+    )
+
+    by_candidate = {}
+    for (v, m, _), result in zip(tasks, results):
+        by_candidate.setdefault((v, m), []).append(result)
+
+    candidates = []
+    for (v, m), fold_results in by_candidate.items():
+        accuracies = [r["accuracy"] for r in fold_results]
+        candidates.append({
+            "vectorizer": vectorizer_grid[v],
+            "model": model_grid[m],
+            "cvAccuracy": round(float(np.mean(accuracies)), 4),
+            "cvStd": round(float(np.std(accuracies)), 4),
+            "fitSeconds": round(float(np.mean([r["fitSeconds"] for r in fold_results])), 3),
+            "peakMemoryMb": round(max(r["peakMemoryMb"] for r in fold_results), 1),
+            "latency": fold_results[0]["latency"]
+        })
+    candidates.sort(key=lambda c: c["cvAccuracy"], reverse=True)
+    best = candidates[0]
+
+    vectorizer = make_vectorizer(best["vectorizer"])
+    model = make_model(best["model"])
+    model.fit(vectorizer.fit_transform(X_dev), y_dev)
+    accuracy = accuracy_score(y_test, model.predict(vectorizer.transform(X_test)))
+
+    return model, vectorizer, {
+        "mode": "search",
+        "rows": len(texts),
+        "folds": folds,
+        "cachedFolds": cached,
+        "accuracy": round(float(accuracy), 4),
+        "best": {"vectorizer": best["vectorizer"], "model": best["model"]},
+        "candidates": candidates,
+        "wallSeconds": round(time.perf_counter() - started, 2),
+        "peakRssMb": peak_rss_mb(),
+        "latency": measure_latency(model, vectorizer, X_test)
+    }
@@ -1,15 +1,15 @@
-import os
-import pandas as pd
+from catalog.store import ensure_catalog, load
 
-data_dir = os.path.join(os.path.dirname(__file__), '../dataset')
-merged_file = os.path.join(data_dir, 'merged_dataset.csv')
+manifest = ensure_catalog()
 
-if os.path.exists(merged_file):
-    df = pd.read_csv(merged_file)
-    print("✅ Merged dataset loaded successfully!\n")
-    print("📄 Columns:", list(df.columns))
-    print("\n🔹 First 5 rows:")
-    print(df.head())
-    print(f"\n📊 Total rows: {len(df)}")
+if manifest["sources"]:
+    for name, entry in manifest["sources"].items():
+        print(f"\n✅ {name} ({', '.join(entry['inputs'])})")
+        print("📄 Columns:", entry["schema"])
+        if entry["labels"]:
+            print("🏷️ Labels:", dict(enumerate(entry["labels"])))
+        print("\n🔹 First 5 rows:")
+        print(load(name).head())
+        print(f"\n📊 Total rows: {entry['rows']}")
 else:
-    print("❌ merged_dataset.csv not found! Check your datasets folder.")
+    print("❌ No dataset sources found! Check your datasets folder.")
@@ -0,0 +1,129 @@
+"""Flask hooks: per-route timing, request traces, /metrics and per-request profiling.
+
+``instrument(app)`` adds:
+
+- ``wellnest_http_request_seconds{route,method,status}`` for every request
+  (route is the URL rule, e.g. ``/api/tracker/<user_id>``, so ids don't
+  explode the label set)
+- an ``X-Request-ID`` (the caller's, or a new one) on the response and in
+  every log line of the request
+- a ``Server-Timing`` header with the request's spans (mongo, vectorize,
+  inference, search, gemini), and a warning log for requests slower than
+  ``SLOW_REQUEST_MS``
+- ``GET /metrics`` in the Prometheus text format
+- the sampling profiler for a ``PROFILE_SAMPLE_RATE`` share of requests, or
+  for any request sent with ``X-Profile: <PROFILE_TOKEN>``
+"""
+import os
+import random
+import re
+import time
+import uuid
+
+from flask import Response, g, request
+
+from . import metrics
+from .logs import get_logger, request_id
+from .profiler import SamplingProfiler, hottest, write_folded
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+
+REQUEST_SECONDS = metrics.histogram(
+    "wellnest_http_request_seconds",
+    "Time to produce a response, per route",
+    labels=("route", "method", "status")
+)
+REQUEST_ERRORS = metrics.counter(
+    "wellnest_http_exceptions_total",
+    "Requests that raised instead of returning a response",
+    labels=("route", "method")
+)
+
+# 🔹 Caller-supplied request ids end up in logs and file names: keep them tame
+REQUEST_ID_PATTERN = re.compile(r"^[\w.-]{1,64}$")
+
+log = get_logger(__name__)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def _wants_profile():
+    if PROFILE_TOKEN and request.headers.get("X-Profile") == PROFILE_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _server_timing(spans):
+    totals = {}
+    for name, seconds in spans:
+        total, count = totals.get(name, (0.0, 0))
+        totals[name] = (total + seconds, count + 1)
+    return ", ".join(
+        f'{name};dur={total * 1000:.2f};desc="{count}x"'
+        for name, (total, count) in totals.items()
+    )
+
+
+def _before():
+    g.started = time.perf_counter()
+    supplied = request.headers.get("X-Request-ID", "")
+    g.request_id = supplied if REQUEST_ID_PATTERN.match(supplied) else uuid.uuid4().hex[:16]
+    request_id.set(g.request_id)
+    metrics.start_trace()
+    g.profiler = SamplingProfiler().start() if _wants_profile() else None
+
+
+def _after(response):
+    if "started" not in g:
+        return response
+    elapsed = time.perf_counter() - g.started
+    route = _route()
+    REQUEST_SECONDS.observe(elapsed, route=route, method=request.method, status=str(response.status_code))
+
+    spans = metrics.end_trace()
+    response.headers["X-Request-ID"] = g.request_id
+    timing = _server_timing(spans)
+    response.headers["Server-Timing"] = f"total;dur={elapsed * 1000:.2f}" + (f", {timing}" if timing else "")
+
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        log.warning("Slow request %s %s: %.0f ms (%s)", request.method, route, elapsed * 1000, timing or "no spans")
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        samples = profiler.stop()
+        if samples:
+            name = re.sub(r"[^\w.-]+", "_", route.strip("/")) or "root"
+            path = write_folded(samples, f"{name}-{g.request_id}")
+            log.info("Profiled %s %s: %d samples, hottest %s -> %s",
+                     request.method, route, sum(samples.values()), hottest(samples), path)
+        else:
+            log.info("Profiled %s %s: finished before the first sample", request.method, route)
+    return response
+
+
+def _teardown(error):
+    # Requests that raised skip after_request: close their trace and profiler here
+    if error is not None and "started" in g:
+        REQUEST_ERRORS.inc(route=_route(), method=request.method)
+        log.error("Unhandled error on %s %s: %r", request.method, _route(), error)
+    metrics.end_trace()
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+    request_id.set("-")
+
+
+def metrics_view():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def instrument(app):
+    app.before_request(_before)
+    app.after_request(_after)
+    app.teardown_request(_teardown)
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+    return app
@@ -0,0 +1,82 @@
+"""Leveled, rate-limited logging for the request path.
+
+``get_logger(__name__)`` returns a standard logger whose records pass a
+per-call-site rate limit: at most ``LOG_RATE_LIMIT`` records per
+``LOG_RATE_WINDOW`` seconds from one ``(logger, message template)``; the
+rest are dropped and counted, and the next record that gets through says
+how many were suppressed. A failing dependency therefore costs one line a
+second, not one per request.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "10"))
+LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", "1"))
+# 🔹 Libraries that log every HTTP call at INFO (the Gemini client's httpx)
+QUIET_LOGGERS = ("httpx", "httpcore", "google_genai")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+_configured = False
+_configure_lock = threading.Lock()
+
+# 🔹 Id of the request being handled on this thread (set by telemetry/http.py)
+request_id = contextvars.ContextVar("wellnest_request_id", default="-")
+
+
+class RateLimitFilter(logging.Filter):
+    """Drops records beyond ``limit`` per ``window`` seconds for each call site."""
+
+    def __init__(self, limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        if self.limit <= 0:
+            return True
+
+        site = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            started, count, dropped = self._sites.get(site, (now, 0, 0))
+            if now - started >= self.window:
+                started, count = now, 0
+            if count >= self.limit:
+                self._sites[site] = (started, count, dropped + 1)
+                return False
+            self._sites[site] = (started, count + 1, 0)
+
+        if dropped:
+            record.msg = f"{record.msg} (+{dropped} similar suppressed)"
+        return True
+
+
+def configure():
+    """Attach one rate-limited stream handler to the root logger (idempotent)."""
+    global _configured
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handler.addFilter(RateLimitFilter())
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+        _configured = True
+
+
+def get_logger(name):
+    configure()
+    return logging.getLogger(name)
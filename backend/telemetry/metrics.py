@@ -0,0 +1,180 @@
+"""In-process metrics: counters, histograms and timed spans, rendered for Prometheus.
+
+Metrics are per worker process (scrape every worker, or sum them in
+Prometheus). A :func:`span` times a block into the ``wellnest_span_seconds``
+histogram and, inside a request, also adds it to that request's trace
+(see telemetry/http.py), which becomes the ``Server-Timing`` header::
+
+    with span("inference", "emotion"):
+        proba = model.predict_proba(X)
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# 🔹 Latency buckets in seconds (sub-millisecond rule hits up to slow LLM calls)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 🔹 Every metric of this process, by name
+METRICS = {}
+_metrics_lock = threading.Lock()
+
+# 🔹 Callbacks sampled at scrape time: fn() -> {labels tuple: value}
+_gauges = {}
+
+# 🔹 Spans of the request being handled on this thread (None outside requests)
+_trace = contextvars.ContextVar("wellnest_trace", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram (observations in seconds)."""
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_label_text(names, key + (_number(bound),))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_label_text(names, key + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_number(total)}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {count}")
+        return lines
+
+
+def _register(cls, name, help_text, labels, **options):
+    with _metrics_lock:
+        metric = METRICS.get(name)
+        if metric is None:
+            metric = METRICS[name] = cls(name, help_text, labels, **options)
+        return metric
+
+
+def counter(name, help_text, labels=()):
+    return _register(Counter, name, help_text, labels)
+
+
+def histogram(name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, help_text, labels, buckets=buckets)
+
+
+def gauge(name, help_text, labels, fn):
+    """A value read from ``fn`` at scrape time (pool sizes, cache entries, ...)."""
+    _gauges[name] = (help_text, tuple(labels), fn)
+
+
+SPAN_SECONDS = histogram(
+    "wellnest_span_seconds",
+    "Time spent in instrumented hot paths",
+    labels=("span", "detail")
+)
+
+
+def start_trace():
+    _trace.set([])
+
+
+def end_trace():
+    """Spans recorded since :func:`start_trace`; later spans go to the histogram only."""
+    spans = _trace.get()
+    _trace.set(None)
+    return spans or []
+
+
+@contextmanager
+def span(name, detail=""):
+    """Time a block into the span histogram and the current request's trace."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        SPAN_SECONDS.observe(elapsed, span=name, detail=detail)
+        spans = _trace.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+def record_span(name, seconds, detail=""):
+    """A span timed elsewhere (e.g. from event listeners with their own clock)."""
+    SPAN_SECONDS.observe(seconds, span=name, detail=detail)
+    spans = _trace.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+def render():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(METRICS.values()):
+        lines.extend(metric.render())
+    for name, (help_text, labels, fn) in list(_gauges.items()):
+        try:
+            values = fn()
+        except Exception:
+            continue
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge"])
+        for key, value in sorted(values.items()):
+            lines.append(f"{name}{_label_text(labels, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
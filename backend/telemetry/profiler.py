@@ -0,0 +1,88 @@
+"""Opt-in sampling profiler for single requests.
+
+While a request is profiled, a daemon thread samples that request's
+thread stack every ``PROFILE_INTERVAL_MS`` and counts identical stacks.
+The result is written in the collapsed ("folded") format that
+flamegraph.pl and speedscope read, one file per profiled request.
+Nothing runs unless a request is picked (see telemetry/http.py).
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# 🔹 Oldest profile files are removed beyond this many
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+MAX_DEPTH = 64
+
+
+def _stack(frame):
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples one thread's stack until :meth:`stop`; returns stack -> sample count."""
+
+    def __init__(self, thread_id=None, interval_ms=PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval_ms / 1000.0
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_stack(frame)] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+
+def hottest(samples, top=3):
+    """The innermost frames that most samples landed in: ``[(frame, share), ...]``."""
+    leaves = Counter()
+    for stack, count in samples.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    total = sum(leaves.values()) or 1
+    return [(frame, round(count / total, 3)) for frame, count in leaves.most_common(top)]
+
+
+def _prune(directory, keep):
+    files = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".folded")),
+        key=os.path.getmtime
+    )
+    for path in files[:-keep] if keep else files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def write_folded(samples, name, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    """Write one profile as ``stack count`` lines; returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}.folded")
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    _prune(directory, keep)
+    return path
@@ -0,0 +1,116 @@
+"""Startup report: where a worker's boot time went, plus the warmup hook.
+
+app.py imports this module first and marks the end of its own imports;
+``warmup`` then initialises the lazily created components (database,
+indexes, model, chatbot engine, Gemini client) and times each one.
+``GET /api/startup`` returns the report. For an import-by-import
+breakdown of app.py (a fresh interpreter under ``-X importtime``)::
+
+    python -m telemetry.startup
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# As close to process start as app.py can get
+STARTED = time.perf_counter()
+
+_report = {"pid": os.getpid(), "phases": {}, "components": {}}
+_lock = threading.Lock()
+
+
+def _since_start_ms():
+    return round((time.perf_counter() - STARTED) * 1000, 1)
+
+
+def mark(phase):
+    """Record that ``phase`` (e.g. "imports") ended now."""
+    with _lock:
+        _report["phases"][phase] = _since_start_ms()
+
+
+def init_component(name, fn):
+    """Run one component's initialiser; failures are recorded, not raised."""
+    started = time.perf_counter()
+    record = {"ok": True}
+    try:
+        fn()
+    except Exception as e:
+        record = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    record["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    record["readyAtMs"] = _since_start_ms()
+    with _lock:
+        _report["components"][name] = record
+    return record
+
+
+def warmup(components, names=None):
+    """Initialise ``components`` (name -> callable) in order and return the report."""
+    for name in names or list(components):
+        if name in components:
+            init_component(name, components[name])
+    return report()
+
+
+def warmup_in_background(components, names=None):
+    thread = threading.Thread(target=warmup, args=(components, names), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def report():
+    with _lock:
+        return {
+            "pid": _report["pid"],
+            "uptimeMs": _since_start_ms(),
+            "phases": dict(_report["phases"]),
+            "components": {name: dict(record) for name, record in _report["components"].items()}
+        }
+
+
+def import_breakdown(module="app", cwd=None):
+    """Cumulative import time (ms) of each module ``module`` imports directly, slowest first."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+        # Don't let a missing MongoDB stretch the measurement
+        env=dict(os.environ, ENSURE_INDEXES_ON_START="0", WARMUP_ON_START="")
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        # "import time: <self us> | <cumulative us> | <2 spaces per level><name>"
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not cumulative_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 1:
+            rows.append((name.strip(), int(cumulative_us) / 1000))
+        elif depth == 0 and name.strip() == module:
+            rows.append((f"{module} (total)", int(cumulative_us) / 1000))
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+# 🔹 Report: python -m telemetry.startup [--module app] [--no-warmup]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--no-warmup", action="store_true", help="only the import breakdown")
+    args = parser.parse_args()
+
+    print(f"📦 Import cost of {args.module} (cumulative, direct imports):")
+    for name, ms in import_breakdown(args.module)[:args.top]:
+        print(f"   {ms:>9.1f} ms  {name}")
+
+    if not args.no_warmup:
+        module = __import__(args.module)
+        result = module.warmup()
+        print(f"\n🔥 Warmup (imports done at {result['phases'].get('imports')} ms):")
+        for name, record in result["components"].items():
+            status = "✅" if record["ok"] else f"❌ {record['error']}"
+            print(f"   {record['ms']:>9.1f} ms  {name} {status}")
@@ -0,0 +1,43 @@
+import os
+import sys
+import uuid
+
+import pytest
+
+# 🔹 Tests import the backend the way app.py does (run from backend/ or the repo root)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+from database.db import MONGO_URI  # noqa: E402
+
+# 🔹 How long to look for a mongod before skipping the tests that need one
+TEST_MONGO_TIMEOUT_MS = int(os.getenv("TEST_MONGO_TIMEOUT_MS", "1000"))
+
+
+@pytest.fixture(scope="session")
+def mongo_client():
+    """A client for a real mongod; every test using it skips when none is reachable.
+
+    mongomock has no query planner and no update pipelines, so these tests
+    need the real server.
+    """
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=TEST_MONGO_TIMEOUT_MS)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"no mongod at {MONGO_URI}: {type(e).__name__}")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def mongo_db(mongo_client):
+    """A scratch database, dropped after the test."""
+    name = f"wellnest_test_{uuid.uuid4().hex[:8]}"
+    try:
+        yield mongo_client[name]
+    finally:
+        mongo_client.drop_database(name)
@@ -0,0 +1,14 @@
+from database.audit import audit
+
+
+def test_hot_queries_use_an_index(mongo_db):
+    results = audit(mongo_db)
+
+    scans = [f"{name} ({collection}): {', '.join(stages)}"
+             for name, collection, stages in results if "COLLSCAN" in stages]
+    assert not scans, "hot queries doing a collection scan:\n" + "\n".join(scans)
+
+
+def test_every_hot_query_is_explained(mongo_db):
+    # A query whose plan has no stages at all would pass the check above vacuously
+    assert all(stages for _, _, stages in audit(mongo_db))
@@ -0,0 +1,74 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from database.rollups import ALL_USERS, mood_counts, rebuild_rollups, record_moods
+
+
+@pytest.fixture
+def database(mongo_db, mongo_client):
+    # $dateTrunc in the backfill needs MongoDB 5.0
+    if tuple(mongo_client.server_info()["versionArray"][:2]) < (5, 0):
+        pytest.skip("rebuild_rollups needs MongoDB 5.0+")
+    return mongo_db
+
+
+def _logs(users):
+    start = datetime(2026, 2, 1, 7, 30)
+    moods = ["happy", "sad", "calm", None]
+    logs = []
+    for i in range(40):
+        log = {"date": start + timedelta(hours=5 * i), "mood": moods[i % len(moods)]}
+        if i % 10 != 9:
+            # Every tenth log has no user: it only counts in the global rollups
+            log["user_id"] = users[i % len(users)]
+        logs.append(log)
+    return logs
+
+
+def _expected(logs, user_id=None):
+    return Counter(
+        log["mood"] or "unknown" for log in logs
+        if user_id is None or log.get("user_id") == user_id
+    )
+
+
+def test_rebuild_counts_global_and_per_user(database):
+    users = [ObjectId(), ObjectId()]
+    logs = _logs(users)
+    database.daily_logs.insert_many([dict(log) for log in logs])
+
+    rebuild_rollups(database)
+    # Re-running replaces the same buckets instead of adding to them
+    rebuild_rollups(database)
+
+    rollups = database.mood_rollups
+    assert mood_counts(collection=rollups) == _expected(logs)
+    for user_id in users:
+        assert mood_counts(user_id, collection=rollups) == _expected(logs, user_id)
+    assert rollups.count_documents({"user_id": None}) == 0
+
+    daily = mood_counts(granularity="day", collection=rollups)
+    assert sum(sum(point["moods"].values()) for point in daily) == len(logs)
+
+
+def test_incremental_counts_match_the_rebuild(database):
+    users = [ObjectId(), ObjectId()]
+    logs = [log for log in _logs(users) if "user_id" in log]
+    database.daily_logs.insert_many([dict(log) for log in logs])
+
+    live = database["live_rollups"]
+    for user_id in users:
+        record_moods(user_id, [(log["mood"], log["date"]) for log in logs if log["user_id"] == user_id], live)
+    rebuild_rollups(database)
+
+    def rows(collection):
+        return sorted(
+            (doc["granularity"], str(doc["user_id"]), doc["bucket"], doc["mood"], doc["count"])
+            for doc in collection.find({}, {"_id": 0})
+        )
+
+    assert rows(live) == rows(database.mood_rollups)
+    assert live.count_documents({"user_id": ALL_USERS}) > 0
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from database.streak import record_visit, update_visit_streak
+from database.streak_engine import BADGE_NAMES
+
+VISITS = 32
+
+
+@pytest.fixture
+def users(mongo_db, mongo_client):
+    # $dateDiff in the visit pipeline needs MongoDB 5.0
+    if tuple(mongo_client.server_info()["versionArray"][:2]) < (5, 0):
+        pytest.skip("visit_pipeline needs MongoDB 5.0+")
+    return mongo_db["users"]
+
+
+def _visit_concurrently(collection, user_id, stamps):
+    with ThreadPoolExecutor(max_workers=len(stamps)) as executor:
+        return list(executor.map(lambda now: record_visit(user_id, now, collection), stamps))
+
+
+def test_concurrent_visits_on_one_day_count_once(users):
+    user_id = users.insert_one({"email": "streak@example.com"}).inserted_id
+    day = datetime(2026, 3, 1, 9)
+
+    results = _visit_concurrently(users, user_id, [day + timedelta(seconds=i) for i in range(VISITS)])
+
+    stored = users.find_one({"_id": user_id})
+    assert stored["streak"]["current"] == 1
+    assert stored["streak"]["longest"] == 1
+    assert stored["badges"] == []
+    assert all(result["streak"]["current"] == 1 for result in results)
+
+
+def test_concurrent_visits_match_the_serial_rules(users):
+    user_id = users.insert_one({"email": "streak@example.com"}).inserted_id
+    expected = {}
+    day = datetime(2026, 1, 1, 8)
+
+    # 35 consecutive days earn every badge (and freezes); the gaps after that spend freezes
+    offsets = [1] * 35 + [2, 1, 5, 1]
+    for offset in offsets:
+        day += timedelta(days=offset)
+        _visit_concurrently(users, user_id, [day + timedelta(minutes=i) for i in range(VISITS)])
+        expected = update_visit_streak(expected, day)
+
+        stored = users.find_one({"_id": user_id})
+        for field in ("current", "longest", "freezeAvailable"):
+            assert stored["streak"][field] == expected["streak"][field], (day, field)
+        assert stored["badges"] == expected["badges"], day
+
+    # Each badge awarded exactly once despite 32 racing writers per day
+    assert sorted(stored["badges"]) == sorted(BADGE_NAMES)
+
+
+def test_unknown_user_is_none(users):
+    assert record_visit(ObjectId(), datetime(2026, 3, 1), users) is None
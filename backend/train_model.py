@@ -1,47 +1,92 @@
+"""Train the emotion model and publish it to the registry.
+
+    python train_model.py                                  # TF-IDF + LogisticRegression (in memory)
+    python train_model.py --mode stream --sources emotion,journal --epochs 3
+    python train_model.py --mode search --folds 3 --n-jobs -1
+
+Every run writes a JSON training report (wall time, peak memory, accuracy,
+inference latency; per candidate in search mode).
+"""
+import argparse
+import json
 import os
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, accuracy_score
-import joblib
-
-# Paths
-data_dir = os.path.join(os.path.dirname(__file__), '../dataset')
-model_dir = os.path.join(os.path.dirname(__file__), '../models')
-os.makedirs(model_dir, exist_ok=True)
-
-dataset_path = os.path.join(data_dir, 'merged_dataset.csv')
-model_path = os.path.join(model_dir, 'emotion_model.pkl')
-vectorizer_path = os.path.join(model_dir, 'vectorizer.pkl')
-
-# Load dataset
-df = pd.read_csv(dataset_path)
-print(f"✅ Loaded dataset with {len(df)} rows")
-
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    df['text'], df['label'], test_size=0.2, random_state=42
+import sys
+from datetime import datetime
+from catalog.sources import BASE_DIR
+from catalog.store import source_info
+from catalog.validate import validate
+from ml import training
+from ml.cache import invalidate_shared
+from ml.registry import REGISTRY_DIR, publish
+
+# 🔹 Catalog sources to train on (labels are canonical emotion names);
+# "journal" adds daily-log entries labelled by mood
+TRAIN_SOURCES = os.getenv("TRAIN_SOURCES", os.getenv("TRAIN_SOURCE", "emotion"))
+REPORT_PATH = os.path.join(REGISTRY_DIR, "training_report.json")
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--mode", choices=["full", "stream", "search"], default="full")
+parser.add_argument("--sources", default=TRAIN_SOURCES, help="comma-separated catalog sources (and/or 'journal')")
+parser.add_argument("--epochs", type=int, default=3, help="stream mode: passes over the data")
+parser.add_argument("--batch-rows", type=int, default=training.STREAM_BATCH_ROWS, help="stream mode: rows per partial_fit")
+parser.add_argument("--folds", type=int, default=3, help="search mode: cross-validation folds")
+parser.add_argument("--n-jobs", type=int, default=-1, help="search mode: parallel workers")
+parser.add_argument("--report", default=REPORT_PATH, help="where to write the JSON training report")
+parser.add_argument("--no-publish", action="store_true", help="train and report only")
+args = parser.parse_args()
+
+sources = [name.strip() for name in args.sources.split(",") if name.strip()]
+catalog_sources = [name for name in sources if name != training.JOURNAL_SOURCE]
+
+# Refuse to train on data that fails validation (cached, so usually just a hash per file)
+report = validate(
+    [os.path.join(BASE_DIR, path) for name in catalog_sources for path in source_info(name)["inputs"]],
+    report_path=None
 )
+if not report["passed"]:
+    print(f"🚨 {', '.join(catalog_sources)} failed validation: {report['summary']['failed']}")
+    sys.exit(1)
+
+print(f"🔹 Training ({args.mode}) on {', '.join(sources)}")
+if args.mode == "stream":
+    model, vectorizer, result = training.train_stream(sources, epochs=args.epochs, batch_rows=args.batch_rows)
+elif args.mode == "search":
+    model, vectorizer, result = training.search(sources, folds=args.folds, n_jobs=args.n_jobs)
+    for candidate in result["candidates"]:
+        print(f"   {candidate['cvAccuracy']:.4f} ± {candidate['cvStd']:.4f}  "
+              f"{candidate['vectorizer']} {candidate['model']}")
+else:
+    model, vectorizer, result = training.train_full(sources)
+
+print(f"🎯 Accuracy: {result['accuracy']}")
+peak_rss = f"{result['peakRssMb']} MB" if result["peakRssMb"] is not None else "n/a"
+print(f"⏱️ {result['wallSeconds']}s, peak RSS {peak_rss}, latency {result['latency']}")
+
+result.update({
+    "sources": sources,
+    "dataHashes": {name: source_info(name)["sha256"] for name in catalog_sources},
+    "trainedAt": datetime.utcnow().isoformat()
+})
+
+if not args.no_publish:
+    # Publish a new registry version; running workers swap it in without a restart
+    result["version"] = publish(model, vectorizer, {
+        "accuracy": result["accuracy"],
+        "mode": args.mode,
+        "dataSource": ",".join(sources),
+        "dataHash": json.dumps(result["dataHashes"], sort_keys=True),
+        "labels": training.classes_for(sources),
+        "rows": result["rows"],
+        "trainedAt": result["trainedAt"],
+        "trainSeconds": result["wallSeconds"]
+    })
+    print(f"\n✅ Model version {result['version']} published")
+
+    # Cached predictions came from the old model; workers clear their own tier on next lookup
+    invalidate_shared("predict")
+    print("🧹 Prediction cache invalidated")
 
-# Vectorize text
-vectorizer = TfidfVectorizer(max_features=5000)
-X_train_vec = vectorizer.fit_transform(X_train)
-X_test_vec = vectorizer.transform(X_test)
-
-# Train model
-model = LogisticRegression(max_iter=1000)
-model.fit(X_train_vec, y_train)
-
-# Evaluate
-y_pred = model.predict(X_test_vec)
-acc = accuracy_score(y_test, y_pred)
-print(f"🎯 Accuracy: {acc:.2f}")
-print("\n📊 Classification Report:")
-print(classification_report(y_test, y_pred))
-
-# Save model and vectorizer
-joblib.dump(model, model_path)
-joblib.dump(vectorizer, vectorizer_path)
-print(f"\n✅ Model saved to: {model_path}")
-print(f"✅ Vectorizer saved to: {vectorizer_path}")
+os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+with open(args.report, "w", encoding="utf-8") as f:
+    json.dump(result, f, indent=2)
+print(f"📝 Training report: {args.report}")
@@ -1,81 +1,59 @@
-import os
-import pandas as pd
-from collections import Counter
-
-# Path to dataset directory
-data_dir = os.path.join(os.path.dirname(__file__), '../dataset')
-
-required_columns = {"text", "label"}
-
-print("\n🔍 Starting dataset validation...\n")
-
-summary = []  # To store summary of each dataset
-
-for file in os.listdir(data_dir):
-    if file.endswith(".csv"):
-        file_path = os.path.join(data_dir, file)
-        print(f"📁 Checking: {file}")
-
-        try:
-            df = pd.read_csv(file_path)
-        except Exception as e:
-            print(f"❌ ERROR loading {file}: {e}")
-            continue
-
-        # Check required columns
-        if not required_columns.issubset(df.columns):
-            print(f"❌ Missing required columns in {file}. Found: {list(df.columns)}")
-            continue
-
-        # Basic info
-        rows = len(df)
-        missing_text = df['text'].isna().sum()
-        missing_label = df['label'].isna().sum()
-        duplicates = df.duplicated().sum()
-
-        # Label distribution
-        label_counts = Counter(df['label'])
-        total = sum(label_counts.values())
-
-        print(f"   📌 Rows: {rows}")
-        print(f"   ⚠️ Missing text: {missing_text}")
-        print(f"   ⚠️ Missing labels: {missing_label}")
-        print(f"   🔁 Duplicates: {duplicates}")
-        print(f"   🏷️ Label distribution: {dict(label_counts)}")
-
-        # Imbalance check
-        if len(label_counts) > 1:
-            max_label = max(label_counts.values())
-            imbalance_ratio = max_label / total
-
-            if imbalance_ratio > 0.70:
-                print("   🚨 WARNING: Data is highly imbalanced!")
-            else:
-                print("   ✅ Good label balance.")
-        else:
-            print("   ⚠️ Only one label found — cannot train classification.")
-
+"""Validate every dataset file and write a JSON report (exit code 1 on failure).
+
+    python validate_dataset.py                 # report to dataset/catalog/validation_report.json
+    python validate_dataset.py --strict        # warnings fail too
+    python validate_dataset.py --no-cache --workers 4 --report report.json
+"""
+import argparse
+import sys
+
+from catalog.validate import REPORT_PATH, validate
+
+LEVEL_ICONS = {"fail": "❌", "warn": "⚠️", "info": "ℹ️"}
+
+
+def print_report(report):
+    for item in report["files"]:
+        cached = " (cached)" if item["cached"] else ""
+        print(f"📁 {item['path']}{cached}")
+        if "error" not in item:
+            print(f"   📌 Rows: {item['rows']}")
+        if item.get("textColumn"):
+            print(f"   ⚠️ Missing text: {item['missingText']}")
+            print(f"   🔁 Duplicates: {item['duplicateRows']} rows, {item['duplicateTexts']} texts, "
+                  f"{item['nearDuplicates']['pairs']} near-duplicate pairs")
+            print(f"   📏 Text length: mean {item['textLength']['mean']}, p95 {item['textLength']['p95']}")
+        if item.get("labels"):
+            print(f"   🏷️ Label distribution: {item['labels']}")
+        for issue in item["issues"]:
+            print(f"   {LEVEL_ICONS[issue['level']]} {issue['message']}")
+        if item["status"] == "ok":
+            print("   ✅ OK")
         print("-" * 60)
 
-        # Add to summary list
-        summary.append({
-            "file": file,
-            "rows": rows,
-            "missing_text": missing_text,
-            "missing_label": missing_label,
-            "duplicates": duplicates,
-            "labels": dict(label_counts)
-        })
-
-# Print summary
-print("\n================== SUMMARY REPORT ==================\n")
-for item in summary:
-    print(f"📄 {item['file']}")
-    print(f"   Rows: {item['rows']}")
-    print(f"   Missing text: {item['missing_text']}")
-    print(f"   Missing label: {item['missing_label']}")
-    print(f"   Duplicates: {item['duplicates']}")
-    print(f"   Labels: {item['labels']}")
-    print("--------------------------------------------------")
-
-print("\n✅ Validation completed.\n")
+    summary = report["summary"]
+    print(f"\n📊 {summary['files']} files ({summary['cached']} cached), "
+          f"{summary['rows']} rows in {report['seconds']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--report", default=REPORT_PATH, help="where to write the JSON report")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="profile every file again")
+    parser.add_argument("--strict", action="store_true", help="fail on warnings as well")
+    parser.add_argument("--quiet", action="store_true", help="only print the verdict")
+    args = parser.parse_args()
+
+    print("\n🔍 Starting dataset validation...\n")
+    report = validate(workers=args.workers, use_cache=not args.no_cache,
+                      report_path=args.report, strict=args.strict)
+    if not args.quiet:
+        print_report(report)
+    print(f"📝 Report: {args.report}")
+
+    if report["passed"]:
+        print("\n✅ Validation passed.\n")
+    else:
+        print(f"\n🚨 Validation failed: {report['summary']['failed'] or report['summary']['warnings']}\n")
+        sys.exit(1)
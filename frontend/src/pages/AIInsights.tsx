@@ -44,15 +44,16 @@ const moodScoreMap: Record<string, number> = {
   useEffect(() => {
     const userId = localStorage.getItem("user_id");
     const url = userId
-      ? `http://localhost:5000/api/daily-log/${userId}`
+      ? `http://localhost:5000/api/daily-log/${userId}?limit=7`
       : "http://localhost:5000/api/daily-log";
 
     fetch(url)
       .then((res) => res.json())
       .then((data) => {
         console.log("Fetched Logs:", data);
-        // API might return { data: [...] } or an array directly
-        setLogs((data && (data.data ?? data)) || []);
+        // API might return { data: [...] } (newest first) or an array directly
+        const rows = (data && (data.data ?? data)) || [];
+        setLogs(Array.isArray(data?.data) ? [...rows].reverse() : rows);
       })
       .catch((err) => console.error("Failed to fetch logs:", err));
   }, []);